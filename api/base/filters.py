@@ -152,10 +152,11 @@ class FilterMixin(object):
         """Maps query params to a dict useable for filtering
         :param dict query_params:
         :return dict: of the format {
-            <resolved_field_name>: {
+            <resolved_field_name>: [{
                 'op': <comparison_operator>,
-                'value': <resolved_value>
-            }
+                'value': <resolved_value>,
+                'serializer_field': <field_name_as_serialized>
+            }]
         }
         """
         query = {}
@@ -169,18 +170,22 @@ class FilterMixin(object):
                 op = match_dict.get('op') or self._get_default_operator(field)
                 self._validate_operator(field, field_name, op)
 
+                serializer_field = field_name
                 field_name = self.convert_key(field_name, field)
                 if field_name not in query:
                     query[field_name] = []
 
                 # Special case date(time)s to allow for ambiguous date matches
                 if isinstance(field, self.DATE_FIELDS):
-                    query[field_name].extend(self._parse_date_param(field, field_name, op, value))
+                    groups = self._parse_date_param(field, field_name, op, value)
                 else:
-                    query[field_name].append({
+                    groups = [{
                         'op': op,
                         'value': self.convert_value(value, field)
-                    })
+                    }]
+                for group in groups:
+                    group['serializer_field'] = serializer_field
+                query[field_name].extend(groups)
         return query
 
     def convert_key(self, field_name, field):
@@ -320,29 +325,34 @@ class ListFilterMixin(FilterMixin):
             return default_queryset
 
     def param_queryset(self, query_params, default_queryset):
-        """filters default queryset based on query parameters"""
+        """filters default queryset based on query parameters
+
+        Each filter group narrows the result of the previous one, so items are only tested against
+        filters they have passed so far. The order of the default queryset is preserved.
+        """
         filters = self.parse_query_params(query_params)
-        queryset = set(default_queryset)
-        if filters:
-            for field_name, params in filters.iteritems():
-                for group in params:
-                    queryset = queryset.intersection(set(self.get_filtered_queryset(field_name, group, default_queryset)))
-        return list(queryset)
+        queryset = list(default_queryset)
+        for field_name, params in filters.iteritems():
+            for group in params:
+                queryset = self.get_filtered_queryset(field_name, group, queryset)
+        return queryset
 
     def get_filtered_queryset(self, field_name, params, default_queryset):
-        """filters default queryset based on the serializer field type"""
-        field = self.serializer_class._declared_fields[field_name]
-        field_name = self.convert_key(field_name, field)
+        """filters default queryset based on the serializer field type
+
+        :param field_name: Field name after `convert_key`, i.e. the field's source
+        """
+        field = self.serializer_class._declared_fields[params['serializer_field']]
 
         if isinstance(field, ser.SerializerMethodField):
             return_val = [
                 item for item in default_queryset
-                if self.FILTERS[params['op']](self.get_serializer_method(field_name)(item), params['value'])
+                if self.FILTERS[params['op']](self.get_serializer_method(params['serializer_field'])(item), params['value'])
             ]
         elif isinstance(field, ser.CharField):
             return_val = [
                 item for item in default_queryset
-                if params['value'] in getattr(item, field_name, {}).lower()
+                if params['value'].lower() in (getattr(item, field_name, None) or '').lower()
             ]
         else:
             return_val = [
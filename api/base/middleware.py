@@ -1,11 +1,13 @@
 from pymongo.errors import OperationFailure
 from raven.contrib.django.raven_compat.models import sentry_exception_handler
 
+from framework.mongo import client_pool, profiler
 from framework.transactions import commands, messages, utils
 
 from .api_globals import api_globals
 
 from api.base import settings
+from website import settings as osf_settings
 
 
 # TODO: Verify that a transaction is being created for every
@@ -15,6 +17,7 @@ class TokuTransactionsMiddleware(object):
 
     def process_request(self, request):
         """Begin a transaction if one doesn't already exist."""
+        request._mongo_client = client_pool.checkout()
         try:
             commands.begin()
         except OperationFailure as err:
@@ -33,7 +36,7 @@ class TokuTransactionsMiddleware(object):
             message = utils.get_error_message(err)
             if messages.NO_TRANSACTION_ERROR not in message:
                 raise
-        commands.disconnect()
+        self.release(request)
         return None
 
     def process_response(self, request, response):
@@ -60,9 +63,18 @@ class TokuTransactionsMiddleware(object):
                 pass
             else:
                 raise err
-        commands.disconnect()
+        self.release(request)
         return response
 
+    def release(self, request):
+        """Check the client checked out for the request back into the pool,
+        once even if both `process_exception` and `process_response` run.
+        """
+        client = getattr(request, '_mongo_client', None)
+        if client is not None:
+            request._mongo_client = None
+            client_pool.checkin(client)
+
 
 class DjangoGlobalMiddleware(object):
     """
@@ -79,3 +91,23 @@ class DjangoGlobalMiddleware(object):
     def process_response(self, request, response):
         api_globals.request = None
         return response
+
+
+class QueryProfilerMiddleware(object):
+    """Profile the MongoDB operations of each request when
+    `QUERY_PROFILER_ENABLED` is set; see `framework.mongo.profiler`.
+    """
+    def process_request(self, request):
+        if osf_settings.QUERY_PROFILER_ENABLED:
+            profiler.start('<unknown>', method=request.method, path=request.path)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        profile = profiler.current()
+        if profile is not None:
+            profile.endpoint = getattr(view_func, '__name__', profile.endpoint)
+
+    def process_response(self, request, response):
+        profile = profiler.finish()
+        if profile is not None and settings.DEBUG:
+            response['X-OSF-Query-Count'] = str(profile.query_count)
+        return response
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 from modularodm import Q
 from modularodm.exceptions import NoResultsFound
+from modularodm.storedobject import StoredObject
 from rest_framework.exceptions import NotFound
 from rest_framework.reverse import reverse
 import furl
@@ -54,35 +55,41 @@ def absolute_reverse(view_name, query_kwargs=None, args=None, kwargs=None):
 def get_object_or_error(model_cls, query_or_pk, display_name=None):
     display_name = display_name or None
 
-    if isinstance(query_or_pk, basestring):
-        query = Q('_id', 'eq', query_or_pk)
+    if isinstance(query_or_pk, basestring) and issubclass(model_cls, StoredObject):
+        # Loading by primary key is served from the request's object cache if the
+        # object was already loaded, e.g. by JSONAPIBaseView.prefetch_embeds
+        obj = model_cls.load(query_or_pk)
+        if obj is None:
+            raise NotFound
     else:
-        query = query_or_pk
-
-    try:
-        obj = model_cls.find_one(query)
-        if getattr(obj, 'is_deleted', False) is True:
+        if isinstance(query_or_pk, basestring):
+            query = Q('_id', 'eq', query_or_pk)
+        else:
+            query = query_or_pk
+        try:
+            obj = model_cls.find_one(query)
+        except NoResultsFound:
+            raise NotFound
+
+    if getattr(obj, 'is_deleted', False) is True:
+        if display_name is None:
+            raise Gone
+        else:
+            raise Gone(detail='The requested {name} is no longer available.'.format(name=display_name))
+    # For objects that have been disabled (is_active is False), return a 410.
+    # The User model is an exception because we still want to allow
+    # users who are unconfirmed or unregistered, but not users who have been
+    # disabled.
+    if model_cls is User:
+        if obj.is_disabled:
+            raise Gone(detail='The requested user is no longer available.')
+    else:
+        if not getattr(obj, 'is_active', True) or getattr(obj, 'is_deleted', False):
             if display_name is None:
                 raise Gone
             else:
                 raise Gone(detail='The requested {name} is no longer available.'.format(name=display_name))
-        # For objects that have been disabled (is_active is False), return a 410.
-        # The User model is an exception because we still want to allow
-        # users who are unconfirmed or unregistered, but not users who have been
-        # disabled.
-        if model_cls is User:
-            if obj.is_disabled:
-                raise Gone(detail='The requested user is no longer available.')
-        else:
-            if not getattr(obj, 'is_active', True) or getattr(obj, 'is_deleted', False):
-                if display_name is None:
-                    raise Gone
-                else:
-                    raise Gone(detail='The requested {name} is no longer available.'.format(name=display_name))
-        return obj
-
-    except NoResultsFound:
-        raise NotFound
+    return obj
 
 def waterbutler_url_for(request_type, provider, path, node_id, token, obj_args=None, **query):
     """Reverse URL lookup for WaterButler routes
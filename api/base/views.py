@@ -1,14 +1,29 @@
+from collections import defaultdict
+
 from django.http import JsonResponse
+from modularodm import Q
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import generics
 from rest_framework.mixins import ListModelMixin
 
 from api.users.serializers import UserSerializer
+from framework.auth.core import User
 from website import settings
+from website.models import Node, Comment, NodeLog
 from .utils import absolute_reverse
 from .requests import EmbeddedRequest
 
+# Maps URL kwargs of embeddable views to the model the kwarg is the primary key of
+EMBED_LOOKUP_MODELS = {
+    'node_id': Node,
+    'collection_id': Node,
+    'user_id': User,
+    'comment_id': Comment,
+    'log_id': NodeLog,
+}
+
+
 class JSONAPIBaseView(generics.GenericAPIView):
 
     def __init__(self, **kwargs):
@@ -25,26 +40,39 @@ class JSONAPIBaseView(generics.GenericAPIView):
         results for
         :return function object -> dict:
         """
+        embed_cache = self._get_embed_cache()
+
         def partial(item):
             # resolve must be implemented on the field
             view, view_args, view_kwargs = field.resolve(item)
             if issubclass(view.cls, ListModelMixin) and field.always_embed:
                 raise Exception("Cannot auto-embed a list view.")
-            request = EmbeddedRequest(self.request)
-            view_kwargs.update({
-                'request': request,
-                'is_embedded': True
-            })
-            response = view(*view_args, **view_kwargs)
-            return response.data
+            # The same resource embedded by several items is only rendered once per request
+            cache_key = (view.cls, tuple(view_args), tuple(sorted(view_kwargs.items())))
+            if cache_key not in embed_cache:
+                request = EmbeddedRequest(self.request)
+                view_kwargs.update({
+                    'request': request,
+                    'is_embedded': True
+                })
+                response = view(*view_args, **view_kwargs)
+                embed_cache[cache_key] = response.data
+            return embed_cache[cache_key]
         return partial
 
-    def get_serializer_context(self):
-        """Inject request into the serializer context. Additionally, inject partial functions
-        (request, object -> embed items) if the query string contains embeds.  Allows
-         multiple levels of nesting.
+    def _get_embed_cache(self):
+        """Return the cache of embedded responses shared by all views of the current request, including
+        the views of nested embeds.
         """
-        context = super(JSONAPIBaseView, self).get_serializer_context()
+        request = self.request
+        while isinstance(request, EmbeddedRequest):
+            request = request._request
+        if not hasattr(request, '_embed_cache'):
+            request._embed_cache = {}
+        return request._embed_cache
+
+    def get_embeds(self):
+        """Return the names of the fields of the view's serializer to embed."""
         if self.kwargs.get('is_embedded'):
             embeds = []
         else:
@@ -56,6 +84,69 @@ class JSONAPIBaseView(generics.GenericAPIView):
                 embeds.append(unicode(field))
             if getattr(fields[field], 'never_embed', False) and field in embeds:
                 embeds.remove(field)
+        return embeds
+
+    def prefetch_embeds(self, items):
+        """Load the resources embedded by a page of items with one query per model. The loaded objects
+        are kept in the request's object cache, so the embedded views load them without querying the
+        database again.
+
+        Embedded views that list related objects (e.g. a node's contributors) can define a
+        `get_embed_prefetch_keys(view_kwargs)` classmethod returning `{model: primary keys}` of the
+        objects they will list; those are loaded in a second round, once the objects named by the
+        view kwargs are cached.
+
+        :param list items: Objects to be serialized
+        """
+        fields = self.serializer_class._declared_fields
+        keys = defaultdict(set)
+        resolved = []
+        for embed in self.get_embeds():
+            field = fields.get(embed)
+            if not hasattr(field, 'resolve'):
+                continue
+            for item in items:
+                try:
+                    view, _, view_kwargs = field.resolve(item)
+                except Exception:
+                    # Unresolvable embeds are reported when the item is serialized
+                    continue
+                resolved.append((view.cls, view_kwargs))
+                for kwarg, value in view_kwargs.items():
+                    model = EMBED_LOOKUP_MODELS.get(kwarg)
+                    if model is not None and value:
+                        keys[model].add(value)
+        self._load_many(keys)
+
+        related_keys = defaultdict(set)
+        for view_cls, view_kwargs in resolved:
+            get_keys = getattr(view_cls, 'get_embed_prefetch_keys', None)
+            if get_keys is None:
+                continue
+            for model, model_keys in get_keys(view_kwargs).items():
+                related_keys[model].update(model_keys)
+        self._load_many(related_keys)
+
+    def _load_many(self, keys):
+        for model, model_keys in keys.items():
+            if model_keys:
+                # Iterating the queryset populates the object cache
+                list(model.find(Q('_id', 'in', list(model_keys))))
+
+    def paginate_queryset(self, queryset):
+        page = super(JSONAPIBaseView, self).paginate_queryset(queryset)
+        if page is not None:
+            self.prefetch_embeds(page)
+        return page
+
+    def get_serializer_context(self):
+        """Inject request into the serializer context. Additionally, inject partial functions
+        (request, object -> embed items) if the query string contains embeds.  Allows
+         multiple levels of nesting.
+        """
+        context = super(JSONAPIBaseView, self).get_serializer_context()
+        embeds = self.get_embeds()
+        fields = self.serializer_class._declared_fields
         embeds_partials = {}
         for embed in embeds:
             embed_field = fields.get(embed)
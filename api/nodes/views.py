@@ -530,6 +530,14 @@ class NodeContributorsList(JSONAPIBaseView, bulk_views.BulkUpdateJSONAPIView, bu
     view_category = 'nodes'
     view_name = 'node-contributors'
 
+    @classmethod
+    def get_embed_prefetch_keys(cls, view_kwargs):
+        # Lets a page of nodes embedding their contributors load all users at once
+        node = Node.load(view_kwargs.get('node_id'))
+        if node is None:
+            return {}
+        return {User: node.contributors._to_primary_keys()}
+
     def get_default_queryset(self):
         node = self.get_node()
         visible_contributors = node.visible_contributor_ids
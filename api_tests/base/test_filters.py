@@ -12,7 +12,7 @@ from tests.base import ApiTestCase
 from tests import factories
 
 from api.base.settings.defaults import API_BASE
-from api.base.filters import FilterMixin
+from api.base.filters import FilterMixin, ListFilterMixin
 
 from api.base.exceptions import (
     InvalidFilterError,
@@ -39,6 +39,19 @@ class FakeView(FilterMixin):
 
     serializer_class = FakeSerializer
 
+
+class FakeUserSerializer(ser.Serializer):
+
+    filterable_fields = ('full_name', 'bibliographic')
+
+    full_name = ser.CharField(source='fullname')
+    bibliographic = ser.BooleanField()
+
+
+class FakeListView(ListFilterMixin):
+
+    serializer_class = FakeUserSerializer
+
 class TestFilterMixin(ApiTestCase):
 
     def setUp(self):
@@ -227,3 +240,43 @@ class TestFilterMixin(ApiTestCase):
         field = FakeSerializer._declared_fields['float_field']
         value = self.view.convert_value(value, field)
         assert_equal(value, 42.0)
+
+
+class TestListFilterMixin(ApiTestCase):
+
+    def setUp(self):
+        super(TestListFilterMixin, self).setUp()
+        self.view = FakeListView()
+        self.users = [
+            factories.UserFactory(fullname='Freddie Mercury'),
+            factories.UserFactory(fullname='Brian May'),
+            factories.UserFactory(fullname='Roger Taylor'),
+            factories.UserFactory(fullname='Freddie King'),
+        ]
+
+    def test_filters_items_in_memory(self):
+        user_model = type(self.users[0])
+        with mock.patch.object(user_model, 'find', wraps=user_model.find) as mock_find:
+            queryset = self.view.param_queryset({'filter[full_name]': 'freddie'}, self.users)
+        assert_false(mock_find.called)
+        assert_equal(queryset, [self.users[0], self.users[3]])
+
+    def test_order_is_preserved(self):
+        users = list(reversed(self.users))
+        queryset = self.view.param_queryset({'filter[full_name]': 'r'}, users)
+        assert_equal(queryset, [user for user in users if 'r' in user.fullname.lower()])
+
+    def test_view_attribute_filter(self):
+        for user in self.users:
+            user.bibliographic = user is not self.users[1]
+        queryset = self.view.param_queryset({'filter[bibliographic]': 'true'}, self.users)
+        assert_equal(queryset, [self.users[0], self.users[2], self.users[3]])
+
+    def test_multiple_filters_are_combined(self):
+        for user in self.users:
+            user.bibliographic = user is not self.users[0]
+        queryset = self.view.param_queryset(
+            {'filter[full_name]': 'freddie', 'filter[bibliographic]': 'true'},
+            self.users
+        )
+        assert_equal(queryset, [self.users[3]])
@@ -30,4 +30,15 @@ class TestMiddlewareRollback(ApiTestCase):
 
         assert_true(mock_commands.commit.called)
 
-
+    @mock.patch('api.base.middleware.sentry_exception_handler')
+    @mock.patch('api.base.middleware.client_pool')
+    @mock.patch('api.base.middleware.commands')
+    def test_client_is_checked_in_once(self, mock_commands, mock_client_pool, mock_sentry):
+        request = mock.Mock()
+        self.middleware.process_request(request)
+        self.mock_response.status_code = 500
+        self.middleware.process_exception(request, Exception())
+        self.middleware.process_response(request, self.mock_response)
+
+        mock_client_pool.checkin.assert_called_once_with(mock_client_pool.checkout.return_value)
+        assert_false(mock_commands.disconnect.called)
@@ -1,9 +1,12 @@
 from nose.tools import *  # flake8: noqa
 import functools
 
-from framework.auth.core import Auth
+import mock
+
+from framework.auth.core import Auth, User
 
 from api.base.settings.defaults import API_BASE
+from api.nodes.views import NodeDetail
 from tests.base import ApiTestCase
 from tests.factories import (
     ProjectFactory,
@@ -56,6 +59,30 @@ class TestNodeEmbeds(ApiTestCase):
         for contrib in embeds['contributors']['data']:
             assert_in(contrib['id'], ids)
 
+    def test_embed_shared_by_page_is_rendered_once(self):
+        url = '/{0}nodes/{1}/children/?embed=parent'.format(API_BASE, self.root_node._id)
+
+        get_object = NodeDetail.get_object
+        with mock.patch.object(NodeDetail, 'get_object', autospec=True, side_effect=get_object) as mock_get_object:
+            res = self.app.get(url, auth=self.user.auth)
+        assert_equal(len(res.json['data']), 2)
+        for child in res.json['data']:
+            assert_equal(child['embeds']['parent']['data']['id'], self.root_node._id)
+        assert_equal(mock_get_object.call_count, 1)
+
+    def test_embedded_contributors_of_page_are_loaded_together(self):
+        url = '/{0}nodes/{1}/children/?embed=contributors'.format(API_BASE, self.root_node._id)
+
+        with mock.patch.object(User, 'find', wraps=User.find) as mock_find:
+            res = self.app.get(url, auth=self.user.auth)
+        assert_equal(len(res.json['data']), 2)
+        contributor_ids = set(self.child1.contributors._to_primary_keys()) | set(self.child2.contributors._to_primary_keys())
+        user_queries = [
+            set(call[0][0].argument) for call in mock_find.call_args_list
+            if call[0] and getattr(call[0][0], 'attribute', None) == '_id'
+        ]
+        assert_in(contributor_ids, user_queries)
+
     def test_embed_children_filters_unauthorized(self):
         url = '/{0}nodes/{1}/?embed=children'.format(API_BASE, self.root_node)
 
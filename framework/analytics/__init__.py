@@ -1,18 +1,106 @@
 #!/usr/bin/env python
 # encoding: utf-8
 
+import atexit
+import base64
+import struct
+import hashlib
+import logging
 import functools
+import threading
+import collections
 from datetime import datetime
 
+from pymongo.errors import PyMongoError
+
+from framework import sentry
 from framework.mongo import database
 from framework.sessions import session
 
 from flask import request
 
+from website import settings
+
+
+logger = logging.getLogger(__name__)
 
 collection = database['pagecounters']
 
 
+class CounterQueue(object):
+    """Buffer of pending page counter increments. Increments to the same page
+    are summed, and all pending pages are written once
+    `settings.PAGE_COUNTER_FLUSH_INTERVAL` elapses or
+    `settings.PAGE_COUNTER_BATCH_SIZE` pages are pending, so counting a page
+    view does not cost the request a database round trip. Full batches are
+    written from the timer thread too. Counters read back with
+    `get_basic_counters` lag behind by up to one interval.
+
+    When `settings.PAGE_COUNTER_SYNC` is set (e.g. in tests), every increment
+    is written immediately.
+    """
+    def __init__(self):
+        self.pending = collections.OrderedDict()
+        self.lock = threading.RLock()
+        self.timer = None
+        self.timer_interval = None
+
+    def add(self, collection, page, increments):
+        key = (collection.full_name, page)
+        with self.lock:
+            if key not in self.pending:
+                self.pending[key] = (collection, collections.Counter())
+            self.pending[key][1].update(increments)
+            if not settings.PAGE_COUNTER_SYNC:
+                if len(self.pending) >= settings.PAGE_COUNTER_BATCH_SIZE:
+                    self.schedule(0)
+                else:
+                    self.schedule(settings.PAGE_COUNTER_FLUSH_INTERVAL)
+        if settings.PAGE_COUNTER_SYNC:
+            self.flush()
+
+    def schedule(self, interval):
+        """Start the flush timer, or bring a pending one forward to `interval`.
+        Must be called with the lock held.
+        """
+        if self.timer is not None:
+            if self.timer_interval <= interval:
+                return
+            self.timer.cancel()
+        self.timer = threading.Timer(interval, self.flush)
+        self.timer_interval = interval
+        self.timer.daemon = True
+        self.timer.start()
+
+    def flush(self):
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            pending = list(self.pending.items())
+            self.pending.clear()
+        for (_, page), (collection, increments) in pending:
+            try:
+                collection.update(
+                    {'_id': page},
+                    {'$inc': dict(increments)},
+                    upsert=True,
+                    manipulate=False,
+                )
+            except PyMongoError as error:
+                logger.exception(error)
+                sentry.log_exception()
+
+
+counter_queue = CounterQueue()
+atexit.register(counter_queue.flush)
+
+
+def flush():
+    """Write all pending page counter increments."""
+    counter_queue.flush()
+
+
 def increment_user_activity_counters(user_id, action, date, db=None):
     db = db or database  # default to local proxy
     collection = database['useractivitycounters']
@@ -45,6 +133,101 @@ def get_total_activity_count(user_id, db=None):
     return 0
 
 
+class BloomFilter(object):
+    """Fixed-size set of strings that may report false positives but never
+    false negatives. Used to remember visited pages in the session without
+    growing it on every page view.
+
+    :param int size: Number of bits
+    :param int hashes: Number of bits set per item
+    :param bits: Existing filter contents, as returned by `dumps`
+    """
+    def __init__(self, size, hashes, bits=None):
+        self.size = size
+        self.hashes = hashes
+        if bits is None:
+            self.bits = bytearray((size + 7) // 8)
+        else:
+            self.bits = bytearray(base64.b64decode(bits))
+
+    def _positions(self, item):
+        if isinstance(item, unicode):
+            item = item.encode('utf-8')
+        # Double hashing: derive all positions from two halves of one digest
+        first, second = struct.unpack('<QQ', hashlib.md5(item).digest())
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def __contains__(self, item):
+        return all(
+            self.bits[position // 8] & (1 << (position % 8))
+            for position in self._positions(item)
+        )
+
+    def add(self, item):
+        """Add `item` to the filter.
+
+        :returns: `False` if the item was (probably) already present
+        """
+        added = False
+        for position in self._positions(item):
+            mask = 1 << (position % 8)
+            if not self.bits[position // 8] & mask:
+                self.bits[position // 8] |= mask
+                added = True
+        return added
+
+    def dumps(self):
+        return base64.b64encode(bytes(self.bits))
+
+    @classmethod
+    def loads(cls, value, size, hashes):
+        """Load a filter stored in the session. Lists of pages stored by
+        earlier versions are converted; anything else, including filters of
+        another size, gives an empty filter.
+        """
+        if isinstance(value, basestring):
+            bloom = cls(size, hashes, value)
+            if len(bloom.bits) == (size + 7) // 8:
+                return bloom
+            value = None
+        bloom = cls(size, hashes)
+        for item in value or []:
+            bloom.add(item)
+        return bloom
+
+
+class VisitedPages(object):
+    """Pages visited by a session, as stored in the session: a list of pages
+    while it holds at most `settings.PAGE_COUNTER_EXACT_PAGES`, and a
+    `BloomFilter` of `size` bits after that.
+    """
+    def __init__(self, value, size):
+        self.size = size
+        if isinstance(value, basestring):
+            self.pages = BloomFilter.loads(value, size, settings.PAGE_COUNTER_FILTER_HASHES)
+        else:
+            self.pages = list(value or [])
+
+    def add(self, page):
+        """Add `page`.
+
+        :returns: `False` if the page was (probably) already visited
+        """
+        if isinstance(self.pages, BloomFilter):
+            return self.pages.add(page)
+        if page in self.pages:
+            return False
+        self.pages.append(page)
+        if len(self.pages) > settings.PAGE_COUNTER_EXACT_PAGES:
+            self.pages = BloomFilter.loads(self.pages, self.size, settings.PAGE_COUNTER_FILTER_HASHES)
+        return True
+
+    def dumps(self):
+        if isinstance(self.pages, BloomFilter):
+            return self.pages.dumps()
+        return self.pages
+
+
 def clean_page(page):
     return page.replace(
         '.', '_'
@@ -88,33 +271,25 @@ def update_counter(page, db=None):
 
     d = {'$inc': {}}
 
-    visited_by_date = session.data.get('visited_by_date')
-    if not visited_by_date:
-        visited_by_date = {'date': date, 'pages': []}
-
-    if date == visited_by_date['date']:
-        if page not in visited_by_date['pages']:
-            d['$inc']['date.%s.unique' % date] = 1
-            visited_by_date['pages'].append(page)
-            session.data['visited_by_date'] = visited_by_date
-    else:
-        visited_by_date['date'] = date
-        visited_by_date['pages'] = []
+    visited_by_date = session.data.get('visited_by_date') or {}
+    pages = VisitedPages(
+        visited_by_date.get('pages') if visited_by_date.get('date') == date else None,
+        settings.PAGE_COUNTER_DAILY_FILTER_BITS,
+    )
+    # Only touch the session when a page is new, so that repeated views leave
+    # it unchanged and it need not be saved
+    if pages.add(page):
         d['$inc']['date.%s.unique' % date] = 1
-        visited_by_date['pages'].append(page)
-        session.data['visited_by_date'] = visited_by_date
+        session.data['visited_by_date'] = {'date': date, 'pages': pages.dumps()}
 
     d['$inc']['date.%s.total' % date] = 1
 
-    visited = session.data.get('visited')  # '/project/x/, project/y/'
-    if not visited:
-        visited = []
-    if page not in visited:
+    visited = VisitedPages(session.data.get('visited'), settings.PAGE_COUNTER_FILTER_BITS)
+    if visited.add(page):
         d['$inc']['unique'] = 1
-        visited.append(page)
-        session.data['visited'] = visited
+        session.data['visited'] = visited.dumps()
     d['$inc']['total'] = 1
-    collection.update({'_id': page}, d, True, False)
+    counter_queue.add(collection, page, d['$inc'])
 
 
 def update_counters(rex, db=None):
@@ -30,3 +30,12 @@ def update_node(self, node_id, updated_fields=None):
         piwik._update_node_object(node, updated_fields)
     except Exception as error:
         raise self.retry(exc=error)
+
+
+def update_nodes(node_ids):
+    """Provision or update the Piwik sites of several nodes, e.g. every node
+    of a newly forked or registered tree. Each node is updated by its own
+    task, so a failure only rolls back and retries that node.
+    """
+    for node_id in node_ids:
+        update_node(node_id)
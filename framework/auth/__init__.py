@@ -3,6 +3,7 @@
 from datetime import datetime
 
 from framework.sessions import session, create_session, Session
+from framework.sessions.utils import uncache_sessions
 from modularodm import Q
 from framework import bcrypt
 from framework.auth import signals
@@ -55,6 +56,7 @@ def logout():
         except KeyError:
             pass
     Session.remove(Q('_id', 'eq', session._id))
+    uncache_sessions(session._id)
     return True
 
 
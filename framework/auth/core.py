@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 import datetime as dt
-import itertools
+import heapq
 import logging
 import re
 import urlparse
@@ -175,6 +175,7 @@ class User(GuidStoredObject, AddonModelMixin):
 
     # Node fields that trigger an update to the search engine on save
     SEARCH_UPDATE_FIELDS = {
+        'username',  # gravatar_url is derived from it
         'fullname',
         'given_name',
         'middle_names',
@@ -1080,11 +1081,13 @@ class User(GuidStoredObject, AddonModelMixin):
         :param save: Whether to save the user.
 
         """
+        from website.project import stats as node_stats
         watched_nodes = [each.node for each in self.watched]
         if watch_config.node in watched_nodes:
             raise ValueError('Node is already being watched.')
         watch_config.save()
         self.watched.append(watch_config)
+        node_stats.increment(watch_config.node, 'watchers')
         return None
 
     def unwatch(self, watch_config):
@@ -1095,9 +1098,11 @@ class User(GuidStoredObject, AddonModelMixin):
         :param save: Whether to save the user.
 
         """
+        from website.project import stats as node_stats
         for each in self.watched:
             if watch_config.node._id == each.node._id:
                 each.__class__.remove_one(each)
+                node_stats.increment(watch_config.node, 'watchers', -1)
                 return None
         raise ValueError('Node not being watched.')
 
@@ -1106,6 +1111,12 @@ class User(GuidStoredObject, AddonModelMixin):
         watched_node_ids = set([config.node._id for config in self.watched])
         return node._id in watched_node_ids
 
+    def _get_recent_logs_since(self, since=None):
+        # Default since to 60 days before today if since is None
+        # timezone aware utcnow
+        utcnow = dt.datetime.utcnow().replace(tzinfo=pytz.utc)
+        return since or (utcnow - dt.timedelta(days=60))
+
     def get_recent_log_ids(self, since=None):
         '''Return a generator of recent logs' ids.
 
@@ -1115,22 +1126,25 @@ class User(GuidStoredObject, AddonModelMixin):
 
         :rtype: generator of log ids (strings)
         '''
-        log_ids = []
-        # Default since to 60 days before today if since is None
-        # timezone aware utcnow
-        utcnow = dt.datetime.utcnow().replace(tzinfo=pytz.utc)
-        since_date = since or (utcnow - dt.timedelta(days=60))
-        for config in self.watched:
-            # Extract the timestamps for each log from the log_id (fast!)
-            # The first 4 bytes of Mongo's ObjectId encodes time
-            # This prevents having to load each Log Object and access their
-            # date fields
-            node_log_ids = [log_id for log_id in config.node.logs._to_primary_keys()
-                                   if bson.ObjectId(log_id).generation_time > since_date and
-                                   log_id not in log_ids]
-            # Log ids in reverse chronological order
-            log_ids = _merge_into_reversed(log_ids, node_log_ids)
-        return (l_id for l_id in log_ids)
+        # The first 4 bytes of Mongo's ObjectId encode time, so comparing ids
+        # to an id generated at `since` avoids loading the logs
+        since_id = str(bson.ObjectId.from_datetime(self._get_recent_logs_since(since)))
+        return _merge_into_reversed(*[
+            _iter_log_ids_since(config.node.logs._to_primary_keys(), since_id)
+            for config in self.watched
+        ])
+
+    def get_recent_logs_query(self, since=None):
+        '''Return a query for the logs of watched nodes since `since`, newest
+        first. Uses the nodelog (logged backref, _id) index.
+
+        :param since: See `get_recent_log_ids`
+        '''
+        from website.project.model import NodeLog
+        return NodeLog.find_for_nodes(
+            [config.node._id for config in self.watched],
+            since=self._get_recent_logs_since(since),
+        )
 
     def get_daily_digest_log_ids(self):
         '''Return a generator of log ids generated in the past day
@@ -1319,7 +1333,33 @@ class User(GuidStoredObject, AddonModelMixin):
         return len(self.get_projects_in_common(other_user, primary_keys=True))
 
 
+def _iter_log_ids_since(log_ids, since_id):
+    '''Iterate a node's log ids newer than `since_id`, newest first. Logs are
+    appended to a node in creation order, but lists rebuilt by migrations need
+    not be, so every id is checked.
+    '''
+    return iter(sorted((log_id for log_id in log_ids if log_id > since_id), reverse=True))
+
+
 def _merge_into_reversed(*iterables):
-    '''Merge multiple sorted inputs into a single output in reverse order.
+    '''Lazily merge inputs that are each in reverse ObjectId order into a
+    single output in reverse order, dropping duplicate ids.
     '''
-    return sorted(itertools.chain(*iterables), reverse=True)
+    iterators = [iter(iterable) for iterable in iterables]
+    heap = []
+    for index, iterator in enumerate(iterators):
+        for log_id in iterator:
+            heap.append((-int(log_id, 16), log_id, index))
+            break
+    heapq.heapify(heap)
+    last = None
+    while heap:
+        _, log_id, index = heap[0]
+        if log_id != last:
+            yield log_id
+            last = log_id
+        for next_id in iterators[index]:
+            heapq.heapreplace(heap, (-int(next_id, 16), next_id, index))
+            break
+        else:
+            heapq.heappop(heap)
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""In-process caches shared by the OSF and its API."""
+
+import time
+import threading
+import collections
+
+
+_missing = object()
+
+
+class LRUCache(object):
+    """Thread-safe mapping that holds at most `maxsize` entries, evicting the
+    least recently used entry when full. If `ttl` is given, entries older than
+    `ttl` seconds are treated as missing.
+
+    :param int maxsize: Maximum number of entries
+    :param ttl: Lifetime of an entry in seconds, or `None` for no expiry
+    """
+    def __init__(self, maxsize=1024, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stats = collections.Counter()
+        self._data = collections.OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return self.get(key, _missing) is not _missing
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                stored, value = self._data.pop(key)
+            except KeyError:
+                self.stats['misses'] += 1
+                return default
+            if self.ttl is not None and time.time() - stored > self.ttl:
+                self.stats['misses'] += 1
+                return default
+            # Re-insert to mark as most recently used
+            self._data[key] = (stored, value)
+            self.stats['hits'] += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (time.time(), value)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
@@ -1,27 +1,15 @@
-import smtplib
 import logging
 from email.mime.text import MIMEText
 
 from framework.tasks import app
+from framework.email import transport
 from website import settings
 
 logger = logging.getLogger(__name__)
 
 
-@app.task
-def send_email(from_addr, to_addr, subject, message, mimetype='html', ttls=True, login=True,
-                username=None, password=None, mail_server=None):
-    """Send email to specified destination.
-    Email is sent from the email specified in FROM_EMAIL settings in the
-    settings module.
-
-    :param from_addr: A string, the sender email
-    :param to_addr: A string, the recipient
-    :param subject: subject of email
-    :param message: body of message
-
-    :return: True if successful
-    """
+def _send(from_addr, to_addr, subject, message, mimetype='html', ttls=True, login=True,
+          username=None, password=None, mail_server=None):
     username = username or settings.MAIL_USERNAME
     password = password or settings.MAIL_PASSWORD
     mail_server = mail_server or settings.MAIL_SERVER
@@ -37,17 +25,49 @@ def send_email(from_addr, to_addr, subject, message, mimetype='html', ttls=True,
     msg['From'] = from_addr
     msg['To'] = to_addr
 
-    s = smtplib.SMTP(mail_server)
-    s.ehlo()
-    if ttls:
-        s.starttls()
-        s.ehlo()
-    if login:
-        s.login(username, password)
-    s.sendmail(
+    smtp = transport.get_transport(mail_server, username, password, ttls=ttls, login=login)
+    return smtp.send(
         from_addr=from_addr,
         to_addrs=[to_addr],
         msg=msg.as_string()
     )
-    s.quit()
-    return True
+
+
+@app.task
+def send_email(from_addr, to_addr, subject, message, mimetype='html', ttls=True, login=True,
+                username=None, password=None, mail_server=None):
+    """Send email to specified destination.
+    Email is sent from the email specified in FROM_EMAIL settings in the
+    settings module.
+
+    :param from_addr: A string, the sender email
+    :param to_addr: A string, the recipient
+    :param subject: subject of email
+    :param message: body of message
+
+    :return: True if successful
+    """
+    return _send(
+        from_addr, to_addr, subject, message, mimetype=mimetype, ttls=ttls, login=login,
+        username=username, password=password, mail_server=mail_server
+    )
+
+
+@app.task
+def send_emails(messages):
+    """Send several emails over the worker's SMTP connection. A message that
+    fails to send is logged and does not stop the rest of the batch.
+
+    :param list messages: Keyword arguments for `send_email`, one dict per message
+
+    :return: Number of messages sent
+    """
+    sent = 0
+    for kwargs in messages:
+        try:
+            if _send(**kwargs):
+                sent += 1
+        except Exception:
+            logger.exception('Failed to send email to {0}'.format(kwargs.get('to_addr')))
+    logger.info('Sent {0} of {1} emails'.format(sent, len(messages)))
+    return sent
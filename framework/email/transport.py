@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""Reusable SMTP connections for sending mail from worker processes."""
+
+import os
+import time
+import smtplib
+import logging
+import threading
+import collections
+
+from website import settings
+
+logger = logging.getLogger(__name__)
+
+# Errors after which the connection is re-opened and the message sent again
+RETRY_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, IOError)
+
+
+class SMTPTransport(object):
+    """An authenticated SMTP connection kept open between messages, so that
+    sending many emails does not pay for a TCP handshake, STARTTLS and login
+    per message. The connection is re-opened when the server drops it, after
+    `settings.MAIL_MAX_MESSAGES_PER_CONNECTION` messages, and when it has been
+    idle for longer than `settings.MAIL_CONNECTION_IDLE_TIMEOUT` seconds.
+
+    Counters for connections, messages and send time are kept in `stats`.
+    """
+    def __init__(self, mail_server, username=None, password=None, ttls=True, login=True):
+        self.mail_server = mail_server
+        self.username = username
+        self.password = password
+        self.ttls = ttls
+        self.login = login
+        self.stats = collections.Counter()
+        self.connection = None
+        self.lock = threading.Lock()
+        self._messages_sent = 0
+        self._last_used = None
+
+    @property
+    def throughput(self):
+        """Messages sent per second spent sending."""
+        if not self.stats['send_seconds']:
+            return 0.0
+        return self.stats['messages'] / self.stats['send_seconds']
+
+    def connect(self):
+        self.close()
+        connection = smtplib.SMTP(self.mail_server)
+        connection.ehlo()
+        if self.ttls:
+            connection.starttls()
+            connection.ehlo()
+        if self.login:
+            connection.login(self.username, self.password)
+        self.connection = connection
+        self._messages_sent = 0
+        self.stats['connections'] += 1
+
+    def close(self):
+        if self.connection is None:
+            return
+        try:
+            self.connection.quit()
+        except (smtplib.SMTPException, IOError):
+            pass
+        self.connection = None
+
+    def _is_stale(self):
+        if self.connection is None:
+            return True
+        if self._messages_sent >= settings.MAIL_MAX_MESSAGES_PER_CONNECTION:
+            return True
+        return time.time() - self._last_used > settings.MAIL_CONNECTION_IDLE_TIMEOUT
+
+    def send(self, from_addr, to_addrs, msg):
+        """Send one message, reconnecting and retrying once if the connection
+        was dropped.
+
+        :param str from_addr: The sender email
+        :param list to_addrs: The recipients
+        :param str msg: The message, as a string
+        """
+        with self.lock:
+            start = time.time()
+            for attempt in range(2):
+                try:
+                    if self._is_stale():
+                        self.connect()
+                    self.connection.sendmail(from_addr=from_addr, to_addrs=to_addrs, msg=msg)
+                    break
+                except RETRY_ERRORS:
+                    self.connection = None
+                    self.stats['reconnects'] += 1
+                    if attempt:
+                        self.stats['failures'] += 1
+                        raise
+            self._messages_sent += 1
+            self._last_used = time.time()
+            self.stats['messages'] += 1
+            self.stats['send_seconds'] += self._last_used - start
+            return True
+
+
+_transports = {}
+_transports_pid = None
+_transports_lock = threading.Lock()
+
+
+def get_transport(mail_server, username=None, password=None, ttls=True, login=True):
+    """Return the transport of the current process for the given server and
+    credentials. Transports are not shared with forked children.
+    """
+    global _transports_pid
+    key = (mail_server, username, password, ttls, login)
+    with _transports_lock:
+        if _transports_pid != os.getpid():
+            _transports.clear()
+            _transports_pid = os.getpid()
+        if key not in _transports:
+            _transports[key] = SMTPTransport(mail_server, username, password, ttls=ttls, login=login)
+        return _transports[key]
+
+
+def close_transports():
+    with _transports_lock:
+        if _transports_pid == os.getpid():
+            for transport in _transports.values():
+                transport.close()
+        _transports.clear()
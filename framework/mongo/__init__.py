@@ -1,11 +1,14 @@
 # -*- coding: utf-8 -*-
 
+import collections
+
 from flask import request
+from modularodm import Q
 from modularodm.storedobject import StoredObject as GenericStoredObject
 from modularodm.ext.concurrency import with_proxies, proxied_members
 
 from bson import ObjectId
-from .handlers import client, database, set_up_storage
+from .handlers import client, client_pool, database, set_up_storage
 
 
 from api.base.api_globals import api_globals
@@ -31,15 +34,73 @@ def get_cache_key():
             return dummy_request
 
 
+# Request-local counters of identity map hits and misses (each of which costs
+# a query by primary key) and of `find` queries
+proxied_members = dict(proxied_members, _load_stats=collections.Counter)
+
+
 @with_proxies(proxied_members, get_cache_key)
 class StoredObject(GenericStoredObject):
-    pass
+    """Base model. The object cache of each schema is keyed on the current
+    request and acts as an identity map: loading a record that was already
+    loaded during the request returns the same instance without a query.
+    """
+
+    @classmethod
+    def load(cls, key=None, data=None, **kwargs):
+        if key is not None and data is None:
+            if cls._load_from_cache(cls._check_pk_type(key)) is None:
+                cls._load_stats['misses'] += 1
+            else:
+                cls._load_stats['hits'] += 1
+        return super(StoredObject, cls).load(key=key, data=data, **kwargs)
+
+    @classmethod
+    def load_many(cls, keys):
+        """Load records by primary key, fetching those not yet in the identity
+        map with a single query.
+
+        :param keys: Iterable of primary keys
+        :returns: List of records in the order of `keys`; keys that do not
+            exist are skipped
+        """
+        keys = [cls._check_pk_type(key) for key in keys]
+        missing = [
+            key for key in collections.OrderedDict.fromkeys(keys)
+            if cls._load_from_cache(key) is None
+        ]
+        cls._load_stats['hits'] += len(keys) - len(missing)
+        if missing:
+            cls._load_stats['misses'] += len(missing)
+            # Iterating the results adds each record to the identity map
+            list(cls.find(Q(cls._primary_name, 'in', missing)))
+        records = (cls._load_from_cache(key) for key in keys)
+        return [record for record in records if record is not None]
+
+    @classmethod
+    def find(cls, query=None, **kwargs):
+        cls._load_stats['finds'] += 1
+        return super(StoredObject, cls).find(query, **kwargs)
+
+    @classmethod
+    def find_one(cls, query=None, **kwargs):
+        cls._load_stats['finds'] += 1
+        return super(StoredObject, cls).find_one(query, **kwargs)
+
+
+def get_load_stats():
+    """Return identity map hits and misses and `find` queries counted for the
+    current request.
+    """
+    return collections.Counter(StoredObject._load_stats)
 
 
 __all__ = [
     'StoredObject',
     'ObjectId',
+    'get_load_stats',
     'client',
+    'client_pool',
     'database',
     'set_up_storage',
 ]
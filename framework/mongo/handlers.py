@@ -1,21 +1,31 @@
 # -*- coding: utf-8 -*-
 
+import os
 import logging
+import threading
+import collections
 
 import pymongo
-from flask import g
+from flask import g, request
 from werkzeug.local import LocalProxy
 
 from website import settings
 
+from . import profiler
+
 
 logger = logging.getLogger(__name__)
 
 
 def get_mongo_client():
-    """Create MongoDB client and authenticate database.
+    """Create MongoDB client and authenticate database. Credentials are cached
+    on the client, so every socket in its pool is authenticated on first use.
     """
-    client = pymongo.MongoClient(settings.DB_HOST, settings.DB_PORT)
+    client = pymongo.MongoClient(
+        settings.DB_HOST,
+        settings.DB_PORT,
+        max_pool_size=settings.DB_MAX_POOL_SIZE,
+    )
 
     db = client[settings.DB_NAME]
 
@@ -25,46 +35,126 @@ def get_mongo_client():
     return client
 
 
+class ClientPool(object):
+    """Process-wide MongoDB client with a pool of warm connections. A new
+    client is built lazily the first time it is used in each process, so
+    workers forked by gunicorn or celery never share sockets with their parent.
+
+    Each request checks out the client with ``start_request``, which pins one
+    pooled socket to the current thread for the lifetime of the request (TokuMX
+    transactions are bound to a single connection); checking it back in
+    returns the socket to the pool instead of closing it.
+
+    :param client_factory: Callable returning a new `MongoClient`
+    """
+    def __init__(self, client_factory=get_mongo_client):
+        self.client_factory = client_factory
+        self.stats = collections.Counter()
+        self._client = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        pid = os.getpid()
+        if self._client is None or self._pid != pid:
+            with self._lock:
+                if self._client is None or self._pid != pid:
+                    if self._client is not None:
+                        # Inherited from the parent process; drop the reference
+                        # without closing sockets the parent is still using
+                        logger.debug('Process forked; creating new MongoDB client')
+                        self.stats['forks'] += 1
+                    self._client = self.client_factory()
+                    self._pid = pid
+                    self.stats['connects'] += 1
+        return self._client
+
+    def checkout(self):
+        """Pin a pooled socket to the current thread and return the client.
+        """
+        client = self.client
+        client.start_request()
+        self.stats['checkouts'] += 1
+        return client
+
+    def checkin(self, client=None):
+        """Return the socket pinned to the current thread to the pool.
+        """
+        client = client or self.client
+        client.end_request()
+        self.stats['checkins'] += 1
+
+    def reset(self):
+        """Close the current client; the next access creates a new one.
+        """
+        with self._lock:
+            if self._client is not None and self._pid == os.getpid():
+                self._client.close()
+            self._client = None
+            self._pid = None
+
+
+client_pool = ClientPool()
+
+
 def connection_before_request():
-    """Attach MongoDB client to `g`.
+    """Attach the pooled MongoDB client to `g`.
     """
-    g._mongo_client = get_mongo_client()
+    g._mongo_client = client_pool.checkout()
 
 
 def connection_teardown_request(error=None):
-    """Close MongoDB client if attached to `g`.
+    """Return the connection used by the request to the pool.
     """
     try:
-        g._mongo_client.close()
+        client_pool.checkin(g._mongo_client)
     except AttributeError:
         if not settings.DEBUG_MODE:
             logger.error('MongoDB client not attached to request.')
 
 
+def load_stats_after_request(response):
+    """Log the identity map hits and misses and `find` queries of the
+    request, and report them in the `X-OSF-Load-Stats` header in debug mode.
+    """
+    from framework.mongo import get_load_stats
+    stats = get_load_stats()
+    summary = 'hits={hits}; misses={misses}; finds={finds}'.format(
+        hits=stats['hits'],
+        misses=stats['misses'],
+        finds=stats['finds'],
+    )
+    logger.debug('{0} {1}: {2}'.format(request.method, request.path, summary))
+    if settings.DEBUG_MODE:
+        response.headers['X-OSF-Load-Stats'] = summary
+    return response
+
+
 handlers = {
     'before_request': connection_before_request,
+    'after_request': load_stats_after_request,
     'teardown_request': connection_teardown_request,
 }
 
 
-# Set up getters for `LocalProxy` objects
-_mongo_client = get_mongo_client()
-
-
 def _get_current_client():
-    """Getter for `client` proxy. Return default client if no client attached
-    to `g` or no request context.
+    """Getter for `client` proxy. Return the process-wide client if no client
+    attached to `g` or no request context.
     """
     try:
         return g._mongo_client
     except (AttributeError, RuntimeError):
-        return _mongo_client
+        return client_pool.client
 
 
 def _get_current_database():
     """Getter for `database` proxy.
     """
-    return _get_current_client()[settings.DB_NAME]
+    database = _get_current_client()[settings.DB_NAME]
+    if settings.QUERY_PROFILER_ENABLED:
+        return profiler.ProfiledDatabase(database)
+    return database
 
 
 # Set up `LocalProxy` objects
@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+"""Per-request profiling of MongoDB operations.
+
+When `settings.QUERY_PROFILER_ENABLED` is set, the `database` proxy returns a
+`ProfiledDatabase`, whose collections count and time every operation made
+while a profile is active on the current thread. Web and API requests start
+and finish a profile; finished profiles are stored in a capped collection and
+summarized with `invoke query_report`.
+
+Note: `find` returns a lazy cursor, so its recorded time does not include
+fetching results; the time is still part of the request's duration.
+"""
+
+import json
+import time
+import heapq
+import logging
+import datetime
+import functools
+import threading
+import collections
+
+from flask import request
+from pymongo.collection import Collection
+from pymongo.errors import CollectionInvalid, PyMongoError
+
+from website import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Collection methods that send a command to the database
+PROFILED_OPERATIONS = frozenset([
+    'find', 'find_one', 'count', 'distinct', 'aggregate', 'group',
+    'map_reduce', 'inline_map_reduce', 'find_and_modify',
+    'insert', 'save', 'update', 'remove',
+])
+
+# Operations whose first argument is a document to write rather than a query
+WRITE_OPERATIONS = frozenset(['insert', 'save'])
+
+_local = threading.local()
+
+
+def query_shape(spec):
+    """Replace the values in a query with placeholders, so that queries that
+    differ only in their values have the same shape.
+    """
+    if isinstance(spec, dict):
+        return dict((key, query_shape(value)) for key, value in spec.items())
+    if isinstance(spec, (list, tuple)) and spec and all(isinstance(each, dict) for each in spec):
+        return [query_shape(each) for each in spec]
+    return '?'
+
+
+class Profile(object):
+    """Operations made while handling one request.
+
+    :param str endpoint: Name of the view
+    :param str method: HTTP method
+    :param str path: Request path
+    """
+    def __init__(self, endpoint, method=None, path=None):
+        self.endpoint = endpoint
+        self.method = method
+        self.path = path
+        self.queries = []
+        self.started = time.time()
+        self.duration = None
+
+    def record(self, collection, operation, spec, duration):
+        self.queries.append({
+            'collection': collection,
+            'operation': operation,
+            'shape': json.dumps(query_shape(spec), sort_keys=True),
+            'duration': duration,
+        })
+
+    @property
+    def query_count(self):
+        return len(self.queries)
+
+    @property
+    def query_time(self):
+        return sum(query['duration'] for query in self.queries)
+
+    def finish(self):
+        self.duration = time.time() - self.started
+
+    def to_storage(self):
+        slowest = heapq.nlargest(
+            settings.QUERY_PROFILER_MAX_QUERIES,
+            self.queries,
+            key=lambda query: query['duration'],
+        )
+        return {
+            'endpoint': self.endpoint,
+            'method': self.method,
+            'path': self.path,
+            'date': datetime.datetime.utcnow(),
+            'duration': self.duration,
+            'query_count': self.query_count,
+            'query_time': self.query_time,
+            'queries': slowest,
+        }
+
+
+class ProfiledCollection(object):
+    """Wrapper around a pymongo `Collection` that records its operations in
+    the current profile.
+    """
+    def __init__(self, collection):
+        self._collection = collection
+
+    def __getitem__(self, name):
+        return self._collection[name]
+
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+        if name not in PROFILED_OPERATIONS:
+            return attr
+
+        @functools.wraps(attr)
+        def profiled(*args, **kwargs):
+            profile = current()
+            if profile is None:
+                return attr(*args, **kwargs)
+            if name in WRITE_OPERATIONS:
+                spec = None
+            else:
+                spec = args[0] if args else kwargs.get('spec')
+            start = time.time()
+            try:
+                return attr(*args, **kwargs)
+            finally:
+                profile.record(self._collection.name, name, spec, time.time() - start)
+        return profiled
+
+
+class ProfiledDatabase(object):
+    """Wrapper around a pymongo `Database` whose collections are profiled.
+    """
+    def __init__(self, database):
+        self._database = database
+
+    def __getitem__(self, name):
+        return ProfiledCollection(self._database[name])
+
+    def __getattr__(self, name):
+        attr = getattr(self._database, name)
+        if isinstance(attr, Collection):
+            return ProfiledCollection(attr)
+        return attr
+
+
+def start(endpoint, method=None, path=None):
+    """Start profiling operations made by the current thread."""
+    _local.profile = Profile(endpoint, method=method, path=path)
+    return _local.profile
+
+
+def current():
+    return getattr(_local, 'profile', None)
+
+
+def finish():
+    """Stop profiling the current thread and store the profile.
+
+    :returns: The finished `Profile`, or `None` if none was started
+    """
+    profile = current()
+    if profile is None:
+        return None
+    _local.profile = None
+    profile.finish()
+    save(profile)
+    return profile
+
+
+_collection_ready = False
+
+
+def get_collection():
+    """Return the capped collection of stored profiles, creating it if needed.
+    """
+    global _collection_ready
+    from framework.mongo import database
+    if not _collection_ready:
+        try:
+            database.create_collection(
+                settings.QUERY_PROFILER_COLLECTION,
+                capped=True,
+                size=settings.QUERY_PROFILER_COLLECTION_SIZE,
+            )
+        except CollectionInvalid:
+            pass
+        _collection_ready = True
+    return database[settings.QUERY_PROFILER_COLLECTION]
+
+
+def save(profile):
+    try:
+        get_collection().insert(profile.to_storage(), w=0)
+    except PyMongoError as error:
+        logger.exception(error)
+
+
+def get_report(top=20):
+    """Summarize stored profiles.
+
+    :param int top: Number of slowest requests to return
+    :returns: Tuple of per-endpoint totals, ordered by total time, and the
+        slowest requests
+    """
+    endpoints = collections.defaultdict(collections.Counter)
+    slowest = []
+    for profile in get_collection().find():
+        totals = endpoints[profile['endpoint']]
+        totals['requests'] += 1
+        totals['queries'] += profile['query_count']
+        totals['query_time'] += profile['query_time']
+        totals['duration'] += profile['duration']
+        item = (profile['duration'], profile['_id'], profile)
+        if len(slowest) < top:
+            heapq.heappush(slowest, item)
+        else:
+            heapq.heappushpop(slowest, item)
+    endpoints = sorted(
+        endpoints.items(),
+        key=lambda item: item[1]['duration'],
+        reverse=True,
+    )
+    return endpoints, [item[2] for item in sorted(slowest, reverse=True)]
+
+
+def print_report(top=20):
+    endpoints, slowest = get_report(top=top)
+    print('{0:<50} {1:>8} {2:>12} {3:>12} {4:>12}'.format(
+        'Endpoint', 'Requests', 'Queries/req', 'Query ms/req', 'Total ms/req'
+    ))
+    for endpoint, totals in endpoints:
+        requests = float(totals['requests'])
+        print('{0:<50} {1:>8} {2:>12.1f} {3:>12.1f} {4:>12.1f}'.format(
+            endpoint,
+            totals['requests'],
+            totals['queries'] / requests,
+            totals['query_time'] * 1000 / requests,
+            totals['duration'] * 1000 / requests,
+        ))
+    print('')
+    print('Slowest requests')
+    for profile in slowest:
+        print('{0:.1f} ms {1} {2} ({3}), {4} queries in {5:.1f} ms'.format(
+            profile['duration'] * 1000,
+            profile['method'],
+            profile['path'],
+            profile['endpoint'],
+            profile['query_count'],
+            profile['query_time'] * 1000,
+        ))
+        for query in profile['queries']:
+            print('    {0:.1f} ms {1}.{2} {3}'.format(
+                query['duration'] * 1000,
+                query['collection'],
+                query['operation'],
+                query['shape'],
+            ))
+
+
+def clear():
+    """Remove stored profiles."""
+    global _collection_ready
+    from framework.mongo import database
+    database.drop_collection(settings.QUERY_PROFILER_COLLECTION)
+    _collection_ready = False
+
+
+def profile_before_request():
+    if settings.QUERY_PROFILER_ENABLED:
+        start(request.endpoint or '<unknown>', method=request.method, path=request.path)
+
+
+def profile_after_request(response):
+    profile = finish()
+    if profile is not None and settings.DEBUG_MODE:
+        response.headers['X-OSF-Query-Count'] = str(profile.query_count)
+    return response
+
+
+handlers = {
+    'before_request': profile_before_request,
+    'after_request': profile_after_request,
+}
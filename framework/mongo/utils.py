@@ -62,6 +62,51 @@ def unique_on(*groups):
         return cls
     return wrapper
 
+def bulk_set_references(record, field_name, values):
+    """Set a foreign list field on a saved record, and the matching
+    back-references on the records it refers to, with one update per
+    collection rather than one save per referenced record. The record and the
+    referenced records are evicted from the cache; reload the record before
+    using it again.
+
+    :param StoredObject record: Saved record whose field is currently empty
+    :param str field_name: Name of a foreign list field with a back-reference
+    :param list values: Referenced records, or their stored values
+    """
+    field = record._fields[field_name]
+    stored = field.to_storage(values)
+    if not stored:
+        return
+    schema = type(record)
+    schema._storage[0].store.update(
+        {schema._primary_name: record._primary_key},
+        {'$set': {field_name: stored}},
+    )
+    schema._clear_caches(record._primary_key)
+
+    foreign = field._field_instance
+    backref = '__backrefs.{0}.{1}.{2}'.format(foreign._backref_field_name, schema._name, field_name)
+    if getattr(foreign, '_is_abstract', False):
+        # Abstract references are stored as (key, schema name) pairs
+        keys_by_schema = {}
+        for key, name in stored:
+            keys_by_schema.setdefault(name, []).append(key)
+        targets = [
+            (foreign.get_schema_class(name), keys)
+            for name, keys in keys_by_schema.items()
+        ]
+    else:
+        targets = [(foreign.base_class, stored)]
+    for target, keys in targets:
+        target._storage[0].store.update(
+            {target._primary_name: {'$in': keys}},
+            {'$addToSet': {backref: record._primary_key}},
+            multi=True,
+        )
+        for key in keys:
+            target._clear_caches(key)
+
+
 def get_or_http_error(Model, pk_or_query, allow_deleted=False, display_name=None):
     """Load an instance of Model by primary key or modularodm.Q query. Raise an appropriate
     HTTPError if no record is found or if the query fails to find a unique record
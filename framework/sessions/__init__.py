@@ -19,6 +19,7 @@ from framework.mongo import database
 from website import settings
 
 from .model import Session
+from .utils import load_session, cache_session
 
 
 def add_key_to_url(url, scheme, key):
@@ -99,11 +100,15 @@ def create_session(response, data=None):
     if current_session:
         current_session.data.update(data or {})
         current_session.save()
+        current_session.snapshot()
+        cache_session(current_session)
         cookie_value = itsdangerous.Signer(settings.SECRET_KEY).sign(current_session._id)
     else:
         session_id = str(bson.objectid.ObjectId())
         session = Session(_id=session_id, data=data or {})
         session.save()
+        session.snapshot()
+        cache_session(session)
         cookie_value = itsdangerous.Signer(settings.SECRET_KEY).sign(session_id)
         set_session(session)
     if response is not None:
@@ -173,15 +178,18 @@ def before_request():
     if cookie:
         try:
             session_id = itsdangerous.Signer(settings.SECRET_KEY).unsign(cookie)
-            session = Session.load(session_id) or Session(_id=session_id)
+            session = load_session(session_id) or Session(_id=session_id)
         except itsdangerous.BadData:
             return
+        session.snapshot()
         if session.data.get('auth_user_id'):
             database['user'].update({'_id': session.data.get('auth_user_id')}, {'$set': {'date_last_login': datetime.utcnow()}}, w=0)
         set_session(session)
 
 def after_request(response):
-    if session.data.get('auth_user_id'):
-        session.save()
+    # Only write sessions that changed during the request, or that have not
+    # been saved for a while
+    if session.data.get('auth_user_id') and session.save_if_changed():
+        cache_session(session)
 
     return response
@@ -1,10 +1,15 @@
 # -*- coding: utf-8 -*-
 
+import copy
+import datetime
+
 from bson import ObjectId
 from modularodm import fields
 
 from framework.mongo import StoredObject
 
+from website import settings
+
 
 class Session(StoredObject):
 
@@ -13,6 +18,38 @@ class Session(StoredObject):
     date_modified = fields.DateTimeField(auto_now=True)
     data = fields.DictionaryField()
 
+    _snapshot = None
+
     @property
     def is_authenticated(self):
         return 'auth_user_id' in self.data
+
+    def snapshot(self):
+        """Remember the current data, so that `is_dirty` reports later changes."""
+        self._snapshot = copy.deepcopy(self.data)
+
+    @property
+    def is_dirty(self):
+        """Whether `data` changed since the last `snapshot`. Sessions that were
+        never snapshotted are always dirty.
+        """
+        return self._snapshot is None or self._snapshot != self.data
+
+    @property
+    def is_stale(self):
+        """Whether the session was last saved long enough ago that it should be
+        saved again to keep `date_modified` current, even if unchanged.
+        """
+        if not self.date_modified:
+            return True
+        return datetime.datetime.utcnow() - self.date_modified > settings.SESSION_TOUCH_INTERVAL
+
+    def save_if_changed(self):
+        """Save only if the data changed or the session is stale; returns
+        whether it was saved.
+        """
+        if not (self.is_dirty or self.is_stale):
+            return False
+        self.save()
+        self.snapshot()
+        return True
@@ -1,11 +1,53 @@
+import copy
+
 from modularodm import Q
 
+from framework.cache import LRUCache
+
+from website import settings
+
 from .model import Session
 
 
+# Optional per-process cache of stored sessions in front of MongoDB; see
+# `SESSION_CACHE_TTL`
+session_cache = LRUCache(
+    maxsize=settings.SESSION_CACHE_SIZE,
+    ttl=settings.SESSION_CACHE_TTL,
+)
+
+
+def load_session(session_id):
+    """Load a session, from the session cache if enabled and possible.
+
+    :param str session_id: Primary key of the session
+    :returns: `Session`, or `None` if not found
+    """
+    if settings.SESSION_CACHE_TTL:
+        stored = session_cache.get(session_id)
+        if stored is not None:
+            return Session.load(data=copy.deepcopy(stored))
+    session = Session.load(session_id)
+    if session is not None:
+        cache_session(session)
+    return session
+
+
+def cache_session(session):
+    if settings.SESSION_CACHE_TTL and session._id:
+        session_cache.set(session._id, copy.deepcopy(session.to_storage()))
+
+
+def uncache_sessions(*session_ids):
+    for session_id in session_ids:
+        session_cache.delete(session_id)
+
+
 def remove_sessions_for_user(user):
     """Permanently remove all stored sessions for the user from the DB.
 
     :param User user:
     """
-    Session.remove(Q('data.auth_user_id', 'eq', user._id))
+    query = Q('data.auth_user_id', 'eq', user._id)
+    uncache_sessions(*Session.find(query).get_keys())
+    Session.remove(query)
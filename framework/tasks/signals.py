@@ -24,3 +24,27 @@ def attach_models(*args, **kwargs):
     """Attach models to database collections on worker initialization.
     """
     set_up_storage(models.MODELS, storage.MongoStorage)
+
+
+@signals.worker_process_shutdown.connect
+def flush_search_updates(*args, **kwargs):
+    """Send search document updates still queued when the worker exits.
+    """
+    from website.search import search
+    search.flush()
+
+
+@signals.worker_process_shutdown.connect
+def flush_page_counters(*args, **kwargs):
+    """Write page counter increments still queued when the worker exits.
+    """
+    from framework import analytics
+    analytics.flush()
+
+
+@signals.worker_process_shutdown.connect
+def close_mail_connections(*args, **kwargs):
+    """Close SMTP connections kept open by the worker.
+    """
+    from framework.email import transport
+    transport.close_transports()
@@ -27,9 +27,11 @@ def show_live(database=None):
 
 
 def disconnect(database=None):
+    """Release the connection pinned to the current thread back to the pool.
+    """
     database = database or proxy_database
     try:
-        database.connection.close()
+        database.connection.end_request()
     except AttributeError:
         if not osfsettings.DEBUG_MODE:
             logger.error('MongoDB client not attached to request.')
@@ -0,0 +1,44 @@
+"""Populate the denormalized log counters (`log_count`, `user_log_counts`
+and `date_last_logged`) of nodes created before they were maintained by
+`Node.add_log`. Nodes that have not been migrated compute their counters
+the first time they are read, so this can run after deploying.
+"""
+import sys
+import logging
+
+from modularodm import Q
+
+from website.app import init_app
+from website.models import Node
+from scripts import utils as script_utils
+from framework.transactions.context import TokuTransaction
+
+logger = logging.getLogger(__name__)
+
+
+def do_migration(records, dry=False):
+    count = 0
+    for node in records:
+        logger.info('Updating log counters of node {}'.format(node._id))
+        node.update_log_counters()
+        if not dry:
+            node.save()
+        count += 1
+    logger.info('Updated log counters of {} nodes'.format(count))
+
+
+def get_targets():
+    return Node.find(Q('log_count', 'eq', None))
+
+
+def main():
+    init_app(routes=False)  # Sets the storage backends on all models
+    dry = 'dry' in sys.argv
+    if not dry:
+        script_utils.add_file_logger(logger, __file__)
+    with TokuTransaction():
+        do_migration(get_targets(), dry)
+
+
+if __name__ == '__main__':
+    main()
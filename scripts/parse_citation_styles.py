@@ -8,6 +8,7 @@ from lxml import etree
 from website import settings
 from website.app import init_app
 from website.models import CitationStyle
+from website.citations.index import style_index
 
 
 def main():
@@ -48,6 +49,9 @@ def main():
             style = CitationStyle(**fields)
             style.save()
 
+    # Other processes pick up the new styles when their index checks the version
+    style_index.clear()
+
     return total
 
 
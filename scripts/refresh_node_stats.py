@@ -0,0 +1,40 @@
+"""Recompute the stored project page counts (see `website.project.stats`) of
+every node, correcting any drift from the counts kept by the models.
+"""
+import sys
+import logging
+
+from modularodm import Q
+
+from website.app import init_app
+from website.models import Node
+from website.project import stats as node_stats
+from scripts import utils as script_utils
+
+logger = logging.getLogger(__name__)
+
+
+def do_migration(records, dry=False):
+    count = 0
+    for node in records:
+        logger.info('Refreshing stats of node {}'.format(node._id))
+        if not dry:
+            node_stats.refresh(node)
+        count += 1
+    logger.info('Refreshed stats of {} nodes'.format(count))
+
+
+def get_targets():
+    return Node.find(Q('is_deleted', 'eq', False))
+
+
+def main():
+    init_app(routes=False)  # Sets the storage backends on all models
+    dry = 'dry' in sys.argv
+    if not dry:
+        script_utils.add_file_logger(logger, __file__)
+    do_migration(get_targets(), dry)
+
+
+if __name__ == '__main__':
+    main()
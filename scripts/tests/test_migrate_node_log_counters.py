@@ -0,0 +1,38 @@
+from nose.tools import *  # noqa
+
+from tests.base import OsfTestCase
+from tests.factories import ProjectFactory, UserFactory, NodeLogFactory
+from framework.auth import Auth
+
+from scripts.migrate_node_log_counters import do_migration, get_targets
+
+
+class TestMigrateNodeLogCounters(OsfTestCase):
+
+    def setUp(self):
+        super(TestMigrateNodeLogCounters, self).setUp()
+        self.user = UserFactory()
+        self.project = ProjectFactory(creator=self.user)
+        self.project.add_log('project_updated', params={'project': self.project._id}, auth=Auth(self.user))
+        self.project.logs.append(NodeLogFactory())
+        # Simulate a node saved before the counters existed
+        self.project.log_count = None
+        self.project.user_log_counts = {}
+        self.project.date_last_logged = None
+        self.project.save()
+
+    def test_get_targets(self):
+        assert_equal([node._id for node in get_targets()], [self.project._id])
+
+    def test_do_migration(self):
+        do_migration(get_targets())
+        self.project.reload()
+        assert_equal(self.project.log_count, len(self.project.logs))
+        assert_equal(self.project.get_log_count(self.user), 2)
+        assert_equal(self.project.date_last_logged, self.project.logs[-1].date)
+        assert_equal(list(get_targets()), [])
+
+    def test_dry_run_does_not_save(self):
+        do_migration(get_targets(), dry=True)
+        self.project.reload()
+        assert_is_none(self.project.log_count)
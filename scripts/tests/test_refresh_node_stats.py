@@ -0,0 +1,41 @@
+from nose.tools import *  # noqa
+
+from tests.base import OsfTestCase
+from tests.factories import ProjectFactory
+from framework.auth import Auth
+
+from website.project import stats as node_stats
+
+from scripts.refresh_node_stats import do_migration, get_targets
+
+
+class TestRefreshNodeStats(OsfTestCase):
+
+    def setUp(self):
+        super(TestRefreshNodeStats, self).setUp()
+        self.project = ProjectFactory()
+        self.linker = ProjectFactory()
+        self.linker.add_pointer(self.project, auth=Auth(self.linker.creator))
+        # Simulate counts that drifted from the back-references
+        node_stats.get_collection().update(
+            {'_id': self.project._id},
+            {'$set': {'pointers': 5, 'forks': 3}},
+            upsert=True,
+        )
+
+    def test_get_targets_excludes_deleted(self):
+        self.linker.is_deleted = True
+        self.linker.save()
+        targets = [node._id for node in get_targets()]
+        assert_in(self.project._id, targets)
+        assert_not_in(self.linker._id, targets)
+
+    def test_do_migration(self):
+        do_migration(get_targets())
+        stats = node_stats.get_stats(self.project)
+        assert_equal(stats['pointers'], 1)
+        assert_equal(stats['forks'], 0)
+
+    def test_dry_run_does_not_save(self):
+        do_migration(get_targets(), dry=True)
+        assert_equal(node_stats.get_stats(self.project)['pointers'], 5)
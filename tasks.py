@@ -361,10 +361,26 @@ def elasticsearch():
         print("Your system is not recognized, you will have to start elasticsearch manually")
 
 @task
-def migrate_search(delete=False, index=settings.ELASTIC_INDEX):
-    """Migrate the search-enabled models."""
+def migrate_search(delete=False, index=settings.ELASTIC_INDEX, processes=None):
+    """Migrate the search-enabled models. Pass --processes to run a parallel,
+    resumable reindex.
+    """
     from website.search_migration.migrate import migrate
-    migrate(delete, index=index)
+    migrate(delete, index=index, processes=int(processes) if processes else None)
+
+@task
+def query_report(top=20, clear=False):
+    """Print the MongoDB operations recorded per endpoint by the query
+    profiler, and the slowest requests. Pass --clear to remove the recorded
+    profiles instead.
+    """
+    from website.app import init_app
+    init_app(routes=False, set_backends=False)
+    from framework.mongo import profiler
+    if clear:
+        profiler.clear()
+    else:
+        profiler.print_report(top=int(top))
 
 @task
 def rebuild_search():
@@ -128,6 +128,10 @@ class DbTestCase(unittest.TestCase):
 
         cls._original_bcrypt_log_rounds = settings.BCRYPT_LOG_ROUNDS
         settings.BCRYPT_LOG_ROUNDS = 1
+        cls._original_elastic_index_sync = settings.ELASTIC_INDEX_SYNC
+        settings.ELASTIC_INDEX_SYNC = True
+        cls._original_page_counter_sync = settings.PAGE_COUNTER_SYNC
+        settings.PAGE_COUNTER_SYNC = True
 
         teardown_database(database=database_proxy._get_current_object())
         # TODO: With `database` as a `LocalProxy`, we should be able to simply
@@ -151,6 +155,8 @@ class DbTestCase(unittest.TestCase):
         settings.PIWIK_HOST = cls._original_piwik_host
         settings.ENABLE_EMAIL_SUBSCRIPTIONS = cls._original_enable_email_subscriptions
         settings.BCRYPT_LOG_ROUNDS = cls._original_bcrypt_log_rounds
+        settings.ELASTIC_INDEX_SYNC = cls._original_elastic_index_sync
+        settings.PAGE_COUNTER_SYNC = cls._original_page_counter_sync
 
 
 class AppTestCase(unittest.TestCase):
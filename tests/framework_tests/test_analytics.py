@@ -3,8 +3,10 @@
 Unit tests for analytics logic in framework/analytics/__init__.py
 """
 
+import copy
 import unittest
 
+import mock
 from nose.tools import *  # flake8: noqa  (PEP8 asserts)
 from flask import Flask
 
@@ -14,6 +16,7 @@ from framework import analytics, sessions
 from framework.sessions import session
 
 from tests.base import OsfTestCase
+from website import settings
 from tests.factories import UserFactory, ProjectFactory
 
 
@@ -75,9 +78,6 @@ class TestUpdateCounters(UpdateCountersTestCase):
         count = analytics.get_basic_counters('download:{0}:{1}'.format(self.node, self.fid), db=self.db)
         assert_equal(count, (1, 1))
 
-        page = 'download:{0}:{1}'.format(self.node, self.fid)
-
-        session.data['visited'].append(page)
         download_file_(node=self.node, fid=self.fid)
 
         count = analytics.get_basic_counters('download:{0}:{1}'.format(self.node, self.fid), db=self.db)
@@ -96,14 +96,48 @@ class TestUpdateCounters(UpdateCountersTestCase):
         count = analytics.get_basic_counters('download:{0}:{1}:{2}'.format(self.node, self.fid, self.vid), db=self.db)
         assert_equal(count, (1, 1))
 
-        page = 'download:{0}:{1}:{2}'.format(self.node, self.fid, self.vid)
-
-        session.data['visited'].append(page)
         download_file_version_(node=self.node, fid=self.fid, vid=self.vid)
 
         count = analytics.get_basic_counters('download:{0}:{1}:{2}'.format(self.node, self.fid, self.vid), db=self.db)
         assert_equal(count, (1, 2))
 
+    def test_update_counters_repeat_visit_leaves_session_unchanged(self):
+        @analytics.update_counters('node:{target_id}', db=self.db)
+        def view_node(**kwargs):
+            return kwargs.get('node')
+
+        view_node(node=self.node)
+        data = copy.deepcopy(session.data)
+        view_node(node=self.node)
+
+        assert_equal(session.data, data)
+        assert_equal(analytics.get_basic_counters('node:{0}'.format(self.node._id), db=self.db), (1, 2))
+
+    def test_update_counters_keeps_visited_list(self):
+        page = 'node:{0}'.format(self.node._id)
+        session.data['visited'] = [page]
+
+        @analytics.update_counters('node:{target_id}', db=self.db)
+        def view_node(**kwargs):
+            return kwargs.get('node')
+
+        view_node(node=self.node)
+
+        assert_equal(analytics.get_basic_counters(page, db=self.db), (0, 1))
+        assert_equal(session.data['visited'], [page])
+
+    @mock.patch('framework.analytics.settings.PAGE_COUNTER_EXACT_PAGES', 2)
+    def test_update_counters_switches_to_filter_past_threshold(self):
+        pages = ['node:abc12', 'node:def34']
+        session.data['visited'] = list(pages)
+
+        analytics.update_counter('node:ghi56', db=self.db)
+
+        assert_is_instance(session.data['visited'], basestring)
+        visited = analytics.VisitedPages(session.data['visited'], settings.PAGE_COUNTER_FILTER_BITS)
+        for page in pages + ['node:ghi56']:
+            assert_false(visited.add(page))
+
     def test_get_basic_counters(self):
         page = 'node:' + str(self.node._id)
 
@@ -133,9 +167,6 @@ class TestUpdateCounters(UpdateCountersTestCase):
         count = analytics.get_basic_counters('download:{0}:{1}'.format(self.node, fid2), db=self.db)
         assert_equal(count, (None, None))
 
-        page = 'download:{0}:{1}'.format(self.node, fid1)
-
-        session.data['visited'].append(page)
         download_file_(node=self.node, fid=fid1)
         download_file_(node=self.node, fid=fid2)
 
@@ -143,3 +174,78 @@ class TestUpdateCounters(UpdateCountersTestCase):
         assert_equal(count, (1, 2))
         count = analytics.get_basic_counters('download:{0}:{1}'.format(self.node, fid2), db=self.db)
         assert_equal(count, (1, 1))
+
+
+class TestBloomFilter(unittest.TestCase):
+
+    def test_add_and_contains(self):
+        bloom = analytics.BloomFilter(1024, 4)
+        assert_true(bloom.add('node:abc12'))
+        assert_in('node:abc12', bloom)
+        assert_not_in('node:xyz89', bloom)
+        assert_false(bloom.add('node:abc12'))
+
+    def test_dumps_and_loads(self):
+        bloom = analytics.BloomFilter(1024, 4)
+        bloom.add(u'download:abc12:f\xfcr')
+        loaded = analytics.BloomFilter.loads(bloom.dumps(), 1024, 4)
+        assert_in(u'download:abc12:f\xfcr', loaded)
+
+    def test_loads_legacy_list(self):
+        loaded = analytics.BloomFilter.loads(['node:abc12', 'node:def34'], 1024, 4)
+        assert_in('node:abc12', loaded)
+        assert_in('node:def34', loaded)
+
+    def test_loads_other_size_is_empty(self):
+        bloom = analytics.BloomFilter(1024, 4)
+        bloom.add('node:abc12')
+        loaded = analytics.BloomFilter.loads(bloom.dumps(), 2048, 4)
+        assert_not_in('node:abc12', loaded)
+
+    def test_size_is_fixed(self):
+        bloom = analytics.BloomFilter(1024, 4)
+        size = len(bloom.dumps())
+        for i in range(500):
+            bloom.add('node:{0}'.format(i))
+        assert_equal(len(bloom.dumps()), size)
+
+
+@mock.patch('framework.analytics.threading.Timer', mock.Mock())
+class TestCounterQueue(OsfTestCase):
+
+    def setUp(self):
+        super(TestCounterQueue, self).setUp()
+        self._sync = settings.PAGE_COUNTER_SYNC
+        settings.PAGE_COUNTER_SYNC = False
+        self.queue = analytics.CounterQueue()
+        self.collection = self.db['pagecounters']
+
+    def tearDown(self):
+        super(TestCounterQueue, self).tearDown()
+        settings.PAGE_COUNTER_SYNC = self._sync
+
+    def test_increments_are_summed_until_flush(self):
+        self.queue.add(self.collection, 'node:abc12', {'total': 1, 'unique': 1})
+        self.queue.add(self.collection, 'node:abc12', {'total': 1})
+        assert_equal(analytics.get_basic_counters('node:abc12', db=self.db), (None, None))
+
+        self.queue.flush()
+
+        assert_equal(analytics.get_basic_counters('node:abc12', db=self.db), (1, 2))
+        assert_equal(self.queue.pending, {})
+
+    @mock.patch('framework.analytics.settings.PAGE_COUNTER_BATCH_SIZE', 2)
+    def test_flushes_when_batch_is_full(self):
+        self.queue.add(self.collection, 'node:abc12', {'total': 1})
+        self.queue.add(self.collection, 'node:abc12', {'total': 1})
+        assert_equal(analytics.get_basic_counters('node:abc12', db=self.db), (None, None))
+
+        self.queue.add(self.collection, 'node:def34', {'total': 1})
+        # The full batch is written from the timer thread, not the request
+        assert_equal(analytics.get_basic_counters('node:abc12', db=self.db), (None, None))
+        analytics.threading.Timer.assert_called_with(0, self.queue.flush)
+
+        self.queue.flush()
+
+        assert_equal(analytics.get_basic_counters('node:abc12', db=self.db), (0, 2))
+        assert_equal(analytics.get_basic_counters('node:def34', db=self.db), (0, 1))
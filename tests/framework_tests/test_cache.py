@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+from unittest import TestCase
+
+import mock
+from nose.tools import *  # flake8: noqa
+
+from framework.cache import LRUCache
+
+
+class TestLRUCache(TestCase):
+
+    def test_get_and_set(self):
+        cache = LRUCache(maxsize=2)
+        cache.set('key', 'value')
+        assert_equal(cache.get('key'), 'value')
+        assert_is_none(cache.get('missing'))
+        assert_equal(cache.stats['hits'], 1)
+        assert_equal(cache.stats['misses'], 1)
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        assert_in('a', cache)
+        assert_not_in('b', cache)
+        assert_in('c', cache)
+        assert_equal(len(cache), 2)
+
+    @mock.patch('framework.cache.time.time')
+    def test_entries_expire(self, mock_time):
+        cache = LRUCache(maxsize=2, ttl=10)
+        mock_time.return_value = 100
+        cache.set('key', 'value')
+        mock_time.return_value = 105
+        assert_equal(cache.get('key'), 'value')
+        mock_time.return_value = 111
+        assert_is_none(cache.get('key'))
+
+    def test_clear(self):
+        cache = LRUCache()
+        cache.set('key', 'value')
+        cache.clear()
+        assert_equal(len(cache), 0)
@@ -2,9 +2,11 @@
 import unittest
 import smtplib
 
+import mock
 from nose.tools import *  # PEP8 asserts
 
-from framework.email.tasks import send_email
+from framework.email import transport
+from framework.email.tasks import send_email, send_emails
 from website import settings
 
 # Check if local mail server is running
@@ -27,5 +29,72 @@ class TestEmail(unittest.TestCase):
                                  message="<h1>Greetings!</h1>", ttls=False, login=False))
 
 
+@mock.patch('framework.email.transport.smtplib.SMTP')
+class TestSMTPTransport(unittest.TestCase):
+
+    def setUp(self):
+        transport.close_transports()
+
+    def tearDown(self):
+        transport.close_transports()
+
+    def test_connection_is_reused(self, mock_smtp):
+        smtp = transport.SMTPTransport('localhost', 'user', 'pass')
+        for _ in range(3):
+            smtp.send('foo@bar.com', ['baz@quux.com'], 'message')
+        assert_equal(mock_smtp.call_count, 1)
+        assert_equal(mock_smtp.return_value.login.call_count, 1)
+        assert_equal(mock_smtp.return_value.sendmail.call_count, 3)
+        assert_equal(smtp.stats['messages'], 3)
+        assert_equal(smtp.stats['connections'], 1)
+
+    def test_reconnects_after_max_messages(self, mock_smtp):
+        smtp = transport.SMTPTransport('localhost', login=False)
+        with mock.patch.object(settings, 'MAIL_MAX_MESSAGES_PER_CONNECTION', 2):
+            for _ in range(3):
+                smtp.send('foo@bar.com', ['baz@quux.com'], 'message')
+        assert_equal(smtp.stats['connections'], 2)
+
+    def test_retries_once_when_disconnected(self, mock_smtp):
+        mock_smtp.return_value.sendmail.side_effect = [smtplib.SMTPServerDisconnected, {}]
+        smtp = transport.SMTPTransport('localhost', login=False)
+        assert_true(smtp.send('foo@bar.com', ['baz@quux.com'], 'message'))
+        assert_equal(smtp.stats['reconnects'], 1)
+        assert_equal(smtp.stats['connections'], 2)
+
+    def test_raises_when_retry_fails(self, mock_smtp):
+        mock_smtp.return_value.sendmail.side_effect = smtplib.SMTPServerDisconnected
+        smtp = transport.SMTPTransport('localhost', login=False)
+        with assert_raises(smtplib.SMTPServerDisconnected):
+            smtp.send('foo@bar.com', ['baz@quux.com'], 'message')
+        assert_equal(smtp.stats['failures'], 1)
+
+    def test_get_transport_is_shared_per_server(self, mock_smtp):
+        first = transport.get_transport('localhost', 'user', 'pass')
+        assert_is(first, transport.get_transport('localhost', 'user', 'pass'))
+        assert_is_not(first, transport.get_transport('otherhost', 'user', 'pass'))
+
+    @mock.patch.object(settings, 'USE_EMAIL', True)
+    def test_send_emails_uses_one_connection(self, mock_smtp):
+        messages = [
+            dict(from_addr='foo@bar.com', to_addr='{0}@quux.com'.format(i), subject='hi',
+                 message='hello', username='user', password='pass', mail_server='localhost')
+            for i in range(5)
+        ]
+        assert_equal(send_emails(messages), 5)
+        assert_equal(mock_smtp.call_count, 1)
+        assert_equal(mock_smtp.return_value.sendmail.call_count, 5)
+
+    @mock.patch.object(settings, 'USE_EMAIL', True)
+    def test_send_emails_continues_after_failure(self, mock_smtp):
+        mock_smtp.return_value.sendmail.side_effect = [smtplib.SMTPRecipientsRefused({}), {}]
+        messages = [
+            dict(from_addr='foo@bar.com', to_addr='{0}@quux.com'.format(i), subject='hi',
+                 message='hello', login=False, mail_server='localhost')
+            for i in range(2)
+        ]
+        assert_equal(send_emails(messages), 1)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -3,11 +3,17 @@ Tests related to functions in framework.mongo
 """
 from unittest import TestCase
 
+import mock
 from nose.tools import *  # flake8: noqa
 
 from modularodm.exceptions import ValidationError, ValidationValueError
 
-from framework.mongo import validators
+from framework.mongo import validators, get_load_stats, profiler
+from framework.mongo.handlers import ClientPool
+from framework.auth import User
+
+from tests.base import OsfTestCase
+from tests.factories import UserFactory
 
 class TestValidators(TestCase):
 
@@ -62,3 +68,129 @@ class TestValidators(TestCase):
 
         with assert_raises(ValidationError):
             new_validator({'k': 'v', 'k2': 'v2'})
+
+
+class TestClientPool(TestCase):
+
+    def setUp(self):
+        self.factory = mock.Mock(side_effect=lambda: mock.Mock())
+        self.pool = ClientPool(client_factory=self.factory)
+
+    def test_client_is_created_lazily_and_reused(self):
+        assert_false(self.factory.called)
+        client = self.pool.client
+        assert_is(self.pool.client, client)
+        assert_equal(self.factory.call_count, 1)
+        assert_equal(self.pool.stats['connects'], 1)
+
+    @mock.patch('framework.mongo.handlers.os.getpid')
+    def test_client_is_recreated_after_fork(self, mock_getpid):
+        mock_getpid.return_value = 1
+        parent_client = self.pool.client
+        mock_getpid.return_value = 2
+        child_client = self.pool.client
+        assert_is_not(parent_client, child_client)
+        assert_false(parent_client.close.called)
+        assert_equal(self.pool.stats['forks'], 1)
+
+    def test_checkout_and_checkin_pin_and_release_socket(self):
+        client = self.pool.checkout()
+        client.start_request.assert_called_once_with()
+        self.pool.checkin(client)
+        client.end_request.assert_called_once_with()
+        assert_equal(self.pool.stats['checkouts'], 1)
+        assert_equal(self.pool.stats['checkins'], 1)
+
+    def test_reset_closes_client(self):
+        client = self.pool.client
+        self.pool.reset()
+        assert_true(client.close.called)
+        assert_is_not(self.pool.client, client)
+
+
+class TestIdentityMap(OsfTestCase):
+
+    def setUp(self):
+        super(TestIdentityMap, self).setUp()
+        self.users = [UserFactory() for _ in range(3)]
+        User._clear_caches()
+
+    def test_load_counts_hits_and_misses(self):
+        stats = get_load_stats()
+        first = User.load(self.users[0]._id)
+        second = User.load(self.users[0]._id)
+        assert_is(first, second)
+        delta = get_load_stats() - stats
+        assert_equal(delta['misses'], 1)
+        assert_equal(delta['hits'], 1)
+
+    def test_load_many_queries_once_and_keeps_order(self):
+        User.load(self.users[1]._id)
+        keys = [self.users[2]._id, self.users[1]._id, 'notauser', self.users[0]._id]
+        stats = get_load_stats()
+        users = User.load_many(keys)
+        assert_equal(
+            [user._id for user in users],
+            [self.users[2]._id, self.users[1]._id, self.users[0]._id],
+        )
+        delta = get_load_stats() - stats
+        assert_equal(delta['hits'], 1)
+        assert_equal(delta['misses'], 3)
+        assert_equal(delta['finds'], 1)
+
+    def test_load_many_returns_identity_mapped_instances(self):
+        user = User.load(self.users[0]._id)
+        assert_is(User.load_many([self.users[0]._id])[0], user)
+
+
+class TestQueryProfiler(TestCase):
+
+    def setUp(self):
+        self.collection = mock.Mock()
+        self.collection.name = 'node'
+        self.profiled = profiler.ProfiledCollection(self.collection)
+
+    def tearDown(self):
+        profiler._local.profile = None
+
+    def test_query_shape_replaces_values(self):
+        shape = profiler.query_shape({
+            '_id': {'$in': ['abc12', 'def34']},
+            '$or': [{'is_public': True}, {'contributors': 'xyz89'}],
+        })
+        assert_equal(shape, {
+            '_id': {'$in': '?'},
+            '$or': [{'is_public': '?'}, {'contributors': '?'}],
+        })
+
+    def test_operations_are_not_recorded_without_profile(self):
+        self.profiled.find_one({'_id': 'abc12'})
+        self.collection.find_one.assert_called_once_with({'_id': 'abc12'})
+        assert_is_none(profiler.current())
+
+    def test_operations_are_recorded(self):
+        profile = profiler.start('view_project')
+        self.profiled.find_one({'_id': 'abc12'})
+        self.profiled.update({'_id': 'abc12'}, {'$set': {'title': 'New'}})
+        self.profiled.insert({'_id': 'def34'})
+        self.profiled.ensure_index('title')
+
+        assert_equal(profile.query_count, 3)
+        assert_equal(
+            [(query['operation'], query['shape']) for query in profile.queries],
+            [
+                ('find_one', '{"_id": "?"}'),
+                ('update', '{"_id": "?"}'),
+                ('insert', '"?"'),
+            ],
+        )
+        self.collection.ensure_index.assert_called_once_with('title')
+
+    @mock.patch('framework.mongo.profiler.save')
+    def test_finish_stores_profile(self, mock_save):
+        profile = profiler.start('view_project')
+        self.profiled.find_one({'_id': 'abc12'})
+        assert_is(profiler.finish(), profile)
+        mock_save.assert_called_once_with(profile)
+        assert_is_none(profiler.current())
+        assert_equal(profile.to_storage()['query_count'], 1)
@@ -1,3 +1,6 @@
+import datetime
+
+import mock
 from nose.tools import *
 
 from framework.sessions import utils
@@ -34,3 +37,83 @@ class SessionUtilsTestCase(DbTestCase):
 
         utils.remove_sessions_for_user(self.user)
         assert_equal(1, Session.find().count())
+
+
+class SessionModelTestCase(DbTestCase):
+
+    def tearDown(self, *args, **kwargs):
+        super(SessionModelTestCase, self).tearDown(*args, **kwargs)
+        Session.remove()
+
+    def test_new_session_is_dirty(self):
+        session = factories.SessionFactory()
+        assert_true(session.is_dirty)
+
+    def test_snapshot_tracks_changes(self):
+        session = factories.SessionFactory()
+        session.data['visited'] = {'pages': []}
+        session.snapshot()
+        assert_false(session.is_dirty)
+        session.data['visited']['pages'].append('node:abc12')
+        assert_true(session.is_dirty)
+
+    def test_save_if_changed_skips_unchanged_session(self):
+        session = factories.SessionFactory()
+        session.save()
+        session.snapshot()
+        with mock.patch.object(Session, 'save') as mock_save:
+            assert_false(session.save_if_changed())
+        assert_false(mock_save.called)
+
+    @mock.patch('framework.sessions.model.settings.SESSION_TOUCH_INTERVAL', datetime.timedelta(0))
+    def test_save_if_changed_saves_stale_session(self):
+        session = factories.SessionFactory()
+        session.save()
+        session.snapshot()
+        assert_true(session.is_stale)
+        assert_true(session.save_if_changed())
+
+    def test_save_if_changed_saves_dirty_session(self):
+        session = factories.SessionFactory()
+        session.save()
+        session.snapshot()
+        session.data['auth_error_code'] = 401
+        assert_true(session.save_if_changed())
+        assert_false(session.is_dirty)
+        assert_equal(Session.load(session._id).data['auth_error_code'], 401)
+
+
+class SessionCacheTestCase(DbTestCase):
+
+    def setUp(self, *args, **kwargs):
+        super(SessionCacheTestCase, self).setUp(*args, **kwargs)
+        self.user = factories.UserFactory()
+        self.session = factories.SessionFactory(user=self.user)
+        self.session.save()
+        utils.session_cache.clear()
+
+    def tearDown(self, *args, **kwargs):
+        super(SessionCacheTestCase, self).tearDown(*args, **kwargs)
+        utils.session_cache.clear()
+        User.remove()
+        Session.remove()
+
+    @mock.patch('framework.sessions.utils.settings.SESSION_CACHE_TTL', 0)
+    def test_cache_disabled(self):
+        utils.load_session(self.session._id)
+        assert_equal(len(utils.session_cache), 0)
+
+    @mock.patch('framework.sessions.utils.settings.SESSION_CACHE_TTL', 60)
+    def test_load_session_uses_cache(self):
+        utils.load_session(self.session._id)
+        with mock.patch.object(Session, 'load', wraps=Session.load) as mock_load:
+            session = utils.load_session(self.session._id)
+        mock_load.assert_called_once_with(data=mock.ANY)
+        assert_equal(session._id, self.session._id)
+        assert_equal(session.data['auth_user_id'], self.user._id)
+
+    @mock.patch('framework.sessions.utils.settings.SESSION_CACHE_TTL', 60)
+    def test_remove_sessions_for_user_clears_cache(self):
+        utils.load_session(self.session._id)
+        utils.remove_sessions_for_user(self.user)
+        assert_is_none(utils.load_session(self.session._id))
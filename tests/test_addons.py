@@ -25,13 +25,78 @@ from website.files.models.base import PROVIDER_MAP
 from website.util import api_url_for, rubeus
 from website.project import new_private_link
 from website.project.views.node import _view_project as serialize_node
-from website.addons.base import AddonConfig, AddonNodeSettingsBase, views
+from website.addons.base import AddonConfig, AddonNodeSettingsBase, views, crawler
 from website.addons.github.model import AddonGitHubOauthSettings
 from tests.base import OsfTestCase
 from tests.factories import AuthUserFactory, ProjectFactory
 from website.addons.github.exceptions import ApiError
 
 
+def mock_response(status_code, data=None):
+    res = mock.Mock(status_code=status_code)
+    res.json.return_value = {'data': data} if data is not None else {'message': 'error'}
+    return res
+
+
+@mock.patch.object(settings, 'ARCHIVE_CRAWL_BACKOFF', 0)
+@mock.patch('website.addons.base.crawler.session')
+class TestFileTreeCrawler(unittest.TestCase):
+
+    def setUp(self):
+        self.bucket = crawler.TokenBucket(1000)
+
+    def test_fetch_children_retries_server_errors(self, mock_session):
+        mock_session.get.side_effect = [mock_response(503), mock_response(200, [{'kind': 'file'}])]
+        assert_equal(crawler.fetch_children('http://wb/data', self.bucket), [{'kind': 'file'}])
+        assert_equal(mock_session.get.call_count, 2)
+
+    def test_fetch_children_raises_client_errors(self, mock_session):
+        mock_session.get.return_value = mock_response(404)
+        with assert_raises(HTTPError):
+            crawler.fetch_children('http://wb/data', self.bucket)
+        assert_equal(mock_session.get.call_count, 1)
+
+    def test_fetch_children_on_error_replaces_listing(self, mock_session):
+        mock_session.get.return_value = mock_response(404)
+        on_error = lambda res: [] if res.status_code == 404 else None
+        assert_equal(crawler.fetch_children('http://wb/data', self.bucket, on_error=on_error), [])
+
+    def test_fetch_children_on_error_none_raises(self, mock_session):
+        mock_session.get.return_value = mock_response(403)
+        with assert_raises(HTTPError):
+            crawler.fetch_children('http://wb/data', self.bucket, on_error=lambda res: None)
+
+    def test_fetch_children_gives_up_after_max_retries(self, mock_session):
+        mock_session.get.return_value = mock_response(502)
+        with assert_raises(HTTPError):
+            crawler.fetch_children('http://wb/data', self.bucket)
+        assert_equal(mock_session.get.call_count, settings.ARCHIVE_CRAWL_MAX_RETRIES + 1)
+
+    def test_crawl_builds_nested_tree(self, mock_session):
+        listings = {
+            '/': [
+                {'path': '/a/', 'kind': 'folder'},
+                {'path': '/b/', 'kind': 'folder'},
+                {'path': '/c.txt', 'kind': 'file'},
+            ],
+            '/a/': [{'path': '/a/d.txt', 'kind': 'file'}],
+            '/b/': [],
+        }
+        mock_session.get.side_effect = lambda url: mock_response(200, listings[url])
+        root = crawler.crawl(
+            {'path': '/', 'kind': 'folder'},
+            lambda filenode, depth: filenode['path'],
+            'test'
+        )
+        assert_equal(
+            sorted(call[0][0] for call in mock_session.get.call_args_list),
+            ['/', '/a/', '/b/']
+        )
+        assert_equal(root['children'][0]['children'], listings['/a/'])
+        assert_equal(root['children'][1]['children'], [])
+        assert_not_in('children', root['children'][2])
+
+
 class TestAddonConfig(unittest.TestCase):
 
     def setUp(self):
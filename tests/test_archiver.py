@@ -1,5 +1,7 @@
 #-*- coding: utf-8 -*-
+import os
 import datetime
+import tempfile
 import functools
 import json
 import logging
@@ -78,6 +80,15 @@ FILE_TREE = {
     ],
 }
 
+def iter_file_tree_files(fileobj_metadata):
+    """Yield the metadata of every file in a nested file tree"""
+    if fileobj_metadata['kind'] == 'file':
+        yield fileobj_metadata
+    else:
+        for child in fileobj_metadata.get('children', []):
+            for file_metadata in iter_file_tree_files(child):
+                yield file_metadata
+
 class MockAddon(mock.MagicMock, StorageAddonBase):
 
     complete = True
@@ -85,6 +96,9 @@ class MockAddon(mock.MagicMock, StorageAddonBase):
     def _get_file_tree(self, user, version):
         return FILE_TREE
 
+    def _iter_files(self, user, version):
+        return iter_file_tree_files(FILE_TREE)
+
     def after_register(self, *args):
         return None, None
 
@@ -263,6 +277,7 @@ class TestArchiverTasks(ArchiverTestCase):
                     'children': []
                 }
             setattr(mock_addon, '_get_file_tree', empty_file_tree)
+            setattr(mock_addon, '_iter_files', lambda user, version: iter([]))
             mock_get_addon.return_value = mock_addon
             results = [stat_addon(addon, self.archive_job._id) for addon in ['osfstorage']]
             archive_node(results, job_pk=self.archive_job._id)
@@ -401,6 +416,28 @@ class TestArchiverUtils(ArchiverTestCase):
         assert_equal(a_stat_result.num_files, 2)
         assert_equal(len(a_stat_result.targets), 2)
 
+    def test_stat_files(self):
+        result = archiver_utils.stat_files(
+            'abc', 'dropbox', iter_file_tree_files(FILE_TREE)
+        )
+        assert_equal(result.disk_usage, 128 + 256)
+        assert_equal(result.num_files, 2)
+        assert_is_none(result.manifest)
+
+    def test_stat_files_writes_manifest(self):
+        fd, manifest = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            result = archiver_utils.stat_files(
+                'abc', 'dropbox', iter_file_tree_files(FILE_TREE), manifest=manifest
+            )
+            with open(manifest) as fp:
+                lines = [json.loads(line) for line in fp]
+        finally:
+            os.remove(manifest)
+        assert_equal(result.manifest, manifest)
+        assert_equal(sorted(line['size'] for line in lines), ['128', '256'])
+
     @use_fake_addons
     def test_archive_provider_for(self):
         provider = self.src.get_addon(settings.ARCHIVE_PROVIDER)
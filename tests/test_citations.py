@@ -1,13 +1,15 @@
 # -*- coding: utf-8 -*-
 
 import datetime
+import mock
 from nose.tools import *  # noqa
 
 from scripts import parse_citation_styles
 from framework.auth.core import Auth
 from website.util import api_url_for
 from website.citations.utils import datetime_to_csl
-from website.models import Node, User
+from website.citations.index import StyleIndex
+from website.models import Node, User, CitationStyle
 from flask import redirect
 
 from tests.base import OsfTestCase
@@ -115,6 +117,59 @@ class CitationsUserTestCase(OsfTestCase):
         )
 
 
+class StyleIndexTestCase(OsfTestCase):
+    def setUp(self):
+        super(StyleIndexTestCase, self).setUp()
+        CitationStyle.remove()
+        CitationStyle(_id='apa', title='American Psychological Association 6th edition', short_title='APA').save()
+        CitationStyle(_id='apa-annotated-bibliography', title='American Psychological Association 6th edition (annotated bibliography)').save()
+        CitationStyle(_id='modern-language-association', title='Modern Language Association 7th edition', short_title='MLA').save()
+        self.index = StyleIndex()
+
+    def tearDown(self):
+        super(StyleIndexTestCase, self).tearDown()
+        CitationStyle.remove()
+
+    def search_ids(self, term, limit=None):
+        return [style['id'] for style in self.index.search(term, limit=limit)]
+
+    def test_all_ordered_by_title(self):
+        assert_equal(
+            [style['id'] for style in self.index.all()],
+            ['apa', 'apa-annotated-bibliography', 'modern-language-association'],
+        )
+
+    def test_search_word_prefixes(self):
+        assert_equal(self.search_ids('psych assoc'), ['apa', 'apa-annotated-bibliography'])
+        assert_equal(self.search_ids('MLA'), ['modern-language-association'])
+        assert_equal(self.search_ids('annotated'), ['apa-annotated-bibliography'])
+        assert_equal(self.search_ids('chicago'), [])
+        assert_equal(self.search_ids('-'), [])
+
+    def test_search_exact_id_first(self):
+        CitationStyle(_id='ap', title='Associated Press').save()
+        self.index.clear()
+        assert_equal(self.search_ids('ap')[0], 'ap')
+
+    def test_search_limit(self):
+        assert_equal(self.search_ids('american', limit=1), ['apa'])
+
+    def test_search_serializes_styles(self):
+        assert_equal(self.index.search('apa', limit=1), [CitationStyle.load('apa').to_json()])
+
+    def test_rebuilt_when_styles_change(self):
+        self.index.all()
+        CitationStyle(_id='chicago-author-date', title='Chicago Manual of Style 16th edition (author-date)').save()
+        with mock.patch('website.citations.index.settings.CITATION_STYLES_INDEX_CHECK_INTERVAL', 0):
+            assert_equal(self.search_ids('chicago'), ['chicago-author-date'])
+
+    def test_version_checked_at_interval(self):
+        self.index.all()
+        CitationStyle(_id='chicago-author-date', title='Chicago Manual of Style 16th edition (author-date)').save()
+        with mock.patch('website.citations.index.settings.CITATION_STYLES_INDEX_CHECK_INTERVAL', 3600):
+            assert_equal(self.search_ids('chicago'), [])
+
+
 class CitationsViewsTestCase(OsfTestCase):
     @classmethod
     def setUpClass(cls):
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+import mock
+from nose.tools import *  # noqa
+
+from tests.base import OsfTestCase
+from tests.factories import ProjectFactory, RegistrationFactory
+
+from website.discovery import utils
+
+
+class TestActivitySnapshot(OsfTestCase):
+
+    def setUp(self):
+        super(TestActivitySnapshot, self).setUp()
+        utils.get_collection().remove()
+        self.project = ProjectFactory(is_public=True)
+        self.private_project = ProjectFactory(is_public=False)
+
+    def test_get_activity_computes_missing_snapshot(self):
+        snapshot = utils.get_activity()
+        recent = [node['_id'] for node in snapshot['recent_public_projects']]
+        assert_in(self.project._id, recent)
+        assert_not_in(self.private_project._id, recent)
+        assert_is_not_none(utils.get_collection().find_one({'_id': utils.SNAPSHOT_ID}))
+
+    def test_get_activity_reads_stored_snapshot(self):
+        utils.update_activity()
+        new_project = ProjectFactory(is_public=True)
+        with mock.patch('website.discovery.utils.compute_activity') as mock_compute:
+            snapshot = utils.get_activity()
+        assert_false(mock_compute.called)
+        recent = [node['_id'] for node in snapshot['recent_public_projects']]
+        assert_not_in(new_project._id, recent)
+
+    def test_serialize_node(self):
+        serialized = utils.serialize_node(self.project)
+        assert_equal(serialized['_id'], self.project._id)
+        assert_equal(serialized['url'], self.project.url)
+        assert_false(serialized['is_registration'])
+
+    @mock.patch('website.discovery.utils.get_popular_nodes')
+    def test_popular_nodes(self, mock_popular):
+        registration = RegistrationFactory(project=self.project, is_public=True)
+        hits = {self.project._id: {'hits': 10, 'visits': 5}}
+        mock_popular.return_value = ([self.project], [registration], hits)
+        with mock.patch('website.discovery.utils.settings.PIWIK_HOST', 'http://piwik.test'):
+            snapshot = utils.update_activity()
+        assert_equal(
+            [node['_id'] for node in snapshot['popular_public_projects']],
+            [self.project._id],
+        )
+        assert_equal(
+            [node['_id'] for node in snapshot['popular_public_registrations']],
+            [registration._id],
+        )
+        assert_equal(snapshot['hits'], hits)
+
+    @mock.patch('website.discovery.utils.get_popular_nodes')
+    def test_piwik_error_keeps_previous_popular_nodes(self, mock_popular):
+        mock_popular.return_value = ([self.project], [], {self.project._id: {'hits': 1, 'visits': 1}})
+        with mock.patch('website.discovery.utils.settings.PIWIK_HOST', 'http://piwik.test'):
+            utils.update_activity()
+            mock_popular.side_effect = ValueError('No JSON object could be decoded')
+            snapshot = utils.update_activity()
+        assert_equal(
+            [node['_id'] for node in snapshot['popular_public_projects']],
+            [self.project._id],
+        )
+
+
+class TestActivityView(OsfTestCase):
+
+    def test_activity_page_renders(self):
+        project = ProjectFactory(is_public=True)
+        utils.update_activity()
+        res = self.app.get('/explore/activity/')
+        assert_equal(res.status_code, 200)
+        assert_in(project.title, res.body)
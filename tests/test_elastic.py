@@ -1,5 +1,8 @@
 # -*- coding: utf-8 -*-
+import os
 import time
+import hashlib
+import tempfile
 import unittest
 import logging
 import functools
@@ -7,12 +10,14 @@ import functools
 from nose.tools import *  # flake8: noqa (PEP8 asserts)
 import mock
 from modularodm import Q
+from elasticsearch import ConnectionError
 
-from framework.auth.core import Auth
+from framework.auth.core import Auth, User
 from website import settings
 import website.search.search as search
 from website.search import elastic_search
 from website.search.util import build_query
+from website.search_migration import migrate as search_migration
 from website.search_migration.migrate import migrate
 from website.models import Retraction, NodeLicense, Tag
 
@@ -398,6 +403,21 @@ class TestPublicNodes(SearchTestCase):
         assert_equal(docs[0]['parent_title'], 'hello & world')
         assert_true(docs[0]['parent_url'])
 
+    def test_parents_loaded_in_one_query(self):
+        other_component = NodeFactory(
+            parent=self.project,
+            title=self.title,
+            creator=self.user,
+            is_public=True
+        )
+        with mock.patch('website.search.elastic_search.Node.find', wraps=elastic_search.Node.find) as mock_find:
+            docs = query('category:component AND ' + self.title)['results']
+        assert_equal(len(docs), 2)
+        assert_equal(mock_find.call_count, 1)
+        for doc in docs:
+            assert_equal(doc['parent_title'], self.title)
+            assert_equal(doc['parent_url'], self.project.url)
+
     def test_make_parent_private(self):
         # Make parent of component, public, then private, and verify that the
         # component still appears but doesn't link to the parent in search.
@@ -427,6 +447,27 @@ class TestPublicNodes(SearchTestCase):
         docs = query('category:project AND ' + self.project.title)['results']
         assert_equal(len(docs), 1)
 
+    def test_change_title_indexes_missing_document(self):
+        elastic_search.es.delete(
+            index=elastic_search.INDEX, doc_type='project', id=self.project._id, refresh=True
+        )
+        self.project.set_title('Blue Ordinary', self.consolidate_auth, save=True)
+
+        docs = query('category:project AND "Blue Ordinary"')['results']
+        assert_equal(len(docs), 1)
+        assert_equal(docs[0]['id'], self.project._id)
+
+    def test_change_title_does_not_render_wikis(self):
+        self.project.update_node_wiki('home', 'Bohemian Rhapsody', self.consolidate_auth)
+        with mock.patch('website.addons.wiki.model.NodeWikiPage.raw_text') as mock_raw_text:
+            self.project.set_title('Blue Ordinary', self.consolidate_auth, save=True)
+        assert_false(mock_raw_text.called)
+
+        docs = query('category:project AND "Blue Ordinary"')['results']
+        assert_equal(len(docs), 1)
+        docs = query('category:project AND Bohemian')['results']
+        assert_equal(len(docs), 1)
+
     def test_add_tags(self):
 
         tags = ['stonecoldcrazy', 'just a poor boy', 'from-a-poor-family']
@@ -616,6 +657,25 @@ class TestAddContributor(SearchTestCase):
         contribs = search.search_contributor(self.name4.split(' ')[0][:-1])
         assert_equal(len(contribs['users']), 0)
 
+    def test_search_contributor_serializes_from_index(self):
+        self.user.jobs = [{'institution': 'Queen', 'title': 'Drummer'}]
+        self.user.schools = [{'institution': 'Imperial College', 'degree': 'BSc'}]
+        self.user.save()
+        current_user = UserFactory()
+        project = ProjectFactory(creator=current_user)
+        project.add_contributor(self.user, auth=Auth(current_user), save=True)
+
+        # Matching users are fetched with a single query
+        with mock.patch.object(User, 'find', wraps=User.find) as mock_find:
+            contribs = search.search_contributor(self.name1, current_user=current_user)
+        assert_equal(mock_find.call_count, 1)
+        assert_equal(len(contribs['users']), 1)
+        result = contribs['users'][0]
+        assert_equal(result['employment'], 'Queen')
+        assert_equal(result['education'], 'Imperial College')
+        assert_equal(result['n_projects_in_common'], 1)
+        assert_in(hashlib.md5(self.user.username).hexdigest(), result['gravatar_url'])
+
 @requires_search
 class TestProjectSearchResults(SearchTestCase):
     def setUp(self):
@@ -823,6 +883,60 @@ class TestSearchMigration(SearchTestCase):
             assert_equal(var[settings.ELASTIC_INDEX + '_v{}'.format(n + 1)]['aliases'].keys()[0], settings.ELASTIC_INDEX)
             assert not var.get(settings.ELASTIC_INDEX + '_v{}'.format(n))
 
+    @mock.patch('website.search_migration.migrate.multiprocessing.Pool')
+    def test_parallel_migration(self, mock_pool):
+        # Run the chunks in this process
+        mock_pool.return_value.imap_unordered.side_effect = lambda func, tasks: map(func, tasks)
+        migrate(delete=False, index=settings.ELASTIC_INDEX, app=self.app.app, processes=2)
+        var = self.es.indices.get_aliases()
+        assert_equal(var[settings.ELASTIC_INDEX + '_v1']['aliases'].keys()[0], settings.ELASTIC_INDEX)
+        self.es.indices.refresh(settings.ELASTIC_INDEX)
+        assert_equal(len(query_user(self.user.fullname)['results']), 1)
+        assert_equal(len(query(self.project.title)['results']), 1)
+        checkpoint_path = settings.ELASTIC_REINDEX_CHECKPOINT.format(index=settings.ELASTIC_INDEX)
+        assert_false(os.path.exists(checkpoint_path))
+
+    @mock.patch('website.search_migration.migrate.multiprocessing.Pool')
+    def test_parallel_reindex_skips_finished_chunks(self, mock_pool):
+        mock_pool.return_value.imap_unordered.return_value = []
+        fd, checkpoint_path = tempfile.mkstemp()
+        os.close(fd)
+        search_migration.save_checkpoint(checkpoint_path, {
+            'index': settings.ELASTIC_INDEX,
+            'done': {'user': max(User.find().get_keys())},
+        })
+        try:
+            search_migration.reindex(settings.ELASTIC_INDEX, 2, checkpoint_path)
+        finally:
+            os.remove(checkpoint_path)
+        tasks = mock_pool.return_value.imap_unordered.call_args[0][1]
+        assert_equal(
+            [(kind, ids) for kind, index, ids in tasks],
+            [('node', [self.project._id])]
+        )
+
+    @mock.patch.object(settings, 'ELASTIC_REINDEX_CHUNK_SIZE', 1)
+    @mock.patch('website.search_migration.migrate.multiprocessing.Pool')
+    def test_parallel_reindex_checkpoints_finished_prefix(self, mock_pool):
+        UserFactory()
+        user_ids = sorted(User.find().get_keys())
+        # Every chunk but the first one finishes
+        mock_pool.return_value.imap_unordered.return_value = [
+            ('user', user_id, user_id, 1, 0) for user_id in reversed(user_ids[1:])
+        ]
+        fd, checkpoint_path = tempfile.mkstemp()
+        os.close(fd)
+        search_migration.save_checkpoint(checkpoint_path, {
+            'index': settings.ELASTIC_INDEX,
+            'done': {},
+        })
+        try:
+            search_migration.reindex(settings.ELASTIC_INDEX, 2, checkpoint_path)
+            checkpoint = search_migration.load_checkpoint(checkpoint_path)
+        finally:
+            os.remove(checkpoint_path)
+        assert_not_in('user', checkpoint['done'])
+
 class TestSearchFiles(SearchTestCase):
 
     def setUp(self):
@@ -897,3 +1011,151 @@ class TestSearchFiles(SearchTestCase):
         node.save()
         find = query_file('The Dock of the Bay.mp3')['results']
         assert_equal(len(find), 0)
+
+
+@requires_search
+class TestIndexingQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.queue = elastic_search.IndexingQueue()
+        self._sync = settings.ELASTIC_INDEX_SYNC
+        settings.ELASTIC_INDEX_SYNC = False
+
+    def tearDown(self):
+        settings.ELASTIC_INDEX_SYNC = self._sync
+        if self.queue.timer is not None:
+            self.queue.timer.cancel()
+
+    @mock.patch('website.search.elastic_search.helpers.bulk')
+    def test_updates_are_coalesced_per_document(self, mock_bulk):
+        mock_bulk.return_value = (2, [])
+        self.queue.add({'_op_type': 'index', '_index': TEST_INDEX, '_type': 'user', '_id': 'abc', '_source': {'user': 'old'}})
+        self.queue.add({'_op_type': 'index', '_index': TEST_INDEX, '_type': 'file', '_id': 'def', '_source': {}})
+        self.queue.add({'_op_type': 'index', '_index': TEST_INDEX, '_type': 'user', '_id': 'abc', '_source': {'user': 'new'}})
+        assert_false(mock_bulk.called)
+        self.queue.flush()
+        actions = mock_bulk.call_args[0][1]
+        assert_equal([action['_id'] for action in actions], ['def', 'abc'])
+        assert_equal(actions[1]['_source'], {'user': 'new'})
+        assert_not_in('refresh', mock_bulk.call_args[1])
+        assert_equal(self.queue.pending, {})
+
+    @mock.patch('website.search.elastic_search.helpers.bulk')
+    def test_partial_updates_are_merged(self, mock_bulk):
+        mock_bulk.return_value = (1, [])
+        self.queue.add({'_op_type': 'index', '_index': TEST_INDEX, '_type': 'project', '_id': 'abc', '_source': {'title': 'old', 'tags': []}})
+        self.queue.add({'_op_type': 'update', '_index': TEST_INDEX, '_type': 'project', '_id': 'abc', 'doc': {'title': 'new'}})
+        self.queue.add({'_op_type': 'update', '_index': TEST_INDEX, '_type': 'component', '_id': 'def', 'doc': {'title': 'new'}})
+        self.queue.add({'_op_type': 'update', '_index': TEST_INDEX, '_type': 'component', '_id': 'def', 'doc': {'tags': ['a']}})
+        self.queue.flush()
+        actions = mock_bulk.call_args[0][1]
+        assert_equal(actions[0]['_op_type'], 'index')
+        assert_equal(actions[0]['_source'], {'title': 'new', 'tags': []})
+        assert_equal(actions[1]['_op_type'], 'update')
+        assert_equal(actions[1]['doc'], {'title': 'new', 'tags': ['a']})
+
+    @mock.patch('website.search.elastic_search.helpers.bulk')
+    def test_sync_mode_flushes_with_refresh(self, mock_bulk):
+        mock_bulk.return_value = (1, [])
+        settings.ELASTIC_INDEX_SYNC = True
+        self.queue.add({'_op_type': 'delete', '_index': TEST_INDEX, '_type': 'user', '_id': 'abc'})
+        assert_true(mock_bulk.called)
+        assert_true(mock_bulk.call_args[1]['refresh'])
+
+    @mock.patch('website.search.elastic_search.helpers.bulk')
+    def test_flush_when_buffer_is_full(self, mock_bulk):
+        mock_bulk.return_value = (2, [])
+        with mock.patch.object(settings, 'ELASTIC_BULK_SIZE', 2):
+            self.queue.add({'_op_type': 'delete', '_index': TEST_INDEX, '_type': 'user', '_id': 'abc'})
+            assert_false(mock_bulk.called)
+            self.queue.add({'_op_type': 'delete', '_index': TEST_INDEX, '_type': 'user', '_id': 'def'})
+            assert_true(mock_bulk.called)
+
+    @mock.patch('website.search.elastic_search.helpers.bulk')
+    def test_actions_are_requeued_on_connection_error(self, mock_bulk):
+        mock_bulk.side_effect = ConnectionError('unreachable')
+        self.queue.add({'_op_type': 'index', '_index': TEST_INDEX, '_type': 'project', '_id': 'abc', '_source': {'title': 'old'}})
+        self.queue.flush()
+        # Updates queued before the retry are merged into the requeued action
+        self.queue.add({'_op_type': 'update', '_index': TEST_INDEX, '_type': 'project', '_id': 'abc', 'doc': {'title': 'new'}})
+        mock_bulk.side_effect = None
+        mock_bulk.return_value = (1, [])
+        mock_bulk.reset_mock()
+        # Nothing is sent until the backoff elapses
+        self.queue.flush()
+        assert_false(mock_bulk.called)
+        self.queue.retry_at = time.time()
+        self.queue.flush()
+        actions = mock_bulk.call_args[0][1]
+        assert_equal(len(actions), 1)
+        assert_equal(actions[0]['_op_type'], 'index')
+        assert_equal(actions[0]['_source'], {'title': 'new'})
+        assert_equal(self.queue.pending, {})
+
+    @mock.patch('website.search.elastic_search.index_missing_node')
+    @mock.patch('website.search.elastic_search.helpers.bulk')
+    def test_missing_document_of_partial_update_is_indexed(self, mock_bulk, mock_index_missing):
+        mock_bulk.return_value = (0, [
+            {'update': {'_index': TEST_INDEX, '_type': 'project', '_id': 'abc', 'status': 404}},
+        ])
+        self.queue.add({'_op_type': 'update', '_index': TEST_INDEX, '_type': 'project', '_id': 'abc', 'doc': {'title': 'new'}})
+        self.queue.flush()
+        mock_index_missing.assert_called_once_with('abc', TEST_INDEX)
+
+    @mock.patch('website.search.elastic_search.helpers.bulk')
+    def test_full_buffer_does_not_flush_while_backing_off(self, mock_bulk):
+        mock_bulk.side_effect = ConnectionError('unreachable')
+        with mock.patch.object(settings, 'ELASTIC_BULK_SIZE', 1):
+            self.queue.add({'_op_type': 'delete', '_index': TEST_INDEX, '_type': 'user', '_id': 'abc'})
+            assert_equal(mock_bulk.call_count, 1)
+            self.queue.add({'_op_type': 'delete', '_index': TEST_INDEX, '_type': 'user', '_id': 'def'})
+        assert_equal(mock_bulk.call_count, 1)
+        assert_equal(len(self.queue.pending), 2)
+
+    def test_buffer_drops_oldest_actions_when_full(self):
+        with mock.patch.object(settings, 'ELASTIC_MAX_PENDING', 2):
+            for doc_id in ('abc', 'def', 'ghi'):
+                self.queue.add({'_op_type': 'delete', '_index': TEST_INDEX, '_type': 'user', '_id': doc_id})
+        assert_equal([key[2] for key in self.queue.pending], ['def', 'ghi'])
+
+    @mock.patch('website.search.elastic_search.helpers.bulk')
+    def test_sync_mode_raises_on_connection_error(self, mock_bulk):
+        mock_bulk.side_effect = ConnectionError('unreachable')
+        settings.ELASTIC_INDEX_SYNC = True
+        with assert_raises(ConnectionError):
+            self.queue.add({'_op_type': 'delete', '_index': TEST_INDEX, '_type': 'user', '_id': 'abc'})
+        assert_in((TEST_INDEX, 'user', 'abc'), self.queue.pending)
+
+
+@requires_search
+class TestSearchCache(unittest.TestCase):
+
+    def setUp(self):
+        elastic_search.search_cache.clear()
+        self.responses = {'responses': [
+            {'hits': {'total': 0, 'hits': []}, 'aggregations': {'tag_cloud': {'buckets': []}}},
+            {'hits': {'total': 0, 'hits': []}, 'aggregations': {'licenses': {'buckets': []}}},
+            {'hits': {'total': 0, 'hits': []}, 'aggregations': {'counts': {'buckets': []}}},
+            {'hits': {'total': 0, 'hits': []}},
+        ]}
+
+    def tearDown(self):
+        elastic_search.search_cache.clear()
+
+    @mock.patch('website.search.elastic_search.es')
+    def test_search_is_one_round_trip_and_cached(self, mock_es):
+        mock_es.msearch.return_value = self.responses
+        first = elastic_search.search(build_query('cats'), index=TEST_INDEX)
+        second = elastic_search.search(build_query('cats'), index=TEST_INDEX)
+        assert_equal(mock_es.msearch.call_count, 1)
+        assert_false(mock_es.search.called)
+        assert_equal(first, second)
+        elastic_search.search(build_query('dogs'), index=TEST_INDEX)
+        assert_equal(mock_es.msearch.call_count, 2)
+
+    @mock.patch('website.search.elastic_search.es')
+    def test_malformed_query(self, mock_es):
+        self.responses['responses'][3] = {'error': 'SearchPhaseExecutionException[ParseException]'}
+        mock_es.msearch.return_value = self.responses
+        with assert_raises(elastic_search.exceptions.MalformedQueryError):
+            elastic_search.search(build_query('cats'), index=TEST_INDEX)
@@ -32,7 +32,7 @@ from website.exceptions import NodeStateError
 from website.profile.utils import serialize_user
 from website.project.signals import contributor_added
 from website.project.model import (
-    Comment, Node, NodeLog, Pointer, ensure_schemas, has_anonymous_link,
+    Comment, Node, NodeLog, Pointer, Tag, ensure_schemas, has_anonymous_link,
     get_pointer_parent, Embargo, MetaSchema, DraftRegistration
 )
 from website.util.permissions import CREATOR_PERMISSIONS, ADMIN, READ, WRITE, DEFAULT_CONTRIBUTOR_PERMISSIONS
@@ -3003,7 +3003,7 @@ class TestProject(OsfTestCase):
     def test_get_recent_logs(self):
         # Add some logs
         for _ in range(5):
-            self.project.logs.append(NodeLogFactory())
+            self.project.add_log('file_added', params={'project': self.project._id}, auth=self.auth)
         # Expected logs appears
         assert_equal(
             self.project.get_recent_logs(3),
@@ -3015,10 +3015,47 @@ class TestProject(OsfTestCase):
         )
 
     def test_date_modified(self):
-        self.project.logs.append(NodeLogFactory())
+        self.project.add_log('file_added', params={'project': self.project._id}, auth=self.auth)
         assert_equal(self.project.date_modified, self.project.logs[-1].date)
         assert_not_equal(self.project.date_modified, self.project.date_created)
 
+    def test_date_modified_falls_back_to_logs(self):
+        self.project.date_last_logged = None
+        assert_equal(self.project.date_modified, self.project.logs[-1].date)
+
+    def test_add_log_updates_counters(self):
+        n_logs = self.project.log_count
+        other = UserFactory()
+        self.project.add_log('file_added', params={'project': self.project._id}, auth=self.auth)
+        self.project.add_log('file_added', params={'project': self.project._id}, auth=Auth(other))
+        assert_equal(self.project.log_count, n_logs + 2)
+        assert_equal(self.project.log_count, len(self.project.logs))
+        assert_equal(self.project.get_log_count(other), 1)
+        assert_equal(self.project.date_last_logged, self.project.logs[-1].date)
+
+    def test_log_counters_are_computed_on_read_without_saving(self):
+        # Nodes saved before the counters existed
+        self.project.log_count = None
+        self.project.user_log_counts = {}
+        self.project.save()
+        with mock.patch.object(Node, 'save') as mock_save:
+            assert_equal(self.project.get_log_count(self.user), len(self.project.logs))
+        assert_false(mock_save.called)
+        self.project.reload()
+        assert_is_none(self.project.log_count)
+
+    def test_add_log_computes_missing_counters(self):
+        self.project.log_count = None
+        self.project.user_log_counts = {}
+        self.project.add_log('file_added', params={'project': self.project._id}, auth=self.auth)
+        assert_equal(self.project.log_count, len(self.project.logs))
+        assert_equal(self.project.get_log_count(self.user), len(self.project.logs))
+
+    def test_fork_copies_log_counters(self):
+        fork = self.project.fork_node(self.auth)
+        assert_equal(fork.log_count, len(fork.logs))
+        assert_equal(fork.get_log_count(self.user), self.project.get_log_count(self.user) + 1)
+
     def test_replace_contributor(self):
         contrib = UserFactory()
         self.project.add_contributor(contrib, auth=Auth(self.project.creator))
@@ -3354,6 +3391,32 @@ class TestForkNode(OsfTestCase):
         # Compare fork to original
         self._cmp_fork_original(self.user, fork_date, fork, self.project)
 
+    def test_fork_sets_log_tag_and_parent_backrefs(self):
+        self.project.add_tag('fish', auth=self.auth)
+        component = NodeFactory(creator=self.user, parent=self.project)
+
+        fork = self.project.fork_node(auth=self.auth)
+
+        for log in self.project.logs:
+            assert_in(fork._id, log.node__logged)
+        for log in component.logs:
+            assert_in(fork.nodes[0]._id, log.node__logged)
+        assert_in(fork._id, Tag.load('fish').node__tagged)
+        assert_equal(fork.nodes[0].parent_node, fork)
+
+    @mock.patch('website.project.cloning.settings.PIWIK_HOST', 'http://piwik.test')
+    @mock.patch('website.project.cloning.piwik_tasks.update_nodes')
+    @mock.patch('website.project.model.piwik_tasks.update_node')
+    def test_fork_updates_piwik_once_for_tree(self, mock_update_node, mock_update_nodes):
+        NodeFactory(creator=self.user, parent=self.project)
+
+        fork = self.project.fork_node(auth=self.auth)
+
+        mock_update_nodes.assert_called_once_with([fork._id, fork.nodes[0]._id])
+        forked_ids = {fork._id, fork.nodes[0]._id}
+        for call in mock_update_node.call_args_list:
+            assert_not_in(call[0][0], forked_ids)
+
     def test_fork_private_children(self):
         """Tests that only public components are created
 
@@ -3585,6 +3648,18 @@ class TestRegisterNode(OsfTestCase):
             assert_not_in(node, self.project.nodes)
             assert_true(node.is_registration)
 
+    def test_register_checks_whole_tree_before_writing(self):
+        writer = UserFactory()
+        self.project.add_contributor(writer, permissions=[READ, WRITE], auth=self.auth)
+        self.project.save()
+        NodeFactory(creator=UserFactory(), parent=self.project)
+        node_count = Node.find().count()
+
+        with assert_raises(PermissionsError):
+            self.project.register_node(get_default_metaschema(), Auth(user=writer), '')
+
+        assert_equal(Node.find().count(), node_count)
+
     def test_private_contributor_registration(self):
 
         # Create some nodes
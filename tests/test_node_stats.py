@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+from nose.tools import *  # noqa
+
+from framework.auth import Auth
+
+from tests.base import OsfTestCase, get_default_metaschema
+from tests.factories import (
+    UserFactory, ProjectFactory, FolderFactory, WatchConfigFactory,
+)
+
+from website.models import WatchConfig
+from website.project import stats as node_stats
+
+
+class TestNodeStats(OsfTestCase):
+
+    def setUp(self):
+        super(TestNodeStats, self).setUp()
+        self.user = UserFactory()
+        self.auth = Auth(user=self.user)
+        self.project = ProjectFactory(creator=self.user, is_public=True)
+        # Store the initial counts, so that later changes go through `increment`
+        node_stats.refresh(self.project)
+
+    def assert_stats_match_backrefs(self):
+        self.project.reload()
+        stored = node_stats.get_stats(self.project)
+        for field, count in node_stats.compute(self.project).items():
+            assert_equal(stored[field], count, field)
+
+    def test_get_stats_computes_missing_counts(self):
+        project = ProjectFactory()
+        assert_is_none(node_stats.get_collection().find_one({'_id': project._id}))
+        stats = node_stats.get_stats(project)
+        assert_equal(stats, dict((field, 0) for field in node_stats.FIELDS))
+        assert_is_not_none(node_stats.get_collection().find_one({'_id': project._id}))
+
+    def test_increment_without_stored_counts_is_noop(self):
+        project = ProjectFactory()
+        node_stats.increment(project, 'forks')
+        assert_is_none(node_stats.get_collection().find_one({'_id': project._id}))
+
+    def test_increment_none(self):
+        node_stats.increment(None, 'forks')
+
+    def test_fork_and_remove(self):
+        fork = self.project.fork_node(self.auth)
+        assert_equal(node_stats.get_stats(self.project)['forks'], 1)
+        fork.remove_node(self.auth)
+        assert_equal(node_stats.get_stats(self.project)['forks'], 0)
+        self.assert_stats_match_backrefs()
+
+    def test_register(self):
+        registration = self.project.register_node(get_default_metaschema(), self.auth, '', None)
+        assert_equal(node_stats.get_stats(self.project)['registrations'], 1)
+        registration.delete_registration_tree(save=True)
+        assert_equal(node_stats.get_stats(self.project)['registrations'], 0)
+        self.assert_stats_match_backrefs()
+
+    def test_add_and_remove_pointer(self):
+        linker = ProjectFactory(creator=self.user)
+        pointer = linker.add_pointer(self.project, auth=self.auth)
+        assert_equal(node_stats.get_stats(self.project)['pointers'], 1)
+        linker.rm_pointer(pointer, auth=self.auth)
+        assert_equal(node_stats.get_stats(self.project)['pointers'], 0)
+        self.assert_stats_match_backrefs()
+
+    def test_pointer_from_folder_not_counted(self):
+        folder = FolderFactory(creator=self.user)
+        folder.add_pointer(self.project, auth=self.auth)
+        assert_equal(node_stats.get_stats(self.project)['pointers'], 0)
+        self.assert_stats_match_backrefs()
+
+    def test_remove_linking_node(self):
+        linker = ProjectFactory(creator=self.user)
+        linker.add_pointer(self.project, auth=self.auth)
+        linker.remove_node(self.auth)
+        assert_equal(node_stats.get_stats(self.project)['pointers'], 0)
+        self.assert_stats_match_backrefs()
+
+    def test_use_as_template(self):
+        new = self.project.use_as_template(self.auth)
+        assert_equal(node_stats.get_stats(self.project)['templates'], 1)
+        new.remove_node(self.auth)
+        assert_equal(node_stats.get_stats(self.project)['templates'], 0)
+        self.assert_stats_match_backrefs()
+
+    def test_watch_and_unwatch(self):
+        self.user.watch(WatchConfigFactory(node=self.project))
+        self.user.save()
+        assert_equal(node_stats.get_stats(self.project)['watchers'], 1)
+        self.user.unwatch(WatchConfig(node=self.project))
+        self.user.save()
+        assert_equal(node_stats.get_stats(self.project)['watchers'], 0)
+        self.assert_stats_match_backrefs()
@@ -1224,7 +1224,7 @@ class TestSendDigest(OsfTestCase):
         ]
 
         assert_equal(len(user_groups), 2)
-        assert_equal(user_groups, expected)
+        assert_equal(user_groups, sorted(expected, key=lambda group: group['user_id']))
         digest_ids = [d._id, d2._id, d3._id]
         remove_notifications(email_notification_ids=digest_ids)
 
@@ -1275,12 +1275,13 @@ class TestSendDigest(OsfTestCase):
         ]
 
         assert_equal(len(user_groups), 2)
-        assert_equal(user_groups, expected)
+        assert_equal(user_groups, sorted(expected, key=lambda group: group['user_id']))
         digest_ids = [d._id, d2._id, d3._id]
         remove_notifications(email_notification_ids=digest_ids)
 
-    @mock.patch('website.mails.send_mail')
-    def test_send_users_email_called_with_correct_args(self, mock_send_mail):
+    @mock.patch('website.mails.send_mails')
+    @mock.patch('website.mails.build_mail')
+    def test_send_users_email_called_with_correct_args(self, mock_build_mail, mock_send_mails):
         send_type = 'email_transactional'
         d = factories.NotificationDigestFactory(
             user_id=factories.UserFactory()._id,
@@ -1292,14 +1293,13 @@ class TestSendDigest(OsfTestCase):
         d.save()
         user_groups = get_users_emails(send_type)
         send_users_email(send_type)
-        assert_true(mock_send_mail.called)
-        assert_equals(mock_send_mail.call_count, len(user_groups))
+        assert_equals(mock_build_mail.call_count, len(user_groups))
+        assert_equals(mock_send_mails.call_count, 1)
 
         last_user_index = len(user_groups) - 1
         user = User.load(user_groups[last_user_index]['user_id'])
-        email_notification_ids = [message['_id'] for message in user_groups[last_user_index]['info']]
 
-        args, kwargs = mock_send_mail.call_args
+        args, kwargs = mock_build_mail.call_args
 
         assert_equal(kwargs['to_addr'], user.username)
         assert_equal(kwargs['mimetype'], 'html')
@@ -1307,7 +1307,47 @@ class TestSendDigest(OsfTestCase):
         assert_equal(kwargs['name'], user.fullname)
         message = group_by_node(user_groups[last_user_index]['info'])
         assert_equal(kwargs['message'], message)
-        assert_equal(kwargs['callback'], remove_notifications(email_notification_ids=email_notification_ids))
+
+        messages = mock_send_mails.call_args[0][0]
+        assert_equal(len(messages), len(user_groups))
+        with assert_raises(NoResultsFound):
+            NotificationDigest.find_one(Q('_id', 'eq', d._id))
+
+    @mock.patch('website.mails.send_mails')
+    @mock.patch('website.mails.build_mail')
+    def test_send_users_email_sends_in_batches(self, mock_build_mail, mock_send_mails):
+        send_type = 'email_transactional'
+        for _ in range(3):
+            factories.NotificationDigestFactory(
+                user_id=factories.UserFactory()._id,
+                send_type=send_type,
+                timestamp=datetime.datetime.utcnow(),
+                message='Hello',
+                node_lineage=[factories.ProjectFactory()._id]
+            ).save()
+        with mock.patch('website.settings.DIGEST_BATCH_SIZE', 2):
+            send_users_email(send_type)
+        assert_equal(mock_build_mail.call_count, 3)
+        assert_equal(
+            [len(call[0][0]) for call in mock_send_mails.call_args_list],
+            [2, 1]
+        )
+        assert_equal(get_users_emails(send_type), [])
+
+    def test_remove_notifications_removes_all_ids_at_once(self):
+        digests = [
+            factories.NotificationDigestFactory(
+                user_id=factories.UserFactory()._id,
+                timestamp=datetime.datetime.utcnow(),
+                message='Hello',
+                node_lineage=[factories.ProjectFactory()._id]
+            )
+            for _ in range(3)
+        ]
+        with mock.patch.object(NotificationDigest, 'remove', wraps=NotificationDigest.remove) as mock_remove:
+            remove_notifications(email_notification_ids=[d._id for d in digests])
+        assert_equal(mock_remove.call_count, 1)
+        assert_equal(NotificationDigest.find(Q('_id', 'in', [d._id for d in digests])).count(), 0)
 
     def test_remove_sent_digest_notifications(self):
         d = factories.NotificationDigestFactory(
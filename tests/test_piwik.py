@@ -1,8 +1,12 @@
+import unittest
+
+import mock
 from nose.tools import *
 
 from tests.base import OsfTestCase
 from tests.factories import ProjectFactory, UserFactory
 from tests.test_features import requires_piwik
+from framework.analytics import tasks as piwik_tasks
 
 
 @requires_piwik
@@ -22,3 +26,14 @@ class TestCreateProject(OsfTestCase):
 
     def test_has_piwik_site_id(self):
         assert_true(self.project.piwik_site_id)
+
+
+class TestUpdateNodes(unittest.TestCase):
+
+    @mock.patch('framework.analytics.tasks.update_node')
+    def test_queues_one_task_per_node(self, mock_update_node):
+        piwik_tasks.update_nodes(['abc', 'def'])
+        assert_equal(
+            mock_update_node.call_args_list,
+            [mock.call('abc'), mock.call('def')],
+        )
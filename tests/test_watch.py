@@ -8,6 +8,7 @@ import datetime as dt
 from pytz import utc
 from nose.tools import *  # flake8: noqa (PEP8 asserts)
 from framework.auth import Auth
+from framework.auth.core import _iter_log_ids_since, _merge_into_reversed
 from framework.exceptions import HTTPError
 from tests.base import OsfTestCase
 from tests.factories import (UserFactory, ProjectFactory,
@@ -81,6 +82,54 @@ class TestWatching(OsfTestCase):
         log_ids = list(self.user.get_recent_log_ids(since=since))
         assert_equal(len(log_ids), 2)
 
+    def test_get_recent_log_ids_merges_watched_nodes(self):
+        other = ProjectFactory(creator=self.user)
+        fork = self.project.fork_node(self.consolidate_auth)
+        other.add_log(
+            'tag_added',
+            params={'project': other._primary_key},
+            auth=self.consolidate_auth,
+        )
+        for node in (self.project, other, fork):
+            self._watch_project(node)
+        log_ids = list(self.user.get_recent_log_ids())
+        expected = set(self.project.logs._to_primary_keys()) | set(other.logs._to_primary_keys()) | set(fork.logs._to_primary_keys())
+        # Logs shared by the project and its fork are listed once
+        assert_equal(len(log_ids), len(expected))
+        assert_equal(set(log_ids), expected)
+        assert_equal(log_ids, sorted(log_ids, reverse=True))
+
+    def test_get_recent_logs_query_counts_recent_log_ids(self):
+        self._watch_project(self.project)
+        since = dt.datetime.utcnow().replace(tzinfo=utc) - dt.timedelta(days=101)
+        assert_equal(
+            [log._id for log in self.user.get_recent_logs_query(since=since)],
+            list(self.user.get_recent_log_ids(since=since))
+        )
+
+    def test_iter_log_ids_since_filters_at_cutoff(self):
+        log_ids = ['{:024x}'.format(n) for n in range(10)]
+        assert_equal(
+            list(_iter_log_ids_since(log_ids, log_ids[6])),
+            list(reversed(log_ids[7:]))
+        )
+
+    def test_iter_log_ids_since_out_of_order(self):
+        # e.g. lists rebuilt as `logs + existing_logs` by a migration
+        log_ids = ['{:024x}'.format(n) for n in (8, 9, 1, 2, 7)]
+        assert_equal(
+            list(_iter_log_ids_since(log_ids, '{:024x}'.format(2))),
+            ['{:024x}'.format(n) for n in (9, 8, 7)]
+        )
+
+    def test_merge_into_reversed(self):
+        first = ['{:024x}'.format(n) for n in (9, 5, 1)]
+        second = ['{:024x}'.format(n) for n in (8, 5, 2)]
+        assert_equal(
+            list(_merge_into_reversed(iter(first), iter(second), iter([]))),
+            ['{:024x}'.format(n) for n in (9, 8, 5, 2, 1)]
+        )
+
     def test_get_daily_digest_log_ids(self):
         self._watch_project(self.project)
         day_log_ids = list(self.user.get_daily_digest_log_ids())
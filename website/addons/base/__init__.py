@@ -2,24 +2,21 @@
 import os
 import glob
 import importlib
+import datetime
 import mimetypes
 from bson import ObjectId
 from modularodm import fields
 from mako.lookup import TemplateLookup
-from time import sleep
 
-import requests
 from modularodm import Q
 
 from framework.auth.decorators import must_be_logged_in
 from framework.mongo import StoredObject
 from framework.routing import process_rules
-from framework.exceptions import (
-    PermissionsError,
-    HTTPError,
-)
+from framework.exceptions import PermissionsError
 
 from website import settings
+from website.addons.base import crawler
 from website.addons.base import serializer
 from website.project.model import Node
 from website.util import waterbutler_url_for
@@ -708,7 +705,7 @@ class StorageAddonBase(object):
             name = name + ": {folder}".format(folder=folder_name)
         return name
 
-    def _get_fileobj_child_metadata(self, filenode, user, cookie=None, version=None):
+    def _get_fileobj_metadata_url(self, filenode, user, cookie=None, version=None):
         kwargs = dict(
             provider=self.config.short_name,
             path=filenode.get('path', ''),
@@ -720,41 +717,145 @@ class StorageAddonBase(object):
             kwargs['cookie'] = cookie
         if version:
             kwargs['version'] = version
-        metadata_url = waterbutler_url_for(
+        return waterbutler_url_for(
             'metadata',
             **kwargs
         )
-        res = requests.get(metadata_url)
-        if res.status_code != 200:
-            raise HTTPError(res.status_code, data={
-                'error': res.json(),
-            })
-        # TODO: better throttling?
-        sleep(1.0 / 5.0)
-        return res.json().get('data', [])
+
+    def _get_metadata_error_children(self, response, version=None):
+        """Return the children to list for a folder whose metadata request
+        failed with `response`, or `None` to raise the error. Override for
+        providers that report e.g. empty versions as errors.
+        """
+        return None
+
+    def _get_metadata_error_handler(self, version=None):
+        def on_error(folder, depth, response):
+            return self._get_metadata_error_children(
+                response, version=version if depth == 0 else None
+            )
+        return on_error
+
+    def _get_metadata_url_getter(self, user, cookie=None, version=None):
+        def get_url(folder, depth):
+            # Only the top-level listing is requested at `version`
+            return self._get_fileobj_metadata_url(
+                folder, user, cookie=cookie, version=version if depth == 0 else None
+            )
+        return get_url
 
     def _get_file_tree(self, filenode=None, user=None, cookie=None, version=None):
         """
-        Recursively get file metadata
+        Recursively get file metadata. Folders at the same depth are listed
+        concurrently; see `website.addons.base.crawler`.
         """
         filenode = filenode or {
             'path': '/',
             'kind': 'folder',
             'name': self.root_node.name,
         }
-        if filenode.get('kind') == 'file':
-            return filenode
-        elif 'size' in filenode:
-            return filenode
-        kwargs = {
-            'version': version,
-            'cookie': cookie,
+        get_url = self._get_metadata_url_getter(user, cookie=cookie, version=version)
+        return crawler.crawl(
+            filenode, get_url, self.config.short_name,
+            on_error=self._get_metadata_error_handler(version=version),
+        )
+
+    def _iter_files(self, user=None, cookie=None, version=None):
+        """
+        Yield the metadata of every file in the addon as its folder is listed,
+        without building the file tree
+        """
+        root = {
+            'path': '/',
+            'kind': 'folder',
+            'name': self.root_node.name,
         }
-        filenode['children'] = [
-            self._get_file_tree(child, user, cookie=cookie)
-            for child in self._get_fileobj_child_metadata(filenode, user, **kwargs)
-        ]
-        return filenode
+        get_url = self._get_metadata_url_getter(user, cookie=cookie, version=version)
+        on_error = self._get_metadata_error_handler(version=version)
+        for _, children in crawler.walk(root, get_url, self.config.short_name, on_error=on_error):
+            for child in children:
+                if child.get('kind') == 'file':
+                    yield child
+
+class RemoteStateMixin(StoredObject):
+    """Mixin class for node settings that cache state held by the remote
+    service, such as whether a repository is private, so that page loads
+    never wait on the service. Subclasses implement `fetch_remote_state`
+    and `remote_state_key`.
+
+    Cached state is refreshed by a background task once it is older than
+    `settings.ADDON_REMOTE_STATE_TTL`, or after `invalidate_remote_state`
+    (e.g. when the service notifies us of a change).
+    """
+    remote_state = fields.DictionaryField()
+    remote_state_date = fields.DateTimeField()
+
+    _meta = {
+        'abstract': True,
+    }
+
+    @property
+    def remote_state_key(self):
+        """Identifier of the remote resource, e.g. the repository name; state
+        cached for a different resource is ignored.
+        """
+        raise NotImplementedError()
+
+    def fetch_remote_state(self):
+        """Fetch the state of the remote resource from the service.
+
+        :return dict: Remote state, or `None` if the service could not be
+            reached
+        """
+        raise NotImplementedError()
+
+    @property
+    def remote_state_is_stale(self):
+        if self.remote_state_date is None:
+            return True
+        if self.remote_state.get('key') != self.remote_state_key:
+            return True
+        ttl = datetime.timedelta(seconds=settings.ADDON_REMOTE_STATE_TTL)
+        return self.remote_state_date + ttl < datetime.datetime.utcnow()
+
+    def get_remote_state(self):
+        """Return the cached remote state without contacting the service,
+        queueing a refresh if it is stale.
+
+        :return dict: Remote state, or `None` if not cached yet
+        """
+        from website.addons.base import tasks
+        if self.remote_state_is_stale:
+            tasks.refresh_remote_state(self.config.short_name, self.owner._id)
+        return self._cached_remote_state()
+
+    def _cached_remote_state(self):
+        if not self.remote_state or self.remote_state.get('key') != self.remote_state_key:
+            return None
+        return self.remote_state
+
+    def refresh_remote_state(self, save=True):
+        """Fetch and cache the remote state. If the service cannot be reached,
+        the previous state is kept until the next refresh.
+
+        :return dict: Remote state, or `None`
+        """
+        state = self.fetch_remote_state()
+        if state is not None:
+            state['key'] = self.remote_state_key
+            self.remote_state = state
+        self.remote_state_date = datetime.datetime.utcnow()
+        if save:
+            self.save()
+        return self._cached_remote_state()
+
+    def invalidate_remote_state(self, save=True):
+        """Mark the cached state as stale and queue a refresh."""
+        self.remote_state_date = None
+        if save:
+            self.save()
+        self.get_remote_state()
+
 
 class AddonOAuthNodeSettingsBase(AddonNodeSettingsBase):
     _meta = {
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""Concurrent listing of addon file trees through WaterButler."""
+import time
+import logging
+import functools
+import threading
+from multiprocessing.pool import ThreadPool
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from framework.exceptions import HTTPError
+
+from website import settings
+
+logger = logging.getLogger(__name__)
+
+# Responses worth retrying; anything else that is not a 200 is raised
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket(object):
+    """Thread-safe token bucket allowing `rate` acquisitions per second, with
+    bursts of up to `capacity`.
+    """
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self.tokens = self.capacity
+        self.updated = time.time()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available."""
+        while True:
+            with self.lock:
+                now = time.time()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(provider):
+    """Return the rate limiter shared by all crawls of `provider` in this process."""
+    with _buckets_lock:
+        if provider not in _buckets:
+            _buckets[provider] = TokenBucket(settings.ARCHIVE_CRAWL_RATE)
+        return _buckets[provider]
+
+
+session = requests.Session()
+session.mount('http://', HTTPAdapter(pool_maxsize=settings.ARCHIVE_CRAWL_WORKERS))
+session.mount('https://', HTTPAdapter(pool_maxsize=settings.ARCHIVE_CRAWL_WORKERS))
+
+
+def fetch_children(url, bucket, on_error=None):
+    """GET a WaterButler metadata URL and return the listed children, retrying
+    connection errors and `RETRY_STATUS_CODES` with exponential backoff.
+
+    :param function on_error: Takes the failed response and returns the
+        children to use instead, or `None` to raise the error
+    """
+    for attempt in range(settings.ARCHIVE_CRAWL_MAX_RETRIES + 1):
+        bucket.acquire()
+        try:
+            res = session.get(url)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == settings.ARCHIVE_CRAWL_MAX_RETRIES:
+                raise
+        else:
+            if res.status_code == 200:
+                return res.json().get('data', [])
+            if res.status_code not in RETRY_STATUS_CODES or attempt == settings.ARCHIVE_CRAWL_MAX_RETRIES:
+                if on_error is not None:
+                    children = on_error(res)
+                    if children is not None:
+                        return children
+                raise HTTPError(res.status_code, data={
+                    'error': res.json(),
+                })
+        delay = settings.ARCHIVE_CRAWL_BACKOFF * 2 ** attempt
+        logger.warning('Retrying {0} in {1} seconds'.format(url, delay))
+        time.sleep(delay)
+
+
+def needs_listing(filenode):
+    return filenode.get('kind') != 'file' and 'size' not in filenode
+
+
+def walk(root, get_url, provider, workers=None, on_error=None):
+    """List a file tree level by level, fetching all folders of a level
+    concurrently. Yields (folder, children) as each level is fetched; nothing
+    is attached to the folders, so listed levels can be garbage collected.
+
+    :param dict root: Metadata of the folder to start from
+    :param function get_url: Takes (filenode, depth) and returns the metadata
+        URL of that folder. Called on the calling thread, so it may use the
+        request context.
+    :param str provider: Addon short name, used to pick the rate limiter
+    :param function on_error: Takes (filenode, depth, response) for a folder
+        whose listing failed and returns the children to use instead, or
+        `None` to raise the error. Called on the worker threads.
+    """
+    bucket = get_bucket(provider)
+
+    def fetch(fetch_args):
+        url, handler = fetch_args
+        return fetch_children(url, bucket, on_error=handler)
+
+    pool = ThreadPool(workers or settings.ARCHIVE_CRAWL_WORKERS)
+    try:
+        level = [root] if needs_listing(root) else []
+        depth = 0
+        while level:
+            fetches = [
+                (get_url(filenode, depth), functools.partial(on_error, filenode, depth) if on_error else None)
+                for filenode in level
+            ]
+            listings = pool.map(fetch, fetches)
+            next_level = []
+            for filenode, children in zip(level, listings):
+                yield filenode, children
+                next_level.extend(child for child in children if needs_listing(child))
+            level = next_level
+            depth += 1
+    finally:
+        pool.close()
+        pool.join()
+
+
+def crawl(root, get_url, provider, workers=None, on_error=None):
+    """Like `walk`, but attach each folder's listing as its `children`.
+
+    :return: `root`, with nested `children`
+    """
+    for filenode, children in walk(root, get_url, provider, workers=workers, on_error=on_error):
+        filenode['children'] = children
+    return root
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+
+from framework.tasks import app
+from framework.tasks.handlers import queued_task
+from framework.transactions.context import transaction
+
+
+@queued_task
+@app.task(ignore_result=True)
+@transaction()
+def refresh_remote_state(addon_name, node_id):
+    """Refresh the cached remote state of a node's add-on; see
+    `RemoteStateMixin`.
+    """
+    # Avoid circular imports
+    from website import models
+    node = models.Node.load(node_id)
+    node_addon = node.get_addon(addon_name) if node else None
+    if node_addon is not None:
+        node_addon.refresh_remote_state()
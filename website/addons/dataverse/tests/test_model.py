@@ -4,7 +4,7 @@ import mock
 from tests.base import get_default_metaschema
 from tests.factories import UserFactory, ProjectFactory
 from framework.auth.decorators import Auth
-from framework.exceptions import PermissionsError
+from framework.exceptions import PermissionsError, HTTPError
 
 from website.addons.dataverse.model import AddonDataverseNodeSettings
 from website.addons.dataverse.tests.utils import DataverseAddonTestCase
@@ -75,6 +75,25 @@ class TestDataverseNodeSettings(DataverseAddonTestCase):
         assert_true(hasattr(node_settings, 'dataset'))
         assert_true(hasattr(node_settings, 'dataset_doi'))
 
+    @mock.patch('website.addons.base.crawler.session')
+    def test_get_file_tree_no_published_files(self, mock_session):
+        # The Dataverse API returns a 404 if the dataset has no published files
+        mock_session.get.return_value = mock.Mock(status_code=404)
+        file_tree = self.node_settings._get_file_tree(user=self.user, version='latest-published')
+        assert_equal(file_tree['children'], [])
+
+    @mock.patch('website.addons.base.crawler.session')
+    def test_iter_files_no_published_files(self, mock_session):
+        mock_session.get.return_value = mock.Mock(status_code=404)
+        files = self.node_settings._iter_files(user=self.user, version='latest-published')
+        assert_equal(list(files), [])
+
+    @mock.patch('website.addons.base.crawler.session')
+    def test_get_file_tree_draft_not_found_raises(self, mock_session):
+        mock_session.get.return_value = mock.Mock(status_code=404)
+        with assert_raises(HTTPError):
+            self.node_settings._get_file_tree(user=self.user, version='latest')
+
     def test_defaults(self):
         node_settings = AddonDataverseNodeSettings(user_settings=self.user_settings)
         node_settings.save()
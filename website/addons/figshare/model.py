@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+import requests
 from modularodm import fields
 
 from framework.auth.decorators import Auth
@@ -7,7 +8,7 @@ from framework.auth.decorators import Auth
 from website.models import NodeLog
 from website.addons.base import exceptions
 from website.addons.base import AddonNodeSettingsBase, AddonUserSettingsBase
-from website.addons.base import StorageAddonBase
+from website.addons.base import StorageAddonBase, RemoteStateMixin
 
 from . import messages
 from .api import Figshare
@@ -47,7 +48,7 @@ class AddonFigShareUserSettings(AddonUserSettingsBase):
         super(AddonFigShareUserSettings, self).delete(save=save)
 
 
-class AddonFigShareNodeSettings(StorageAddonBase, AddonNodeSettingsBase):
+class AddonFigShareNodeSettings(StorageAddonBase, RemoteStateMixin, AddonNodeSettingsBase):
 
     figshare_id = fields.StringField()
     figshare_type = fields.StringField()
@@ -237,6 +238,18 @@ class AddonFigShareNodeSettings(StorageAddonBase, AddonNodeSettingsBase):
 
         return ret
 
+    @property
+    def remote_state_key(self):
+        if self.figshare_id:
+            return '{0}:{1}'.format(self.figshare_type, self.figshare_id)
+
+    def fetch_remote_state(self):
+        connect = Figshare.from_settings(self.user_settings)
+        try:
+            return {'is_public': connect.article_is_public(self.figshare_id)}
+        except requests.exceptions.RequestException:
+            return None
+
     #############
     # Callbacks #
     #############
@@ -263,10 +276,12 @@ class AddonFigShareNodeSettings(StorageAddonBase, AddonNodeSettingsBase):
             else:
                 message = messages.BEFORE_PAGE_LOAD_PUBLIC_NODE_MIXED_FS.format(category=node.project_or_component, project_id=figshare.figshare_id)
 
-        connect = Figshare.from_settings(self.user_settings)
-        article_is_public = connect.article_is_public(self.figshare_id)
+        # Only read cached state; don't wait on figshare while rendering
+        state = self.get_remote_state()
+        if state is None:
+            return []
 
-        article_permissions = 'public' if article_is_public else 'private'
+        article_permissions = 'public' if state['is_public'] else 'private'
 
         if article_permissions != node_permissions:
             message = messages.BEFORE_PAGE_LOAD_PERM_MISMATCH.format(
@@ -15,7 +15,7 @@ from website import settings
 from website.util import web_url_for
 from website.addons.base import exceptions
 from website.addons.base import AddonUserSettingsBase, AddonNodeSettingsBase
-from website.addons.base import StorageAddonBase
+from website.addons.base import StorageAddonBase, RemoteStateMixin
 
 from website.addons.github import utils
 from website.addons.github.api import GitHub
@@ -139,7 +139,7 @@ class AddonGitHubUserSettings(AddonUserSettingsBase):
         super(AddonGitHubUserSettings, self).delete(save=save)
 
 
-class AddonGitHubNodeSettings(StorageAddonBase, AddonNodeSettingsBase):
+class AddonGitHubNodeSettings(StorageAddonBase, RemoteStateMixin, AddonNodeSettingsBase):
 
     user = fields.StringField()
     repo = fields.StringField()
@@ -211,9 +211,33 @@ class AddonGitHubNodeSettings(StorageAddonBase, AddonNodeSettingsBase):
             return '/'.join([self.user, self.repo])
 
     @property
-    def is_private(self):
+    def remote_state_key(self):
+        return self.short_url
+
+    def fetch_remote_state(self):
         connection = GitHub.from_settings(self.user_settings)
-        return connection.repo(user=self.user, repo=self.repo).private
+        try:
+            repo = connection.repo(user=self.user, repo=self.repo)
+        except NotFoundError:
+            return {'exists': False}
+        except (ApiError, GitHubError):
+            return None
+        return {'exists': True, 'private': repo.private}
+
+    @property
+    def is_private(self):
+        """Whether the repo is private, from the cached remote state; the
+        state is only fetched while rendering if it has never been cached.
+
+        :raises: NotFoundError if the repo does not exist
+        :raises: ApiError if GitHub cannot be reached
+        """
+        state = self.get_remote_state() or self.refresh_remote_state()
+        if state is None:
+            raise ApiError('Could not fetch repo {0}'.format(self.short_url))
+        if not state['exists']:
+            raise NotFoundError
+        return state['private']
 
     # TODO: Delete me and replace with serialize_settings / Knockout
     def to_json(self, user):
@@ -328,15 +352,13 @@ class AddonGitHubNodeSettings(StorageAddonBase, AddonNodeSettingsBase):
         if self.user_settings is None:
             return messages
 
-        connect = GitHub.from_settings(self.user_settings)
-
-        try:
-            repo = connect.repo(self.user, self.repo)
-        except (ApiError, GitHubError):
-            return
+        # Only read cached state; don't wait on GitHub while rendering
+        state = self.get_remote_state()
+        if state is None or not state['exists']:
+            return messages
 
         node_permissions = 'public' if node.is_public else 'private'
-        repo_permissions = 'private' if repo.private else 'public'
+        repo_permissions = 'private' if state['private'] else 'public'
         if repo_permissions != node_permissions:
             message = (
                 'Warning: This OSF {category} is {node_perm}, but the GitHub '
@@ -447,6 +469,8 @@ class AddonGitHubNodeSettings(StorageAddonBase, AddonNodeSettingsBase):
                 )
             )
 
+        self.invalidate_remote_state()
+
         return (
             'GitHub repo {user}::{repo} made {perm}.'.format(
                 user=self.user,
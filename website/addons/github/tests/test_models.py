@@ -59,11 +59,12 @@ class TestCallbacks(OsfTestCase):
         self.project.is_public = True
         self.project.save()
         mock_repo.return_value = Repository.from_json({'private': False})
-        message = self.node_settings.before_page_load(self.project, self.project.creator)
+        self.node_settings.refresh_remote_state()
         mock_repo.assert_called_with(
-            self.node_settings.user,
-            self.node_settings.repo,
+            user=self.node_settings.user,
+            repo=self.node_settings.repo,
         )
+        message = self.node_settings.before_page_load(self.project, self.project.creator)
         assert_false(message)
 
     @mock.patch('website.addons.github.api.GitHub.repo')
@@ -71,32 +72,78 @@ class TestCallbacks(OsfTestCase):
         self.project.is_public = True
         self.project.save()
         mock_repo.return_value = Repository.from_json({'private': True})
+        self.node_settings.refresh_remote_state()
         message = self.node_settings.before_page_load(self.project, self.project.creator)
-        mock_repo.assert_called_with(
-            self.node_settings.user,
-            self.node_settings.repo,
-        )
         assert_true(message)
 
     @mock.patch('website.addons.github.api.GitHub.repo')
     def test_before_page_load_osf_private_gh_public(self, mock_repo):
         mock_repo.return_value = Repository.from_json({'private': False})
+        self.node_settings.refresh_remote_state()
         message = self.node_settings.before_page_load(self.project, self.project.creator)
-        mock_repo.assert_called_with(
-            self.node_settings.user,
-            self.node_settings.repo,
-        )
         assert_true(message)
 
     @mock.patch('website.addons.github.api.GitHub.repo')
     def test_before_page_load_osf_private_gh_private(self, mock_repo):
         mock_repo.return_value = Repository.from_json({'private': True})
+        self.node_settings.refresh_remote_state()
+        message = self.node_settings.before_page_load(self.project, self.project.creator)
+        assert_false(message)
+
+    @mock.patch('website.addons.base.tasks.refresh_remote_state')
+    @mock.patch('website.addons.github.api.GitHub.repo')
+    def test_before_page_load_not_cached(self, mock_repo, mock_refresh):
         message = self.node_settings.before_page_load(self.project, self.project.creator)
-        mock_repo.assert_called_with(
-            self.node_settings.user,
-            self.node_settings.repo,
-        )
         assert_false(message)
+        assert_false(mock_repo.called)
+        mock_refresh.assert_called_once_with('github', self.project._id)
+
+    @mock.patch('website.addons.base.tasks.refresh_remote_state')
+    @mock.patch('website.addons.github.api.GitHub.repo')
+    def test_before_page_load_reads_cached_state(self, mock_repo, mock_refresh):
+        mock_repo.return_value = Repository.from_json({'private': False})
+        self.node_settings.refresh_remote_state()
+        mock_repo.reset_mock()
+        message = self.node_settings.before_page_load(self.project, self.project.creator)
+        assert_true(message)
+        assert_false(mock_repo.called)
+        assert_false(mock_refresh.called)
+
+    @mock.patch('website.addons.base.tasks.refresh_remote_state')
+    @mock.patch('website.addons.github.api.GitHub.repo')
+    def test_remote_state_ignored_after_repo_change(self, mock_repo, mock_refresh):
+        mock_repo.return_value = Repository.from_json({'private': False})
+        self.node_settings.refresh_remote_state()
+        self.node_settings.repo = 'News-of-the-World'
+        self.node_settings.save()
+        assert_is_none(self.node_settings.get_remote_state())
+        mock_refresh.assert_called_once_with('github', self.project._id)
+
+    @mock.patch('website.addons.base.tasks.refresh_remote_state')
+    @mock.patch('website.addons.github.api.GitHub.repo')
+    def test_invalidate_remote_state(self, mock_repo, mock_refresh):
+        mock_repo.return_value = Repository.from_json({'private': False})
+        self.node_settings.refresh_remote_state()
+        self.node_settings.invalidate_remote_state()
+        assert_true(self.node_settings.remote_state_is_stale)
+        mock_refresh.assert_called_once_with('github', self.project._id)
+        # Stale state is still served until the refresh completes
+        assert_false(self.node_settings.get_remote_state()['private'])
+
+    @mock.patch('website.addons.github.api.GitHub.repo')
+    def test_refresh_remote_state_keeps_state_on_error(self, mock_repo):
+        mock_repo.return_value = Repository.from_json({'private': True})
+        self.node_settings.refresh_remote_state()
+        mock_repo.side_effect = GitHubError(mock.Mock())
+        state = self.node_settings.refresh_remote_state()
+        assert_true(state['private'])
+        assert_false(self.node_settings.remote_state_is_stale)
+
+    @mock.patch('website.addons.github.api.GitHub.repo')
+    def test_is_private_not_found(self, mock_repo):
+        mock_repo.side_effect = NotFoundError
+        with assert_raises(NotFoundError):
+            self.node_settings.is_private
 
     def test_before_page_load_not_contributor(self):
         message = self.node_settings.before_page_load(self.project, UserFactory())
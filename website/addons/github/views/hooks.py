@@ -79,6 +79,9 @@ def github_hook_callback(node_addon, **kwargs):
 
     node = kwargs['node'] or kwargs['project']
 
+    # Any event may follow a change to the repo, e.g. its privacy
+    node_addon.invalidate_remote_state()
+
     payload = request.json
 
     for commit in payload.get('commits', []):
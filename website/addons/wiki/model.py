@@ -2,6 +2,7 @@
 
 import datetime
 import functools
+import hashlib
 import logging
 
 from bleach import linkify
@@ -12,13 +13,14 @@ import markdown
 from markdown.extensions import codehilite, fenced_code, wikilinks
 from modularodm import fields
 
+from framework.cache import LRUCache
 from framework.forms.utils import sanitize
 from framework.guid.model import GuidStoredObject
 
 from website import settings
 from website.addons.base import AddonNodeSettingsBase
 from website.addons.wiki import utils as wiki_utils
-from website.addons.wiki.settings import WIKI_CHANGE_DATE
+from website.addons.wiki.settings import RENDER_CACHE_SIZE, WIKI_CHANGE_DATE
 from website.project.signals import write_permissions_revoked
 
 from website.exceptions import NodeStateError
@@ -32,6 +34,16 @@ from .exceptions import (
 
 logger = logging.getLogger(__name__)
 
+# Rendered output of wiki pages, keyed on page id. Each entry maps a render
+# context (output kind, version, node, content digest) to the rendered text.
+rendered_cache = LRUCache(maxsize=RENDER_CACHE_SIZE)
+
+
+def invalidate_rendered(page_ids):
+    """Drop the cached renders of the given wiki pages."""
+    for page_id in page_ids:
+        rendered_cache.delete(page_id)
+
 
 class AddonWikiNodeSettings(AddonNodeSettingsBase):
 
@@ -92,6 +104,7 @@ class AddonWikiNodeSettings(AddonNodeSettingsBase):
         :return str: Alert message
 
         """
+        invalidate_rendered(node.wiki_pages_current.values())
         if permissions == 'private':
             if self.is_publicly_editable:
                 self.set_editing(permissions=False, log=False)
@@ -177,8 +190,29 @@ class NodeWikiPage(GuidStoredObject):
     def rendered_before_update(self):
         return self.date < WIKI_CHANGE_DATE
 
+    def _cached_render(self, kind, node, render):
+        """Return the output of `render`, reusing a previous render of the same
+        version and content of this page in the context of `node`.
+        """
+        if self._id is None:
+            return render()
+        content = self.content or ''
+        if isinstance(content, unicode):
+            content = content.encode('utf-8')
+        key = (kind, self.version, node._id, hashlib.md5(content).hexdigest())
+        renders = rendered_cache.get(self._id)
+        if renders is None:
+            renders = {}
+            rendered_cache.set(self._id, renders)
+        if key not in renders:
+            renders[key] = render()
+        return renders[key]
+
     def html(self, node):
         """The cleaned HTML of the page"""
+        return self._cached_render('html', node, functools.partial(self._render_html, node))
+
+    def _render_html(self, node):
         sanitized_content = render_content(self.content, node=node)
         try:
             return linkify(
@@ -192,7 +226,11 @@ class NodeWikiPage(GuidStoredObject):
     def raw_text(self, node):
         """ The raw text of the page, suitable for using in a test search"""
 
-        return sanitize(self.html(node), tags=[], strip=True)
+        return self._cached_render(
+            'text',
+            node,
+            lambda: sanitize(self.html(node), tags=[], strip=True),
+        )
 
     def get_draft(self, node):
         """
@@ -216,12 +254,14 @@ class NodeWikiPage(GuidStoredObject):
         return self.content
 
     def save(self, *args, **kwargs):
+        invalidate_rendered([self._id])
         rv = super(NodeWikiPage, self).save(*args, **kwargs)
         if self.node:
             self.node.update_search()
         return rv
 
     def rename(self, new_name, save=True):
+        invalidate_rendered([self._id])
         self.page_name = new_name
         if save:
             self.save()
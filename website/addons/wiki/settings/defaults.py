@@ -11,3 +11,6 @@ SHAREJS_DB_URL = 'mongodb://{}:{}/{}'.format(settings.DB_HOST, settings.DB_PORT,
 
 # TODO: Change to release date for wiki change
 WIKI_CHANGE_DATE = datetime.datetime.utcfromtimestamp(1423760098)
+
+# Maximum number of wiki pages whose rendered HTML is cached per process
+RENDER_CACHE_SIZE = 1000
@@ -20,7 +20,7 @@ from website.exceptions import NodeStateError
 from website.addons.wiki import settings
 from website.addons.wiki import views
 from website.addons.wiki.exceptions import InvalidVersionError
-from website.addons.wiki.model import NodeWikiPage, render_content
+from website.addons.wiki.model import NodeWikiPage, render_content, rendered_cache
 from website.addons.wiki.utils import (
     get_sharejs_uuid, generate_private_uuid, share_db, delete_share_doc,
     migrate_uuid, format_wiki_version, serialize_wiki_settings,
@@ -708,6 +708,46 @@ class TestWikiLinks(OsfTestCase):
         assert_equal(expected, wiki.html(node))
 
 
+class TestWikiRenderCache(OsfTestCase):
+
+    def setUp(self):
+        super(TestWikiRenderCache, self).setUp()
+        rendered_cache.clear()
+        self.project = ProjectFactory()
+        self.wiki = NodeWikiFactory(content='# Header\n[[wiki2]]', node=self.project)
+
+    def tearDown(self):
+        super(TestWikiRenderCache, self).tearDown()
+        rendered_cache.clear()
+
+    @mock.patch('website.addons.wiki.model.render_content')
+    def test_html_is_rendered_once_per_version(self, mock_render):
+        mock_render.return_value = '<h1>Header</h1>'
+        self.wiki.html(self.project)
+        self.wiki.html(self.project)
+        self.wiki.raw_text(self.project)
+        assert_equal(mock_render.call_count, 1)
+
+    @mock.patch('website.addons.wiki.model.render_content')
+    def test_html_is_rendered_per_node(self, mock_render):
+        mock_render.return_value = '<h1>Header</h1>'
+        fork = ProjectFactory()
+        self.wiki.html(self.project)
+        self.wiki.html(fork)
+        assert_equal(mock_render.call_count, 2)
+
+    def test_changed_content_is_rendered(self):
+        assert_in('Header', self.wiki.html(self.project))
+        self.wiki.content = 'Footer'
+        assert_in('Footer', self.wiki.html(self.project))
+
+    def test_rename_invalidates_cache(self):
+        self.wiki.html(self.project)
+        assert_in(self.wiki._id, rendered_cache)
+        self.wiki.rename('renamed')
+        assert_not_in(self.wiki._id, rendered_cache)
+
+
 class TestWikiUuid(OsfTestCase):
 
     def setUp(self):
@@ -73,3 +73,33 @@ class AggregateStatResult(object):
     @property
     def disk_usage(self):
         return sum([value.disk_usage for value in self.targets])
+
+
+class StatSummary(object):
+    """
+    Totals for an addon file tree, collected while the tree is listed. Used in
+    place of an AggregateStatResult when the tree is too large to keep; the
+    per-file listing can be written to `manifest`, the path of a JSON lines file
+    """
+    def __init__(self, target_id, target_name, num_files=0, disk_usage=0, manifest=None):
+        self.target_id = target_id
+        self.target_name = target_name
+        self.num_files = num_files
+        self.disk_usage = float(disk_usage)
+        self.manifest = manifest
+
+    def __str__(self):
+        return str(self._to_dict())
+
+    def add(self, disk_usage):
+        self.num_files += 1
+        self.disk_usage += float(disk_usage or 0)
+
+    def _to_dict(self):
+        return {
+            'target_id': self.target_id,
+            'target_name': self.target_name,
+            'num_files': self.num_files,
+            'disk_usage': self.disk_usage,
+            'manifest': self.manifest,
+        }
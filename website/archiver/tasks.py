@@ -1,6 +1,8 @@
-import requests
+import os
 import json
 
+import requests
+
 import celery
 from celery.utils.log import get_task_logger
 
@@ -89,7 +91,7 @@ def stat_addon(addon_short_name, job_pk):
 
     :param addon_short_name: AddonConfig.short_name of the addon to be examined
     :param job_pk: primary key of archive_job
-    :return: AggregateStatResult containing file tree metadata
+    :return: StatSummary with the number and size of the addon's files
     """
     # Dataverse reqires special handling for draft and
     # published content
@@ -102,8 +104,21 @@ def stat_addon(addon_short_name, job_pk):
     job = ArchiveJob.load(job_pk)
     src, dst, user = job.info()
     src_addon = src.get_addon(addon_name)
+    manifest = None
+    if settings.ARCHIVE_STAT_MANIFEST_DIR:
+        manifest = os.path.join(
+            settings.ARCHIVE_STAT_MANIFEST_DIR,
+            '{0}-{1}.jsonl'.format(job_pk, addon_short_name)
+        )
     try:
-        file_tree = src_addon._get_file_tree(user=user, version=version)
+        # Files are totalled as their folders are listed, so neither the
+        # tree nor the result grows with the number of files
+        result = utils.stat_files(
+            src_addon._id,
+            addon_short_name,
+            src_addon._iter_files(user=user, version=version),
+            manifest=manifest,
+        )
     except HTTPError as e:
         dst.archive_job.update_target(
             addon_short_name,
@@ -111,11 +126,6 @@ def stat_addon(addon_short_name, job_pk):
             errors=[e.data['error']],
         )
         raise
-    result = AggregateStatResult(
-        src_addon._id,
-        addon_short_name,
-        targets=[utils.aggregate_file_tree_metadata(addon_short_name, file_tree, user)],
-    )
     return result
 
 
@@ -205,7 +215,7 @@ def archive_node(stat_results, job_pk):
     initiated registration, then either fail the registration or
     create a celery.group group of subtasks to archive addons
 
-    :param results: results from the #stat_addon subtasks spawned in #stat_node
+    :param results: StatSummary results from the #stat_addon subtasks spawned in #stat_node
     :param job_pk: primary key of ArchiveJob
     :return: None
     """
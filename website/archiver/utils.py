@@ -1,7 +1,9 @@
+import json
+
 from framework.auth import Auth
 
 from website.archiver import (
-    StatResult, AggregateStatResult,
+    StatResult, AggregateStatResult, StatSummary,
     ARCHIVER_NETWORK_ERROR,
     ARCHIVER_SIZE_EXCEEDED,
 )
@@ -131,6 +133,31 @@ def aggregate_file_tree_metadata(addon_short_name, fileobj_metadata, user):
             targets=[aggregate_file_tree_metadata(addon_short_name, child, user) for child in fileobj_metadata.get('children', [])],
         )
 
+def stat_files(target_id, target_name, files, manifest=None):
+    """Total the number and size of files as they are listed, keeping only the
+    totals in memory
+
+    :param files: iterable of file metadata, e.g. `StorageAddonBase._iter_files`
+    :param manifest: if given, path of a JSON lines file to write each file's
+    path, name and size to
+    :return: StatSummary
+    """
+    result = StatSummary(target_id, target_name, manifest=manifest)
+    manifest_file = open(manifest, 'w') if manifest else None
+    try:
+        for file_metadata in files:
+            result.add(file_metadata.get('size'))
+            if manifest_file:
+                manifest_file.write(json.dumps({
+                    'path': file_metadata['path'],
+                    'name': file_metadata['name'],
+                    'size': file_metadata.get('size'),
+                }) + '\n')
+    finally:
+        if manifest_file:
+            manifest_file.close()
+    return result
+
 def before_archive(node, user):
     link_archive_provider(node, user)
     job = ArchiveJob(
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""In-process index of citation styles, so that the style typeahead does not
+scan the `citationstyle` collection on every keystroke.
+
+Styles only change when `scripts/parse_citation_styles.py` runs. The index is
+built on first use and rebuilt when the number of styles or their latest
+`date_parsed` changes, which is checked at most every
+`settings.CITATION_STYLES_INDEX_CHECK_INTERVAL` seconds.
+"""
+import re
+import time
+import bisect
+import threading
+
+from website import settings
+from website.citations.models import CitationStyle
+
+
+TOKEN_RE = re.compile(r'[^\W_]+', re.UNICODE)
+
+# Fields whose words are matched by searches
+INDEXED_FIELDS = ('id', 'title', 'short_title')
+
+
+def tokenize(text):
+    """Split text into lowercase words."""
+    return TOKEN_RE.findall((text or '').lower())
+
+
+def get_version():
+    """Identify the current set of parsed styles.
+
+    :returns: Tuple of the number of styles and the latest parse date
+    """
+    latest = list(CitationStyle.find().sort('-date_parsed').limit(1))
+    return (
+        CitationStyle.find().count(),
+        latest[0].date_parsed if latest else None,
+    )
+
+
+class StyleIndex(object):
+    """Serialized styles, ordered by title, and a sorted list of
+    `(word, style_id)` pairs used to find the styles whose words start with
+    each word of a search.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        """Discard the index; it is rebuilt on next use."""
+        self._data = None
+        self._checked = None
+
+    def build(self, version=None):
+        version = version or get_version()
+        styles = sorted(
+            (style.to_json() for style in CitationStyle.find()),
+            key=lambda style: (style['title'].lower(), style['id']),
+        )
+        words = sorted(set(
+            (word, style['id'])
+            for style in styles
+            for field in INDEXED_FIELDS
+            for word in tokenize(style[field])
+        ))
+        by_id = dict((style['id'], style) for style in styles)
+        rank = dict((style['id'], position) for position, style in enumerate(styles))
+        self._data = (version, styles, by_id, rank, words)
+
+    def ensure_current(self):
+        now = time.time()
+        if self._checked is not None and now - self._checked < settings.CITATION_STYLES_INDEX_CHECK_INTERVAL:
+            return
+        with self._lock:
+            version = get_version()
+            if self._data is None or self._data[0] != version:
+                self.build(version)
+            self._checked = now
+
+    def all(self):
+        """Return every style, ordered by title."""
+        self.ensure_current()
+        return list(self._data[1])
+
+    def search(self, term, limit=None):
+        """Find styles having, for every word of `term`, a word in their id,
+        title or short title that starts with it. A style whose id is `term`
+        comes first; the rest are ordered by title.
+
+        :param str term: Search text
+        :param int limit: Maximum number of styles returned
+        :returns: list of serialized styles
+        """
+        self.ensure_current()
+        _, _, by_id, rank, words = self._data
+        matches = None
+        for prefix in set(tokenize(term)):
+            found = set()
+            index = bisect.bisect_left(words, (prefix,))
+            while index < len(words) and words[index][0].startswith(prefix):
+                found.add(words[index][1])
+                index += 1
+            matches = found if matches is None else matches & found
+            if not matches:
+                return []
+        if matches is None:
+            return []
+        exact = term.strip().lower()
+        ordered = sorted(matches, key=lambda _id: (_id.lower() != exact, rank[_id]))
+        return [by_id[_id] for _id in ordered[:limit]]
+
+
+style_index = StyleIndex()
@@ -2,24 +2,20 @@
 
 from flask import request
 
-from modularodm import Q
-from website.models import CitationStyle
+from website import settings
+from website.citations.index import style_index
 from website.project.decorators import must_be_contributor_or_public
 
 
 def list_citation_styles():
-    query = None
-
     term = request.args.get('q')
     if term:
-        query = (
-            Q('_id', 'icontains', term) |
-            Q('title', 'icontains', term) |
-            Q('short_title', 'icontains', term)
-        )
+        styles = style_index.search(term, limit=settings.CITATION_STYLES_SEARCH_LIMIT)
+    else:
+        styles = style_index.all()
 
     return {
-        'styles': [style.to_json() for style in CitationStyle.find(query)],
+        'styles': styles,
     }
 
 
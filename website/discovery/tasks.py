@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+
+from framework.tasks import app as celery_app
+
+from website.discovery import utils
+
+
+@celery_app.task(name='discovery.update_activity', ignore_result=True)
+def update_activity():
+    """Recompute the snapshot of the public activity page."""
+    utils.update_activity()
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""The public activity page is rendered from a snapshot that the
+`discovery.update_activity` task stores in MongoDB, so that rendering the page
+is a single read and does not depend on Piwik being available.
+"""
+import datetime
+import logging
+
+from modularodm import Q
+
+from framework.mongo import database
+from framework.analytics.piwik import PiwikClient
+
+from website import settings
+from website.project import Node
+from website.project.utils import recent_public_registrations
+
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = 'discoveryactivity'
+SNAPSHOT_ID = 'activity'
+
+# Number of nodes listed in each section of the page
+LIST_SIZE = 10
+
+# Popular nodes are loaded from Piwik's list in batches of this size
+LOAD_BATCH_SIZE = 50
+
+
+def get_collection():
+    return database[COLLECTION]
+
+
+def serialize_node(node):
+    """Summary of a node, with the fields rendered by the activity page."""
+    return {
+        '_id': node._id,
+        'title': node.title,
+        'url': node.url,
+        'api_url': node.api_url,
+        'is_registration': node.is_registration,
+        'date_created': node.date_created,
+        'registered_date': node.registered_date,
+    }
+
+
+def get_popular_nodes():
+    """Fetch last week's most viewed public projects and registrations from
+    Piwik.
+
+    :returns: Tuple of popular projects, popular registrations and a dict of
+        hits and visits keyed by node id
+    """
+    popular_public_projects = []
+    popular_public_registrations = []
+
+    # get the date for exactly one week ago
+    target_date = datetime.date.today() - datetime.timedelta(weeks=1)
+
+    client = PiwikClient(
+        url=settings.PIWIK_HOST,
+        auth_token=settings.PIWIK_ADMIN_TOKEN,
+        site_id=settings.PIWIK_SITE_ID,
+        period='week',
+        date=target_date.strftime('%Y-%m-%d'),
+    )
+
+    popular_project_ids = [
+        x for x in client.custom_variables if x.label == 'Project ID'
+    ][0].values
+
+    for start in range(0, len(popular_project_ids), LOAD_BATCH_SIZE):
+        batch = popular_project_ids[start:start + LOAD_BATCH_SIZE]
+        for node in Node.load_many([nid.value for nid in batch]):
+            if node.is_public and not node.is_registration and not node.is_deleted:
+                if len(popular_public_projects) < LIST_SIZE:
+                    popular_public_projects.append(node)
+            elif node.is_public and node.is_registration and not node.is_deleted and not node.is_retracted:
+                if len(popular_public_registrations) < LIST_SIZE:
+                    popular_public_registrations.append(node)
+        if len(popular_public_projects) >= LIST_SIZE and len(popular_public_registrations) >= LIST_SIZE:
+            break
+
+    popular = set(node._id for node in popular_public_projects + popular_public_registrations)
+    hits = {
+        x.value: {
+            'hits': x.actions,
+            'visits': x.visits
+        } for x in popular_project_ids if x.value in popular
+    }
+    return popular_public_projects, popular_public_registrations, hits
+
+
+def compute_activity(previous=None):
+    """Build a snapshot of the activity page.
+
+    :param dict previous: Last stored snapshot; its popular nodes are kept if
+        Piwik cannot be reached
+    :returns: dict of serialized node lists
+    """
+    previous = previous or {}
+
+    recent_query = (
+        Q('category', 'eq', 'project') &
+        Q('is_public', 'eq', True) &
+        Q('is_deleted', 'eq', False)
+    )
+
+    recent_public_projects = Node.find(
+        recent_query &
+        Q('is_registration', 'eq', False)
+    ).sort(
+        '-date_created'
+    ).limit(LIST_SIZE)
+
+    snapshot = {
+        'recent_public_projects': [serialize_node(node) for node in recent_public_projects],
+        'recent_public_registrations': [serialize_node(node) for node in recent_public_registrations(n=LIST_SIZE)],
+        'popular_public_projects': previous.get('popular_public_projects', []),
+        'popular_public_registrations': previous.get('popular_public_registrations', []),
+        'hits': previous.get('hits', {}),
+    }
+
+    if settings.PIWIK_HOST:
+        try:
+            projects, registrations, hits = get_popular_nodes()
+        except Exception as error:
+            logger.error('Could not fetch popular nodes from Piwik; keeping previous lists')
+            logger.exception(error)
+        else:
+            snapshot.update({
+                'popular_public_projects': [serialize_node(node) for node in projects],
+                'popular_public_registrations': [serialize_node(node) for node in registrations],
+                'hits': hits,
+            })
+
+    return snapshot
+
+
+def update_activity():
+    """Compute and store the snapshot of the activity page.
+
+    :returns: The stored snapshot
+    """
+    collection = get_collection()
+    snapshot = compute_activity(previous=collection.find_one({'_id': SNAPSHOT_ID}))
+    snapshot['date_computed'] = datetime.datetime.utcnow()
+    collection.update({'_id': SNAPSHOT_ID}, {'$set': snapshot}, upsert=True)
+    return snapshot
+
+
+def get_activity():
+    """Return the stored snapshot of the activity page, computing it if none
+    has been stored yet.
+    """
+    snapshot = get_collection().find_one({'_id': SNAPSHOT_ID})
+    if snapshot is None:
+        snapshot = update_activity()
+    return snapshot
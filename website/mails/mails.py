@@ -69,27 +69,17 @@ def render_message(tpl_name, **context):
     return tpl.render(**context)
 
 
-def send_mail(to_addr, mail, mimetype='plain', from_addr=None, mailer=None,
-            username=None, password=None, mail_server=None, callback=None, **context):
-    """Send an email from the OSF.
-    Example: ::
-
-        from website import mails
-
-        mails.send_email('foo@bar.com', mails.TEST, name="Foo")
+def build_mail(to_addr, mail, mimetype='plain', from_addr=None, username=None,
+               password=None, mail_server=None, **context):
+    """Render an email and return the keyword arguments for the `send_email`
+    task.
 
     :param str to_addr: The recipient's email address
     :param Mail mail: The mail object
     :param str mimetype: Either 'plain' or 'html'
-    :param function callback: celery task to execute after send_mail completes
     :param **context: Context vars for the message template
-
-    .. note:
-         Uses celery if available
     """
-
     from_addr = from_addr or settings.FROM_EMAIL
-    mailer = mailer or tasks.send_email
     subject = mail.subject(**context)
     message = mail.text(**context) if mimetype in ('plain', 'txt') else mail.html(**context)
     # Don't use ttls and login in DEBUG_MODE
@@ -97,7 +87,7 @@ def send_mail(to_addr, mail, mimetype='plain', from_addr=None, mailer=None,
     logger.debug('Sending email...')
     logger.debug(u'To: {to_addr}\nFrom: {from_addr}\nSubject: {subject}\nMessage: {message}'.format(**locals()))
 
-    kwargs = dict(
+    return dict(
         from_addr=from_addr,
         to_addr=to_addr,
         subject=subject,
@@ -110,6 +100,32 @@ def send_mail(to_addr, mail, mimetype='plain', from_addr=None, mailer=None,
         mail_server=mail_server
     )
 
+
+def send_mail(to_addr, mail, mimetype='plain', from_addr=None, mailer=None,
+            username=None, password=None, mail_server=None, callback=None, **context):
+    """Send an email from the OSF.
+    Example: ::
+
+        from website import mails
+
+        mails.send_email('foo@bar.com', mails.TEST, name="Foo")
+
+    :param str to_addr: The recipient's email address
+    :param Mail mail: The mail object
+    :param str mimetype: Either 'plain' or 'html'
+    :param function callback: celery task to execute after send_mail completes
+    :param **context: Context vars for the message template
+
+    .. note:
+         Uses celery if available
+    """
+
+    mailer = mailer or tasks.send_email
+    kwargs = build_mail(
+        to_addr, mail, mimetype=mimetype, from_addr=from_addr, username=username,
+        password=password, mail_server=mail_server, **context
+    )
+
     if settings.USE_EMAIL:
         if settings.USE_CELERY:
             return mailer.apply_async(kwargs=kwargs, link=callback)
@@ -120,6 +136,23 @@ def send_mail(to_addr, mail, mimetype='plain', from_addr=None, mailer=None,
 
             return ret
 
+
+def send_mails(messages, callback=None):
+    """Send a batch of emails built with `build_mail` in a single task, which
+    delivers them over one SMTP connection.
+
+    :param list messages: Return values of `build_mail`
+    :param function callback: celery task to execute after the batch is sent
+    """
+    if not messages or not settings.USE_EMAIL:
+        return
+    if settings.USE_CELERY:
+        return tasks.send_emails.apply_async(kwargs={'messages': messages}, link=callback)
+    ret = tasks.send_emails(messages)
+    if callback:
+        callback()
+    return ret
+
 # Predefined Emails
 
 TEST = Mail('test', subject='A test email to ${name}')
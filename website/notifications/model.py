@@ -1,3 +1,5 @@
+import pymongo
+
 from modularodm import fields
 
 from framework.mongo import StoredObject, ObjectId
@@ -60,6 +62,15 @@ class NotificationSubscription(StoredObject):
 
 
 class NotificationDigest(StoredObject):
+    __indices__ = [{
+        'unique': False,
+        'key_or_list': [
+            ('send_type', pymongo.ASCENDING),
+            ('user_id', pymongo.ASCENDING),
+            ('_id', pymongo.ASCENDING),
+        ]
+    }]
+
     _id = fields.StringField(primary=True, default=lambda: str(ObjectId()))
     user_id = fields.StringField(index=True)
     timestamp = fields.DateTimeField()
@@ -1,7 +1,10 @@
 """
 Tasks for making even transactional emails consolidated.
 """
-from bson.code import Code
+import itertools
+import operator
+
+import pymongo
 from modularodm import Q
 
 from framework.tasks import app as celery_app
@@ -9,11 +12,10 @@ from framework.mongo import database as db
 from framework.auth.core import User
 from framework.sentry import log_exception
 
-from framework.transactions.context import TokuTransaction
-
 from website.notifications.utils import NotificationsDict
 from website.notifications.model import NotificationDigest
 from website import mails
+from website import settings
 
 
 @celery_app.task(name='notify.send_users_email', max_retries=0)
@@ -23,10 +25,8 @@ def send_users_email(send_type):
     :param send_type
     :return:
     """
-    grouped_emails = get_users_emails(send_type)
-    if not grouped_emails:
-        return
-    for group in grouped_emails:
+    batch, batch_notification_ids = [], []
+    for group in iter_users_emails(send_type):
         user = User.load(group['user_id'])
         if not user:
             log_exception()
@@ -35,14 +35,29 @@ def send_users_email(send_type):
         notification_ids = [message['_id'] for message in info]
         sorted_messages = group_by_node(info)
         if sorted_messages:
-            mails.send_mail(
+            batch.append(mails.build_mail(
                 to_addr=user.username,
                 mimetype='html',
                 mail=mails.DIGEST,
                 name=user.fullname,
-                message=sorted_messages,
-                callback=remove_notifications(email_notification_ids=notification_ids)
-            )
+                message=sorted_messages
+            ))
+            batch_notification_ids.extend(notification_ids)
+        if len(batch) >= settings.DIGEST_BATCH_SIZE:
+            send_digest_batch(batch, batch_notification_ids)
+            batch, batch_notification_ids = [], []
+    if batch:
+        send_digest_batch(batch, batch_notification_ids)
+
+
+def send_digest_batch(messages, notification_ids):
+    """Send rendered digest emails in one task and remove their notifications.
+
+    :param list messages: Return values of `mails.build_mail`
+    :param list notification_ids: NotificationDigest ids included in the messages
+    """
+    mails.send_mails(messages)
+    remove_notifications(email_notification_ids=notification_ids)
 
 
 def get_users_emails(send_type):
@@ -65,26 +80,36 @@ def get_users_emails(send_type):
                 'user_id': ...
               }]
     """
-    with TokuTransaction():
-        emails = db['notificationdigest'].group(
-            key={'user_id': 1},
-            condition={
-                'send_type': send_type
-            },
-            initial={'info': []},
-            reduce=Code(
-                """
-                function(curr, result) {
-                    result.info.push({
-                        'message': curr.message,
-                        'node_lineage': curr.node_lineage,
-                        '_id': curr._id
-                    });
-                };
-                """
-            )
-        )
-    return emails
+    return list(iter_users_emails(send_type))
+
+
+def iter_users_emails(send_type):
+    """Like `get_users_emails`, but yield one user's group at a time, ordered
+    by user id. Digests are read with a cursor sorted on the
+    (send_type, user_id) index, so only the current user's notifications are
+    held in memory.
+
+    :param send_type: from NOTIFICATION_TYPES
+    """
+    cursor = db['notificationdigest'].find(
+        {'send_type': send_type},
+        fields=['user_id', 'message', 'node_lineage'],
+    ).sort([
+        ('user_id', pymongo.ASCENDING),
+        ('_id', pymongo.ASCENDING),
+    ]).batch_size(settings.DIGEST_CURSOR_BATCH_SIZE)
+    for user_id, digests in itertools.groupby(cursor, key=operator.itemgetter('user_id')):
+        yield {
+            'user_id': user_id,
+            'info': [
+                {
+                    'message': digest['message'],
+                    'node_lineage': digest['node_lineage'],
+                    '_id': digest['_id'],
+                }
+                for digest in digests
+            ]
+        }
 
 
 def group_by_node(notifications):
@@ -105,5 +130,5 @@ def remove_notifications(email_notification_ids=None):
     :param email_notification_ids:
     :return:
     """
-    for email_id in email_notification_ids:
-        NotificationDigest.remove(Q('_id', 'eq', email_id))
+    if email_notification_ids:
+        NotificationDigest.remove(Q('_id', 'in', list(email_notification_ids)))
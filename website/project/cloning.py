@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""Copy a node and its component tree, for forks and registrations.
+
+The whole tree is planned before anything is written, so permission problems
+anywhere in the tree are raised before any copy exists. Each copy is then
+saved once; its `logs`, `tags` and `nodes` lists and their back-references
+are written with one update per collection (see
+`framework.mongo.utils.bulk_set_references`) instead of one save per log, tag
+or child. Piwik sites for the new nodes are provisioned by a single task
+queued after the request.
+"""
+
+import datetime
+
+from framework import status
+from framework.exceptions import PermissionsError
+from framework.mongo.utils import bulk_set_references
+from framework.analytics import tasks as piwik_tasks
+
+from website import settings
+from website.exceptions import NodeStateError
+from website.util.permissions import CREATOR_PERMISSIONS
+from website.project import signals as project_signals
+from website.project import stats as node_stats
+
+
+# Foreign list fields whose references and back-references are copied in bulk
+BULK_REFERENCE_FIELDS = ('logs', 'tags')
+
+
+class TreeCloner(object):
+    """Base class for copying a node tree. Subclasses decide which children
+    are copied (`include`), set up each copy before its first save
+    (`prepare`), and finish each copy once the tree is complete (`finish`).
+
+    :param Node root: Root of the tree to copy
+    :param Auth auth: Consolidated authorization
+    """
+    def __init__(self, root, auth):
+        self.root = root
+        self.auth = auth
+        self.when = datetime.datetime.utcnow()
+
+    def include(self, node):
+        """Whether to copy a child node (or pointer) and its descendants."""
+        return not node.is_deleted
+
+    def prepare(self, original, copy, is_root):
+        raise NotImplementedError
+
+    def finish(self, original, copy):
+        pass
+
+    def plan(self):
+        """Walk the tree without writing anything.
+
+        :returns: List of `(node, parent_index)` pairs, with every node after
+            its parent; `parent_index` is `None` for the root
+        """
+        plan = [(self.root, None)]
+        for index, (node, _) in enumerate(plan):
+            if not node.primary:
+                continue
+            for child in node.nodes:
+                if self.include(child):
+                    plan.append((child, index))
+        return plan
+
+    def run(self):
+        """Copy the tree.
+
+        :returns: Copy of the root node
+        """
+        plan = self.plan()
+
+        copies = []
+        for node, parent_index in plan:
+            if node.primary:
+                copy = node.clone()
+                self.prepare(node, copy, is_root=parent_index is None)
+                copy.save(update_piwik=False)
+            else:
+                # Pointers are copied, but not the nodes they point to
+                copy = node._clone()
+            copies.append(copy)
+
+        children = [[] for _ in plan]
+        for index, (_, parent_index) in enumerate(plan):
+            if parent_index is not None and copies[index] is not None:
+                children[parent_index].append(copies[index])
+
+        copied = []
+        for index, (node, _) in enumerate(plan):
+            if not node.primary:
+                continue
+            copy = copies[index]
+            stored = node.to_storage()
+            for field_name in BULK_REFERENCE_FIELDS:
+                bulk_set_references(copy, field_name, stored[field_name])
+            bulk_set_references(copy, 'nodes', children[index])
+            copied.append((node, type(copy).load(copy._primary_key)))
+
+        # Finish children before their parents
+        for node, copy in reversed(copied):
+            self.finish(node, copy)
+
+        if settings.PIWIK_HOST:
+            piwik_tasks.update_nodes([copy._id for _, copy in copied])
+
+        return copied[0][1]
+
+
+def _copy_log_counters(original, copy):
+    copy.log_count = original.log_count
+    copy.user_log_counts = dict(original.user_log_counts)
+    copy.date_last_logged = original.date_last_logged
+
+
+class ForkCloner(TreeCloner):
+    """Copy a node tree as a fork owned by the forking user. Children the user
+    cannot read are left out, along with their descendants.
+
+    :param str title: Text to prepend to the title of the forked root
+    """
+    def __init__(self, root, auth, title='Fork of '):
+        super(ForkCloner, self).__init__(root, auth)
+        self.title = title
+
+    def include(self, node):
+        if node.is_deleted:
+            return False
+        return not node.primary or node.is_public or node.has_permission(self.auth.user, 'read')
+
+    def prepare(self, original, forked, is_root):
+        user = self.auth.user
+        _copy_log_counters(original, forked)
+        if is_root:
+            forked.title = self.title + forked.title
+        forked.is_fork = True
+        forked.is_registration = False
+        forked.forked_date = self.when
+        forked.forked_from = original
+        forked.creator = user
+        forked.piwik_site_id = None
+        forked.node_license = original.license.copy() if original.license else None
+
+        # Forks default to private status
+        forked.is_public = False
+
+        # Clear permissions before adding users
+        forked.permissions = {}
+        forked.visible_contributor_ids = []
+
+        forked.add_contributor(
+            contributor=user,
+            permissions=CREATOR_PERMISSIONS,
+            log=False,
+            save=False
+        )
+
+    def finish(self, original, forked):
+        from website.project.model import NodeLog
+        forked.add_log(
+            action=NodeLog.NODE_FORKED,
+            params={
+                'parent_node': original.parent_id,
+                'node': original._primary_key,
+                'registration': forked._primary_key,
+            },
+            auth=self.auth,
+            log_date=self.when,
+            save=False,
+        )
+        forked.save(update_piwik=False)
+        node_stats.increment(original, 'forks')
+        # After fork callback
+        for addon in original.get_addons():
+            _, message = addon.after_fork(original, forked, self.auth.user)
+            if message:
+                status.push_status_message(message, kind='info', trust=True)
+
+
+class RegistrationCloner(TreeCloner):
+    """Copy a node tree as a frozen, private registration.
+
+    :param MetaSchema schema: Registration schema
+    :param data: Registration form data
+    """
+    def __init__(self, root, auth, schema, data):
+        super(RegistrationCloner, self).__init__(root, auth)
+        self.schema = schema
+        self.data = data
+
+    def include(self, node):
+        if node.is_deleted:
+            return False
+        if node.primary:
+            # NOTE: Admins can register child nodes even if they don't have write access them
+            if not node.can_edit(auth=self.auth) and not node.is_admin_parent(user=self.auth.user):
+                raise PermissionsError(
+                    'User {} does not have permission '
+                    'to register this node'.format(self.auth.user._id)
+                )
+            if node.is_folder:
+                raise NodeStateError('Folders may not be registered')
+        return True
+
+    def prepare(self, original, registered, is_root):
+        registered.is_registration = True
+        registered.registered_date = self.when
+        registered.registered_user = self.auth.user
+        registered.registered_schema.append(self.schema)
+        registered.registered_from = original
+        if not registered.registered_meta:
+            registered.registered_meta = {}
+        registered.registered_meta[self.schema._id] = self.data
+
+        registered.contributors = original.contributors
+        registered.forked_from = original.forked_from
+        registered.creator = original.creator
+        _copy_log_counters(original, registered)
+        registered.piwik_site_id = None
+        registered.node_license = original.license.copy() if original.license else None
+        registered.is_public = False
+
+    def finish(self, original, registered):
+        node_stats.increment(original, 'registrations')
+        # After register callback
+        for addon in original.get_addons():
+            _, message = addon.after_register(original, registered, self.auth.user)
+            if message:
+                status.push_status_message(message, kind='info', trust=False)
+
+        if settings.ENABLE_ARCHIVER:
+            project_signals.after_create_registration.send(original, dst=registered, user=self.auth.user)
@@ -63,6 +63,7 @@ from website.project.licenses import (
     NodeLicenseRecord,
 )
 from website.project import signals as project_signals
+from website.project import stats as node_stats
 
 logger = logging.getLogger(__name__)
 
@@ -330,6 +331,21 @@ class Comment(GuidStoredObject):
 @unique_on(['params.node', '_id'])
 class NodeLog(StoredObject):
 
+    # Supports reading a node's most recent logs; see `Node.get_recent_logs`
+    __indices__ = [{
+        'unique': False,
+        'key_or_list': [
+            ('__backrefs.logged.node.logs', pymongo.ASCENDING),
+            ('date', pymongo.DESCENDING),
+        ]
+    }, {
+        'unique': False,
+        'key_or_list': [
+            ('__backrefs.logged.node.logs', pymongo.ASCENDING),
+            ('_id', pymongo.DESCENDING),
+        ]
+    }]
+
     _id = fields.StringField(primary=True, default=lambda: str(ObjectId()))
 
     date = fields.DateTimeField(default=datetime.datetime.utcnow, index=True)
@@ -420,6 +436,19 @@ class NodeLog(StoredObject):
 
     actions = [CREATED_FROM, PROJECT_CREATED, PROJECT_REGISTERED, PROJECT_DELETED, NODE_CREATED, NODE_FORKED, NODE_REMOVED, POINTER_CREATED, POINTER_FORKED, POINTER_REMOVED, WIKI_UPDATED, WIKI_DELETED, WIKI_RENAMED, MADE_WIKI_PUBLIC, MADE_WIKI_PRIVATE, CONTRIB_ADDED, CONTRIB_REMOVED, CONTRIB_REORDERED, PERMISSIONS_UPDATED, MADE_PRIVATE, MADE_PUBLIC, TAG_ADDED, TAG_REMOVED, EDITED_TITLE, EDITED_DESCRIPTION, UPDATED_FIELDS, FILE_MOVED, FILE_COPIED, FOLDER_CREATED, FILE_ADDED, FILE_UPDATED, FILE_REMOVED, FILE_RESTORED, ADDON_ADDED, ADDON_REMOVED, COMMENT_ADDED, COMMENT_REMOVED, COMMENT_UPDATED, MADE_CONTRIBUTOR_VISIBLE, MADE_CONTRIBUTOR_INVISIBLE, EXTERNAL_IDS_ADDED, EMBARGO_APPROVED, EMBARGO_CANCELLED, EMBARGO_COMPLETED, EMBARGO_INITIATED, RETRACTION_APPROVED, RETRACTION_CANCELLED, RETRACTION_INITIATED, REGISTRATION_APPROVAL_CANCELLED, REGISTRATION_APPROVAL_INITIATED, REGISTRATION_APPROVAL_APPROVED]
 
+    @classmethod
+    def find_for_nodes(cls, node_ids, since=None):
+        """Return logs of any of `node_ids`, newest first.
+
+        :param list node_ids: Primary keys of nodes
+        :param datetime since: Only include logs whose ObjectId was generated
+            after this time
+        """
+        query = Q('__backrefs.logged.node.logs', 'in', list(node_ids))
+        if since:
+            query = query & Q('_id', 'gt', str(ObjectId.from_datetime(since)))
+        return cls.find(query).sort('-_id')
+
     def __repr__(self):
         return ('<NodeLog({self.action!r}, params={self.params!r}) '
                 'with id {self._id!r}>').format(self=self)
@@ -532,6 +561,7 @@ class Pointer(StoredObject):
             clone = self.clone()
             clone.node = self.node
             clone.save()
+            node_stats.increment(self.node, 'pointers')
             return clone
 
     def fork_node(self, *args, **kwargs):
@@ -747,6 +777,12 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
     users_watching_node = fields.ForeignField('user', list=True, backref='watched')
 
     logs = fields.ForeignField('nodelog', list=True, backref='logged')
+    # Maintained by `add_log` so that counting and dating logs does not need
+    # the `logs` list; see `update_log_counters`. None on nodes saved before
+    # the counters existed, which are computed when first read
+    log_count = fields.IntegerField(default=None)
+    user_log_counts = fields.DictionaryField()
+    date_last_logged = fields.DateTimeField()
     tags = fields.ForeignField('tag', list=True, backref='tagged')
 
     # Tags for internal use
@@ -783,6 +819,9 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         if kwargs.get('_is_loaded', False):
             return
 
+        if self.log_count is None and not self.logs:
+            self.log_count = 0
+
         if self.creator:
             self.contributors.append(self.creator)
             self.set_visible(self.creator, visible=True, log=False)
@@ -1143,10 +1182,7 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
 
     @property
     def visible_contributors(self):
-        return [
-            User.load(_id)
-            for _id in self.visible_contributor_ids
-        ]
+        return User.load_many(self.visible_contributor_ids)
 
     @property
     def parents(self):
@@ -1169,7 +1205,7 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
     @property
     def admin_contributors(self):
         return sorted(
-            [User.load(_id) for _id in self.admin_contributor_ids],
+            User.load_many(self.admin_contributor_ids),
             key=lambda user: user.family_name,
         )
 
@@ -1400,7 +1436,10 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         if self.is_folder or self.archiving:
             need_update = False
         if need_update:
-            self.update_search()
+            # A new node has no search document yet, so it must be indexed in full
+            self.update_search(
+                saved_fields=None if first_save else self.SOLR_UPDATE_FIELDS.intersection(saved_fields)
+            )
 
         if 'node_license' in saved_fields:
             children = [c for c in self.get_descendants_recursive(
@@ -1482,6 +1521,7 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         )
 
         new.save(suppress_log=True)
+        node_stats.increment(self, 'templates')
 
         # Log the creation
         new.add_log(
@@ -1554,6 +1594,8 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         pointer = Pointer(node=node)
         pointer.save()
         self.nodes.append(pointer)
+        if not self.is_folder:
+            node_stats.increment(node, 'pointers')
 
         # Add log
         self.add_log(
@@ -1590,6 +1632,8 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         # Remove `Pointer` object; will also remove self from `nodes` list of
         # parent node
         Pointer.remove_one(pointer)
+        if not self.is_folder:
+            node_stats.increment(pointer.node, 'pointers', -1)
 
         # Add log
         self.add_log(
@@ -1774,28 +1818,60 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
             # removing pointer, else remove will fail when trying to remove
             # backref from self to pointer.
             Pointer.remove_one(pointer)
+            if not self.is_folder:
+                node_stats.increment(node, 'pointers', -1)
 
         # Return forked content
         return forked
 
     def get_recent_logs(self, n=10):
         """Return a list of the n most recent logs, in reverse chronological
-        order.
+        order. Logs are read from the nodelog collection, not the `logs` list.
 
         :param int n: Number of logs to retrieve
         """
-        return list(reversed(self.logs)[:n])
+        return list(
+            NodeLog.find(
+                Q('__backrefs.logged.node.logs', 'eq', self._id)
+            ).sort('-date', '-_id').limit(n)
+        )
 
     @property
     def date_modified(self):
         '''The most recent datetime when this node was modified, based on
         the logs.
         '''
+        if self.date_last_logged:
+            return self.date_last_logged
         try:
             return self.logs[-1].date
         except IndexError:
             return self.date_created
 
+    def get_log_count(self, user=None):
+        """Return the number of logs of this node, or only those by `user`.
+        Counters of nodes not yet migrated by
+        `scripts/migrate_node_log_counters.py` are computed but not saved.
+        """
+        if self.log_count is None:
+            self.update_log_counters()
+        if user is None:
+            return self.log_count
+        return self.user_log_counts.get(user._id, 0)
+
+    def update_log_counters(self):
+        """Recompute `log_count`, `user_log_counts` and `date_last_logged`
+        from `logs`. Does not save.
+        """
+        log_ids = self.logs._to_primary_keys()
+        self.log_count = len(log_ids)
+        self.user_log_counts = {}
+        for log in NodeLog.find(Q('_id', 'in', log_ids)):
+            user_id = log.to_storage().get('user')
+            if user_id:
+                self.user_log_counts[user_id] = self.user_log_counts.get(user_id, 0) + 1
+        self.date_last_logged = self.logs[-1].date if log_ids else None
+
     def set_title(self, title, auth, save=False):
         """Set the title of this Node and log it.
 
@@ -1853,10 +1929,14 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
             self.save()
         return None
 
-    def update_search(self):
+    def update_search(self, saved_fields=None):
+        """Update the node's search document.
+
+        :param saved_fields: Fields changed by the triggering save, if known
+        """
         from website import search
         try:
-            search.search.update_node(self, bulk=False, async=True)
+            search.search.update_node(self, bulk=False, async=True, saved_fields=saved_fields)
         except search.exceptions.SearchUnavailableError as e:
             logger.exception(e)
             log_exception()
@@ -1882,7 +1962,10 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
     def delete_registration_tree(self, save=False):
         self.is_deleted = True
         if not getattr(self.embargo, 'for_existing_registration', False):
+            node_stats.increment(self.registered_from, 'registrations', -1)
             self.registered_from = None
+        for pointer in self.nodes_pointer:
+            node_stats.increment(pointer.node, 'pointers', -1)
         if save:
             self.save()
         self.update_search()
@@ -1950,6 +2033,13 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         self.deleted_date = date
         self.save()
 
+        if self.is_fork and not self.is_registration:
+            node_stats.increment(self.forked_from, 'forks', -1)
+        node_stats.increment(self.template_node, 'templates', -1)
+        if not self.is_folder:
+            for pointer in self.nodes_pointer:
+                node_stats.increment(pointer.node, 'pointers', -1)
+
         auth_signals.node_deleted.send(self)
 
         return True
@@ -1961,14 +2051,13 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         :param str title: Optional text to prepend to forked title
         :return: Forked node
         """
+        from website.project.cloning import ForkCloner
         user = auth.user
 
         # Non-contributors can't fork private nodes
         if not (self.is_public or self.has_permission(user, 'read')):
             raise PermissionsError('{0!r} does not have permission to fork node {1!r}'.format(user, self._id))
 
-        when = datetime.datetime.utcnow()
-
         original = self.load(self._primary_key)
 
         if original.is_deleted:
@@ -1979,76 +2068,17 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         # database objects to which these dictionaries refer. This means that
         # the cloned node must pass itself to its wiki objects to build the
         # correct URLs to that content.
-        forked = original.clone()
-
-        forked.logs = self.logs
-        forked.tags = self.tags
-
-        # Recursively fork child nodes
-        for node_contained in original.nodes:
-            if not node_contained.is_deleted:
-                forked_node = None
-                try:  # Catch the potential PermissionsError above
-                    forked_node = node_contained.fork_node(auth=auth, title='')
-                except PermissionsError:
-                    pass  # If this exception is thrown omit the node from the result set
-                if forked_node is not None:
-                    forked.nodes.append(forked_node)
-
-        forked.title = title + forked.title
-        forked.is_fork = True
-        forked.is_registration = False
-        forked.forked_date = when
-        forked.forked_from = original
-        forked.creator = user
-        forked.piwik_site_id = None
-        forked.node_license = original.license.copy() if original.license else None
-
-        # Forks default to private status
-        forked.is_public = False
-
-        # Clear permissions before adding users
-        forked.permissions = {}
-        forked.visible_contributor_ids = []
-
-        forked.add_contributor(
-            contributor=user,
-            permissions=CREATOR_PERMISSIONS,
-            log=False,
-            save=False
-        )
-
-        forked.add_log(
-            action=NodeLog.NODE_FORKED,
-            params={
-                'parent_node': original.parent_id,
-                'node': original._primary_key,
-                'registration': forked._primary_key,
-            },
-            auth=auth,
-            log_date=when,
-            save=False,
-        )
-
-        forked.save()
-        # After fork callback
-        for addon in original.get_addons():
-            _, message = addon.after_fork(original, forked, user)
-            if message:
-                status.push_status_message(message, kind='info', trust=True)
-
-        return forked
+        return ForkCloner(original, auth, title=title).run()
 
     def register_node(self, schema, auth, data, parent=None):
-        """Make a frozen copy of a node.
+        """Make a frozen copy of a node and its components.
 
         :param schema: Schema object
         :param auth: All the auth information including user, API key.
-        :param template: Template name
         :param data: Form data
         :param parent Node: parent registration of registration to be created
         """
-        # TODO(lyndsysimon): "template" param is not necessary - use schema.name?
+        from website.project.cloning import RegistrationCloner
         # NOTE: Admins can register child nodes even if they don't have write access them
         if not self.can_edit(auth=auth) and not self.is_admin_parent(user=auth.user):
             raise PermissionsError(
@@ -2058,8 +2088,6 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         if self.is_folder:
             raise NodeStateError("Folders may not be registered")
 
-        when = datetime.datetime.utcnow()
-
         original = self.load(self._primary_key)
 
         # Note: Cloning a node copies its `wiki_pages_current` and
@@ -2070,56 +2098,11 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         if original.is_deleted:
             raise NodeStateError('Cannot register deleted node.')
 
-        registered = original.clone()
-
-        registered.is_registration = True
-        registered.registered_date = when
-        registered.registered_user = auth.user
-        registered.registered_schema.append(schema)
-        registered.registered_from = original
-        if not registered.registered_meta:
-            registered.registered_meta = {}
-        registered.registered_meta[schema._id] = data
-
-        registered.contributors = self.contributors
-        registered.forked_from = self.forked_from
-        registered.creator = self.creator
-        registered.logs = self.logs
-        registered.tags = self.tags
-        registered.piwik_site_id = None
-        registered.node_license = original.license.copy() if original.license else None
-
-        registered.save()
-        registered.is_public = False
-        for node in registered.get_descendants_recursive():
-            node.is_public = False
-            node.save()
+        registered = RegistrationCloner(original, auth, schema, data).run()
 
         if parent:
             registered.parent_node = parent
 
-        # After register callback
-        for addon in original.get_addons():
-            _, message = addon.after_register(original, registered, auth.user)
-            if message:
-                status.push_status_message(message, kind='info', trust=False)
-
-        for node_contained in original.nodes:
-            if not node_contained.is_deleted:
-                child_registration = node_contained.register_node(
-                    schema=schema,
-                    auth=auth,
-                    data=data,
-                    parent=registered,
-                )
-                if child_registration and not child_registration.primary:
-                    registered.nodes.append(child_registration)
-
-        registered.save()
-
-        if settings.ENABLE_ARCHIVER:
-            project_signals.after_create_registration.send(self, dst=registered, user=auth.user)
-
         return registered
 
     def remove_tag(self, tag, auth, save=True):
@@ -2172,6 +2155,13 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
             log.date = log_date
         log.save()
         self.logs.append(log)
+        if self.log_count is None:
+            self.update_log_counters()
+        else:
+            self.log_count += 1
+            if user:
+                self.user_log_counts[user._id] = self.user_log_counts.get(user._id, 0) + 1
+            self.date_last_logged = log.date
         if save:
             self.save()
         if user:
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""Counts shown on the project page (forks, registrations, watchers, links
+from other projects and projects created from a node as a template), kept in
+the `nodestats` collection so that rendering the page does not load every
+back-reference.
+
+Model methods that create or remove one of these relations call `increment`.
+A missing document is computed from the back-references when it is first
+read; `scripts/refresh_node_stats.py` recomputes existing documents.
+"""
+
+from framework.mongo import database
+
+
+COLLECTION = 'nodestats'
+
+FIELDS = ('forks', 'registrations', 'watchers', 'pointers', 'templates')
+
+
+def get_collection():
+    return database[COLLECTION]
+
+
+def compute(node):
+    """Count the relations of `node` from its back-references.
+
+    :param Node node:
+    :returns: dict of counts, keyed by the names in `FIELDS`
+    """
+    return {
+        'forks': len(node.forks),
+        'registrations': len(node.node__registrations),
+        'watchers': len(node.watchconfig__watched),
+        'pointers': len(node.get_points(deleted=False, folders=False)),
+        'templates': len(node.templated_list),
+    }
+
+
+def refresh(node):
+    """Recompute and store the counts of `node`.
+
+    :returns: dict of counts
+    """
+    stats = compute(node)
+    get_collection().update({'_id': node._id}, {'$set': stats}, upsert=True)
+    return stats
+
+
+def get_stats(node):
+    """Return the stored counts of `node`, computing them if missing.
+
+    :returns: dict of counts, keyed by the names in `FIELDS`
+    """
+    stats = get_collection().find_one({'_id': node._id})
+    if stats is None or any(field not in stats for field in FIELDS):
+        return refresh(node)
+    return stats
+
+
+def increment(node, field, amount=1):
+    """Adjust a stored count after a relation was added or removed. Nodes
+    without stored counts are left alone, since counts computed on first read
+    already include the change.
+
+    :param Node node: Node whose count changed, or `None`
+    :param str field: One of `FIELDS`
+    :param int amount: Change in the count
+    """
+    if node is None:
+        return
+    get_collection().update({'_id': node._id}, {'$inc': {field: amount}})
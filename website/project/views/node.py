@@ -41,6 +41,7 @@ from website import settings
 from website.views import _render_nodes, find_dashboard, validate_page_num
 from website.profile import utils
 from website.project import new_folder
+from website.project import stats as node_stats
 from website.project.licenses import serialize_node_license_record
 from website.util.sanitize import strip_html
 from website.util import rapply
@@ -513,7 +514,7 @@ def watch_post(auth, node, **kwargs):
 
     return {
         'status': 'success',
-        'watchCount': len(node.watchconfig__watched)
+        'watchCount': node_stats.get_stats(node)['watchers']
     }
 
 
@@ -532,7 +533,7 @@ def unwatch_post(auth, node, **kwargs):
 
     return {
         'status': 'success',
-        'watchCount': len(node.watchconfig__watched)
+        'watchCount': node_stats.get_stats(node)['watchers']
     }
 
 
@@ -560,7 +561,7 @@ def togglewatch_post(auth, node, **kwargs):
 
     return {
         'status': 'success',
-        'watchCount': len(node.watchconfig__watched),
+        'watchCount': node_stats.get_stats(node)['watchers'],
         'watched': user.is_watching(node)
     }
 
@@ -709,6 +710,7 @@ def _view_project(node, auth, primary=False):
     anonymous = has_anonymous_link(node, auth)
     widgets, configs, js, css = _render_addon(node)
     redirect_url = node.url + '?view_only=None'
+    stats = node_stats.get_stats(node)
 
     # Before page load callback; skip if not primary call
     if primary:
@@ -750,18 +752,18 @@ def _view_project(node, auth, primary=False):
             'root_id': node.root._id,
             'registered_meta': node.registered_meta,
             'registered_schemas': serialize_meta_schemas(node.registered_schema),
-            'registration_count': len(node.node__registrations),
+            'registration_count': stats['registrations'],
             'is_fork': node.is_fork,
             'forked_from_id': node.forked_from._primary_key if node.is_fork else '',
             'forked_from_display_absolute_url': node.forked_from.display_absolute_url if node.is_fork else '',
             'forked_date': iso8601format(node.forked_date) if node.is_fork else '',
-            'fork_count': len(node.forks),
-            'templated_count': len(node.templated_list),
-            'watched_count': len(node.watchconfig__watched),
+            'fork_count': stats['forks'],
+            'templated_count': stats['templates'],
+            'watched_count': stats['watchers'],
             'private_links': [x.to_json() for x in node.private_links_active],
             'link': view_only_link,
             'anonymous': anonymous,
-            'points': len(node.get_points(deleted=False, folders=False)),
+            'points': stats['pointers'],
             'piwik_site_id': node.piwik_site_id,
             'comment_level': node.comment_level,
             'has_comments': bool(getattr(node, 'commented', [])),
@@ -871,17 +873,8 @@ def get_editable_children(auth, node, **kwargs):
 def _get_user_activity(node, auth, rescale_ratio):
 
     # Counters
-    total_count = len(node.logs)
-
-    # Note: It's typically much faster to find logs of a given node
-    # attached to a given user using node.logs.find(...) than by
-    # loading the logs into Python and checking each one. However,
-    # using deep caching might be even faster down the road.
-
-    if auth.user:
-        ua_count = node.logs.find(Q('user', 'eq', auth.user)).count()
-    else:
-        ua_count = 0
+    total_count = node.get_log_count()
+    ua_count = node.get_log_count(auth.user) if auth.user else 0
 
     non_ua_count = total_count - ua_count  # base length of blue bar
 
@@ -900,7 +893,7 @@ def _get_user_activity(node, auth, rescale_ratio):
 
 @must_be_valid_project
 def get_recent_logs(node, **kwargs):
-    logs = list(reversed(node.logs._to_primary_keys()))[:3]
+    logs = [log._id for log in node.get_recent_logs(3)]
     return {'logs': logs}
 
 
@@ -952,7 +945,7 @@ def _get_summary(node, auth, rescale_ratio, primary=True, link_id=None, show_pat
         if rescale_ratio:
             ua_count, ua, non_ua = _get_user_activity(node, auth, rescale_ratio)
             summary.update({
-                'nlogs': len(node.logs),
+                'nlogs': node.get_log_count(),
                 'ua_count': ua_count,
                 'ua': ua,
                 'non_ua': non_ua,
@@ -1040,7 +1033,7 @@ def project_generate_private_link_post(auth, node, **kwargs):
     if node._id not in node_ids:
         node_ids.insert(0, node._id)
 
-    nodes = [Node.load(node_id) for node_id in node_ids]
+    nodes = Node.load_many(node_ids)
 
     try:
         new_link = new_private_link(
@@ -4,10 +4,15 @@ from __future__ import division
 
 import re
 import copy
+import json
 import math
+import time
+import atexit
 import logging
+import threading
 import unicodedata
 import functools
+from collections import OrderedDict
 
 import six
 
@@ -21,6 +26,7 @@ from elasticsearch import (
 )
 
 from framework import sentry
+from framework.cache import LRUCache
 from framework.tasks import app as celery_app
 from framework.mongo.utils import paginated
 
@@ -91,8 +97,212 @@ def requires_search(func):
     return wrapped
 
 
-@requires_search
-def get_aggregations(query, doc_type):
+class IndexingQueue(object):
+    """Buffer of pending index, update and delete actions. Actions are coalesced
+    per document, so only the latest version of a document updated several times
+    within one window is sent (partial updates are merged into the pending
+    action), and are written with a single bulk request once
+    the window elapses or the buffer is full. Documents become searchable on the
+    index's refresh interval rather than through a forced refresh per write.
+
+    When `settings.ELASTIC_INDEX_SYNC` is set (e.g. in tests), every action is
+    flushed immediately and the index is refreshed.
+
+    Actions that could not be sent because elasticsearch was unreachable are
+    put back into the buffer, which is capped at `settings.ELASTIC_MAX_PENDING`
+    actions, and flushing is retried from the timer thread with exponential
+    backoff; requests queueing actions meanwhile never wait on elasticsearch.
+    In sync mode the error is raised instead so the calling task can retry.
+    """
+    def __init__(self):
+        self.pending = OrderedDict()
+        self.lock = threading.RLock()
+        self.timer = None
+        self.failures = 0
+        self.retry_at = None
+
+    @staticmethod
+    def key(action):
+        return (action['_index'], action['_type'], action['_id'])
+
+    def add(self, action):
+        key = self.key(action)
+        with self.lock:
+            # Re-insert so the document keeps the position of its latest update
+            previous = self.pending.pop(key, None)
+            if previous is not None and action['_op_type'] == 'update':
+                action = self.merge(previous, action)
+            self.pending[key] = action
+            self.truncate()
+            full = len(self.pending) >= settings.ELASTIC_BULK_SIZE
+            if not settings.ELASTIC_INDEX_SYNC and not full:
+                self.schedule()
+        # Send outside the lock so other threads can keep queueing actions
+        if settings.ELASTIC_INDEX_SYNC:
+            self.flush(refresh=True)
+        elif full:
+            self.flush()
+
+    def schedule(self, delay=None):
+        with self.lock:
+            if self.timer is None:
+                self.timer = threading.Timer(
+                    settings.ELASTIC_BULK_FLUSH_INTERVAL if delay is None else delay,
+                    self.flush
+                )
+                self.timer.daemon = True
+                self.timer.start()
+
+    def truncate(self):
+        """Drop the oldest actions beyond `settings.ELASTIC_MAX_PENDING`."""
+        with self.lock:
+            dropped = 0
+            while len(self.pending) > settings.ELASTIC_MAX_PENDING:
+                self.pending.popitem(last=False)
+                dropped += 1
+            if dropped:
+                logger.error('Dropped {} pending search updates'.format(dropped))
+
+    def backing_off(self):
+        return self.retry_at is not None and time.time() < self.retry_at
+
+    def requeue(self, actions):
+        """Put actions that could not be sent back in front of the buffer.
+        Actions queued for the same document in the meantime take precedence;
+        partial updates are merged into the requeued action.
+        """
+        with self.lock:
+            pending = OrderedDict()
+            for action in actions:
+                key = self.key(action)
+                newer = self.pending.pop(key, None)
+                if newer is None:
+                    pending[key] = action
+                elif newer['_op_type'] == 'update':
+                    pending[key] = self.merge(action, newer)
+                else:
+                    pending[key] = newer
+            pending.update(self.pending)
+            self.pending = pending
+            self.truncate()
+
+    @staticmethod
+    def merge(previous, update):
+        """Fold a partial update into the pending action for the same document.
+        """
+        if previous['_op_type'] == 'index':
+            merged = dict(previous, _source=dict(previous['_source'], **update['doc']))
+        elif previous['_op_type'] == 'update':
+            merged = dict(previous, doc=dict(previous['doc'], **update['doc']))
+        else:
+            # Updating a document pending deletion would fail; keep the delete
+            merged = previous
+        return merged
+
+    def flush(self, refresh=False):
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            # After a failed flush nothing is sent until the backoff elapses
+            if self.backing_off() and not settings.ELASTIC_INDEX_SYNC:
+                self.schedule(self.retry_at - time.time())
+                return
+            actions = list(self.pending.values())
+            self.pending.clear()
+        if not actions or es is None:
+            return
+        search_cache.clear()
+        kwargs = {'refresh': True} if refresh else {}
+        try:
+            _, errors = helpers.bulk(es, actions, raise_on_error=False, **kwargs)
+        except ConnectionError as error:
+            logger.exception(error)
+            sentry.log_exception()
+            self.requeue(actions)
+            if settings.ELASTIC_INDEX_SYNC:
+                raise
+            with self.lock:
+                self.failures += 1
+                delay = min(
+                    settings.ELASTIC_BULK_FLUSH_INTERVAL * 2 ** self.failures,
+                    settings.ELASTIC_MAX_RETRY_DELAY
+                )
+                self.retry_at = time.time() + delay
+                if self.timer is not None:
+                    self.timer.cancel()
+                    self.timer = None
+                self.schedule(delay)
+            return
+        with self.lock:
+            self.failures = 0
+            self.retry_at = None
+        missing = []
+        for error in errors:
+            # Deleting a document that was never indexed is not an error
+            if error.get('delete', {}).get('status') == 404:
+                continue
+            if error.get('update', {}).get('status') == 404:
+                missing.append(error['update'])
+                continue
+            logger.error('Failed to index document: {}'.format(error))
+        for item in missing:
+            logger.warning('Partial update of missing search document {}; indexing it in full'.format(item['_id']))
+            try:
+                index_missing_node(item['_id'], item['_index'])
+            except Exception as error:
+                logger.exception(error)
+                sentry.log_exception()
+
+
+indexing_queue = IndexingQueue()
+atexit.register(indexing_queue.flush)
+
+
+def flush():
+    """Send all pending index and delete actions to elasticsearch."""
+    indexing_queue.flush(refresh=settings.ELASTIC_INDEX_SYNC)
+
+
+def queue_index(index, doc_type, doc_id, body):
+    indexing_queue.add({
+        '_op_type': 'index',
+        '_index': index,
+        '_type': doc_type,
+        '_id': doc_id,
+        '_source': body,
+    })
+
+
+def queue_update(index, doc_type, doc_id, doc):
+    indexing_queue.add({
+        '_op_type': 'update',
+        '_index': index,
+        '_type': doc_type,
+        '_id': doc_id,
+        'doc': doc,
+    })
+
+
+def queue_delete(index, doc_type, doc_id):
+    indexing_queue.add({
+        '_op_type': 'delete',
+        '_index': index,
+        '_type': doc_type,
+        '_id': doc_id,
+    })
+
+
+# Cache of formatted search results, keyed on the normalized request. Cleared
+# whenever this process flushes index updates; other processes' updates become
+# visible once entries expire.
+search_cache = LRUCache(
+    maxsize=settings.SEARCH_CACHE_SIZE,
+    ttl=settings.SEARCH_CACHE_TTL,
+)
+
+
+def build_aggregations_query(query):
     query['aggregations'] = {
         'licenses': {
             'terms': {
@@ -100,8 +310,10 @@ def get_aggregations(query, doc_type):
             }
         }
     }
+    return query
 
-    res = es.search(index=INDEX, doc_type=doc_type, search_type='count', body=query)
+
+def parse_aggregations(res):
     ret = {
         doc_type: {
             item['key']: item['doc_count']
@@ -113,8 +325,7 @@ def get_aggregations(query, doc_type):
     return ret
 
 
-@requires_search
-def get_counts(count_query, clean=True):
+def build_counts_query(count_query):
     count_query['aggregations'] = {
         'counts': {
             'terms': {
@@ -122,31 +333,61 @@ def get_counts(count_query, clean=True):
             }
         }
     }
+    return count_query
+
 
-    res = es.search(index=INDEX, doc_type=None, search_type='count', body=count_query)
+def parse_counts(res):
     counts = {x['key']: x['doc_count'] for x in res['aggregations']['counts']['buckets'] if x['key'] in ALIASES.keys()}
 
     counts['total'] = sum([val for val in counts.values()])
     return counts
 
 
-@requires_search
-def get_tags(query, index):
+def build_tags_query(query):
     query['aggregations'] = {
         'tag_cloud': {
             'terms': {'field': 'tags'}
         }
     }
+    return query
+
+
+def parse_tags(res):
+    return res['aggregations']['tag_cloud']['buckets']
+
 
-    results = es.search(index=index, doc_type=None, body=query)
-    tags = results['aggregations']['tag_cloud']['buckets']
+def msearch_header(index, doc_type=None, search_type=None):
+    header = {'index': index}
+    if doc_type and doc_type != '_all':
+        header['type'] = doc_type
+    if search_type:
+        header['search_type'] = search_type
+    return header
+
+
+def check_msearch_response(res):
+    """Raise the error `requires_search` would have raised had the query
+    been sent on its own.
+    """
+    error = res.get('error')
+    if error:
+        if 'ParseException' in error:
+            raise exceptions.MalformedQueryError(error)
+        if 'IndexMissingException' in error:
+            raise exceptions.IndexNotFoundError(error)
+        raise exceptions.SearchException(error)
+    return res
 
-    return tags
+
+def get_cache_key(query, index, doc_type):
+    return json.dumps([query, index, doc_type], sort_keys=True)
 
 
 @requires_search
 def search(query, index=None, doc_type='_all'):
-    """Search for a query
+    """Search for a query. The tag cloud, license aggregations, type counts and
+    hits are fetched with a single multi-search request, and results for
+    repeated queries are served from `search_cache`.
 
     :param query: The substring of the username/project name/tag to search for
     :param index:
@@ -159,57 +400,68 @@ def search(query, index=None, doc_type='_all'):
         typeAliases: the doc_types that exist in the search database
     """
     index = index or INDEX
-    tag_query = copy.deepcopy(query)
-    aggs_query = copy.deepcopy(query)
-    count_query = copy.deepcopy(query)
+    cache_key = get_cache_key(query, index, doc_type)
+    cached = search_cache.get(cache_key)
+    if cached is not None:
+        return copy.deepcopy(cached)
 
+    tag_query = copy.deepcopy(query)
     for key in ['from', 'size', 'sort']:
-        try:
-            del tag_query[key]
-            del aggs_query[key]
-            del count_query[key]
-        except KeyError:
-            pass
-
-    tags = get_tags(tag_query, index)
+        tag_query.pop(key, None)
+    # Aggregations and counts ignore the type filter selected by the user
+    unfiltered_query = copy.deepcopy(tag_query)
     try:
-        del aggs_query['query']['filtered']['filter']
-        del count_query['query']['filtered']['filter']
+        del unfiltered_query['query']['filtered']['filter']
     except KeyError:
         pass
-    aggregations = get_aggregations(aggs_query, doc_type=doc_type)
-    counts = get_counts(count_query, index)
 
-    # Run the real query and get the results
-    raw_results = es.search(index=index, doc_type=doc_type, body=query)
+    body = [
+        msearch_header(index, search_type='count'),
+        build_tags_query(tag_query),
+        msearch_header(index, doc_type=doc_type, search_type='count'),
+        build_aggregations_query(copy.deepcopy(unfiltered_query)),
+        msearch_header(index, search_type='count'),
+        build_counts_query(unfiltered_query),
+        msearch_header(index, doc_type=doc_type),
+        query,
+    ]
+    responses = [
+        check_msearch_response(res)
+        for res in es.msearch(body=body)['responses']
+    ]
+    tag_results, aggs_results, count_results, raw_results = responses
 
     results = [hit['_source'] for hit in raw_results['hits']['hits']]
     return_value = {
         'results': format_results(results),
-        'counts': counts,
-        'aggs': aggregations,
-        'tags': tags,
+        'counts': parse_counts(count_results),
+        'aggs': parse_aggregations(aggs_results),
+        'tags': parse_tags(tag_results),
         'typeAliases': ALIASES
     }
+    search_cache.set(cache_key, copy.deepcopy(return_value))
     return return_value
 
 
 def format_results(results):
+    parents = load_parents(
+        result.get('parent_id') for result in results
+        if result.get('category') != 'user'
+    )
     ret = []
     for result in results:
         if result.get('category') == 'user':
             result['url'] = '/profile/' + result['id']
         elif result.get('category') == 'file':
-            parent_info = load_parent(result.get('parent_id'))
+            parent_info = parents.get(result.get('parent_id'))
             result['parent_url'] = parent_info.get('url') if parent_info else None
             result['parent_title'] = parent_info.get('title') if parent_info else None
         elif result.get('category') in {'project', 'component', 'registration'}:
-            result = format_result(result, result.get('parent_id'))
+            result = format_result(result, parents.get(result.get('parent_id')))
         ret.append(result)
     return ret
 
-def format_result(result, parent_id=None):
-    parent_info = load_parent(parent_id)
+def format_result(result, parent_info=None):
     formatted_result = {
         'contributors': result['contributors'],
         'wiki_link': result['url'] + 'wiki/',
@@ -237,10 +489,23 @@ def format_result(result, parent_id=None):
     return formatted_result
 
 
-def load_parent(parent_id):
-    parent = Node.load(parent_id)
-    if parent is None:
-        return None
+def load_parents(parent_ids):
+    """Load the parents of a page of search results with a single query.
+
+    :param parent_ids: Iterable of parent ids; `None` values are ignored
+    :return: Dictionary mapping each parent id that exists to the output of
+        `serialize_parent`
+    """
+    parent_ids = list({parent_id for parent_id in parent_ids if parent_id})
+    if not parent_ids:
+        return {}
+    return {
+        parent._id: serialize_parent(parent)
+        for parent in Node.find(Q('_id', 'in', parent_ids))
+    }
+
+
+def serialize_parent(parent):
     parent_info = {}
     if parent is not None and parent.is_public:
         parent_info['title'] = parent.title
@@ -266,19 +531,88 @@ def get_doctype_from_node(node):
     else:
         return node.category
 
+# Node fields that are copied into the search documents of the node's files
+FILE_UPDATE_FIELDS = {
+    'title',
+    'is_public',
+    'is_deleted',
+    'is_registration',
+}
+
+# Actions are sent by the indexing queue after the task returns, so outside
+# sync mode the retry only covers errors raised while building them;
+# unreachable elasticsearch is retried by the queue itself
 @celery_app.task(bind=True, max_retries=5, default_retry_delay=60)
-def update_node_async(self, node_id, index=None, bulk=False):
+def update_node_async(self, node_id, index=None, bulk=False, saved_fields=None):
     node = Node.load(node_id)
     try:
-        update_node(node=node, index=index, bulk=bulk)
+        update_node(node=node, index=index, bulk=bulk, saved_fields=saved_fields)
     except Exception as exc:
         self.retry(exc=exc)
 
+def serialize_node_title(node):
+    try:
+        normalized_title = six.u(node.title)
+    except TypeError:
+        normalized_title = node.title
+    normalized_title = unicodedata.normalize('NFKD', normalized_title).encode('ascii', 'ignore')
+    return {
+        'title': node.title,
+        'normalized_title': normalized_title,
+    }
+
+
+def serialize_node_description(node):
+    return {'description': node.description}
+
+
+def serialize_node_tags(node):
+    return {'tags': [tag._id for tag in node.tags if tag]}
+
+
+def serialize_node_contributors(node):
+    return {
+        'contributors': [
+            {
+                'fullname': x.fullname,
+                'url': x.profile_url if x.is_active else None
+            }
+            for x in node.visible_contributors
+            if x is not None
+        ],
+    }
+
+
+def serialize_node_license(node):
+    return {'license': serialize_node_license_record(node.license)}
+
+
+# Maps node fields to serializers of the parts of the search document that
+# depend on them. When every saved field is listed here, only those parts are
+# sent as a partial update. Wiki pages are not listed: partial updates merge
+# objects, so a deleted page would never leave the `wikis` object.
+PARTIAL_UPDATE_SERIALIZERS = {
+    'title': serialize_node_title,
+    'description': serialize_node_description,
+    'tags': serialize_node_tags,
+    'visible_contributor_ids': serialize_node_contributors,
+    'node_license': serialize_node_license,
+}
+
+
 @requires_search
-def update_node(node, index=None, bulk=False):
+def update_node(node, index=None, bulk=False, saved_fields=None):
+    """Index or delete the search document of a node.
+
+    :param Node node: The node to index
+    :param str index: Name of the index
+    :param bool bulk: Return the serialized document instead of indexing it
+    :param saved_fields: Fields changed by the save that triggered the update;
+        if given, the node's files are only re-indexed when one of
+        `FILE_UPDATE_FIELDS` changed, and only the affected parts of the
+        document are updated when possible. `None` means the changes are unknown.
+    """
     index = index or INDEX
-    from website.addons.wiki.model import NodeWikiPage
-
     category = get_doctype_from_node(node)
 
     if category == 'project':
@@ -292,60 +626,72 @@ def update_node(node, index=None, bulk=False):
             # Skip orphaned components
             return
 
-    from website.files.models.osfstorage import OsfStorageFile
-    for file_ in paginated(OsfStorageFile, Q('node', 'eq', node)):
-        update_file(file_, index=index)
+    if saved_fields is None or FILE_UPDATE_FIELDS.intersection(saved_fields):
+        from website.files.models.osfstorage import OsfStorageFile
+        for file_ in paginated(OsfStorageFile, Q('node', 'eq', node)):
+            update_file(file_, index=index)
 
     if node.is_deleted or not node.is_public or node.archiving:
         delete_doc(elastic_document_id, node)
+    elif not bulk and saved_fields and set(saved_fields).issubset(PARTIAL_UPDATE_SERIALIZERS):
+        partial_document = {}
+        for field in saved_fields:
+            partial_document.update(PARTIAL_UPDATE_SERIALIZERS[field](node))
+        queue_update(index, category, elastic_document_id, partial_document)
     else:
-        try:
-            normalized_title = six.u(node.title)
-        except TypeError:
-            normalized_title = node.title
-        normalized_title = unicodedata.normalize('NFKD', normalized_title).encode('ascii', 'ignore')
-
-        elastic_document = {
-            'id': elastic_document_id,
-            'contributors': [
-                {
-                    'fullname': x.fullname,
-                    'url': x.profile_url if x.is_active else None
-                }
-                for x in node.visible_contributors
-                if x is not None
-            ],
-            'title': node.title,
-            'normalized_title': normalized_title,
-            'category': category,
-            'public': node.is_public,
-            'tags': [tag._id for tag in node.tags if tag],
-            'description': node.description,
-            'url': node.url,
-            'is_registration': node.is_registration,
-            'is_pending_registration': node.is_pending_registration,
-            'is_retracted': node.is_retracted,
-            'is_pending_retraction': node.is_pending_retraction,
-            'embargo_end_date': node.embargo_end_date.strftime("%A, %b. %d, %Y") if node.embargo_end_date else False,
-            'is_pending_embargo': node.is_pending_embargo,
-            'registered_date': node.registered_date,
-            'wikis': {},
-            'parent_id': parent_id,
-            'date_created': node.date_created,
-            'license': serialize_node_license_record(node.license),
-            'boost': int(not node.is_registration) + 1,  # This is for making registered projects less relevant
-        }
-        if not node.is_retracted:
-            for wiki in [
-                NodeWikiPage.load(x)
-                for x in node.wiki_pages_current.values()
-            ]:
-                elastic_document['wikis'][wiki.page_name] = wiki.raw_text(node)
-
+        elastic_document = serialize_node(node, category=category, parent_id=parent_id)
         if bulk:
             return elastic_document
         else:
-            es.index(index=index, doc_type=category, id=elastic_document_id, body=elastic_document, refresh=True)
+            queue_index(index, category, elastic_document_id, elastic_document)
+
+
+def index_missing_node(node_id, index):
+    """Index the full document of a node whose partial update failed because
+    it had never been indexed.
+    """
+    node = Node.load(node_id)
+    if node is not None:
+        # Empty saved fields: index the whole document, but not the node's files
+        update_node(node, index=index, saved_fields=[])
+
+
+def serialize_node(node, category=None, parent_id=None):
+    """Build the full search document of a node.
+
+    :param Node node: The node to serialize
+    :param str category: Document type of the node, from `get_doctype_from_node`
+    :param str parent_id: Primary key of the parent, if the node is a component
+    """
+    from website.addons.wiki.model import NodeWikiPage
+
+    elastic_document = {
+        'id': node._id,
+        'category': category or get_doctype_from_node(node),
+        'public': node.is_public,
+        'url': node.url,
+        'is_registration': node.is_registration,
+        'is_pending_registration': node.is_pending_registration,
+        'is_retracted': node.is_retracted,
+        'is_pending_retraction': node.is_pending_retraction,
+        'embargo_end_date': node.embargo_end_date.strftime("%A, %b. %d, %Y") if node.embargo_end_date else False,
+        'is_pending_embargo': node.is_pending_embargo,
+        'registered_date': node.registered_date,
+        'wikis': {},
+        'parent_id': parent_id,
+        'date_created': node.date_created,
+        'boost': int(not node.is_registration) + 1,  # This is for making registered projects less relevant
+    }
+    for serialize in PARTIAL_UPDATE_SERIALIZERS.values():
+        elastic_document.update(serialize(node))
+    if not node.is_retracted:
+        for wiki in [
+            NodeWikiPage.load(x)
+            for x in node.wiki_pages_current.values()
+        ]:
+            elastic_document['wikis'][wiki.page_name] = wiki.raw_text(node)
+    return elastic_document
+
 
 def bulk_update_nodes(serialize, nodes, index=None):
     """Updates the list of input projects
@@ -391,12 +737,14 @@ def update_user(user, index=None):
 
     index = index or INDEX
     if not user.is_active:
-        try:
-            es.delete(index=index, doc_type='user', id=user._id, refresh=True, ignore=[404])
-        except NotFoundError:
-            pass
+        queue_delete(index, 'user', user._id)
         return
 
+    queue_index(index, 'user', user._id, serialize_user(user))
+
+
+def serialize_user(user):
+    """Build the search document of an active user."""
     names = dict(
         fullname=user.fullname,
         given_name=user.given_name,
@@ -428,10 +776,11 @@ def update_user(user, index=None):
         'category': 'user',
         'degree': user.schools[0]['degree'] if user.schools else '',
         'social': user.social_links,
+        'gravatar_url': gravatar(user, use_ssl=True, size=settings.PROFILE_IMAGE_MEDIUM),
         'boost': 2,  # TODO(fabianvf): Probably should make this a constant or something
     }
 
-    es.index(index=index, doc_type='user', body=user_doc, id=user._id, refresh=True)
+    return user_doc
 
 @requires_search
 def update_file(file_, index=None, delete=False):
@@ -439,15 +788,14 @@ def update_file(file_, index=None, delete=False):
     index = index or INDEX
 
     if not file_.node.is_public or delete or file_.node.is_deleted or file_.node.archiving:
-        es.delete(
-            index=index,
-            doc_type='file',
-            id=file_._id,
-            refresh=True,
-            ignore=[404]
-        )
+        queue_delete(index, 'file', file_._id)
         return
 
+    queue_index(index, 'file', file_._id, serialize_file(file_))
+
+
+def serialize_file(file_):
+    """Build the search document of a file on a public node."""
     # We build URLs manually here so that this function can be
     # run outside of a Flask request context (e.g. in a celery task)
     file_deep_url = '/{node_id}/files/{provider}{path}/'.format(
@@ -469,13 +817,7 @@ def update_file(file_, index=None, delete=False):
         'is_registration': file_.node.is_registration,
     }
 
-    es.index(
-        index=index,
-        doc_type='file',
-        body=file_doc,
-        id=file_._id,
-        refresh=True
-    )
+    return file_doc
 
 @requires_search
 def delete_all():
@@ -484,6 +826,7 @@ def delete_all():
 
 @requires_search
 def delete_index(index):
+    search_cache.clear()
     es.indices.delete(index, ignore=[404])
 
 
@@ -541,7 +884,7 @@ def create_index(index=None):
 def delete_doc(elastic_document_id, node, index=None, category=None):
     index = index or INDEX
     category = category or 'registration' if node.is_registration else node.project_or_component
-    es.delete(index=index, doc_type=category, id=elastic_document_id, refresh=True, ignore=[404])
+    queue_delete(index, category, elastic_document_id)
 
 
 @requires_search
@@ -580,47 +923,48 @@ def search_contributor(query, page=0, size=10, exclude=None, current_user=None):
     pages = math.ceil(results['counts'].get('user', 0) / size)
     validate_page_num(page, pages)
 
+    users_by_id = {
+        user._id: user
+        for user in User.find(Q('_id', 'in', [doc['id'] for doc in docs]))
+    }
+    if current_user:
+        contributed_to = set(current_user.node__contributed._to_primary_keys())
+
     users = []
     for doc in docs:
         # TODO: use utils.serialize_user
-        user = User.load(doc['id'])
+        user = users_by_id.get(doc['id'])
+        if user is None:
+            logger.error('Could not load user {0}'.format(doc['id']))
+            continue
+        if not user.is_active:  # exclude merged, unregistered, etc.
+            continue
 
         if current_user and current_user._id == user._id:
             n_projects_in_common = -1
         elif current_user:
-            n_projects_in_common = current_user.n_projects_in_common(user)
+            n_projects_in_common = len(contributed_to.intersection(user.node__contributed._to_primary_keys()))
         else:
             n_projects_in_common = 0
 
-        if user is None:
-            logger.error('Could not load user {0}'.format(doc['id']))
-            continue
-        if user.is_active:  # exclude merged, unregistered, etc.
-            current_employment = None
-            education = None
-
-            if user.jobs:
-                current_employment = user.jobs[0]['institution']
-
-            if user.schools:
-                education = user.schools[0]['institution']
-
-            users.append({
-                'fullname': doc['user'],
-                'id': doc['id'],
-                'employment': current_employment,
-                'education': education,
-                'n_projects_in_common': n_projects_in_common,
-                'gravatar_url': gravatar(
-                    user,
-                    use_ssl=True,
-                    size=settings.PROFILE_IMAGE_MEDIUM
-                ),
-                'profile_url': user.profile_url,
-                'registered': user.is_registered,
-                'active': user.is_active
-
-            })
+        # Employment, education and gravatar come from the index document;
+        # documents indexed before gravatar_url was added fall back to the user
+        users.append({
+            'fullname': doc['user'],
+            'id': doc['id'],
+            'employment': doc.get('job') or None,
+            'education': doc.get('school') or None,
+            'n_projects_in_common': n_projects_in_common,
+            'gravatar_url': doc.get('gravatar_url') or gravatar(
+                user,
+                use_ssl=True,
+                size=settings.PROFILE_IMAGE_MEDIUM
+            ),
+            'profile_url': user.profile_url,
+            'registered': user.is_registered,
+            'active': user.is_active
+
+        })
 
     return {
         'users': users,
@@ -26,7 +26,9 @@ def search(query, index=None, doc_type=None):
     return search_engine.search(query, index=index, doc_type=doc_type)
 
 @requires_search
-def update_node(node, index=None, bulk=False, async=True):
+def update_node(node, index=None, bulk=False, async=True, saved_fields=None):
+    if saved_fields is not None:
+        saved_fields = sorted(saved_fields)
     if async:
         node_id = node._id
         # We need the transaction to be committed before trying to run celery tasks.
@@ -34,12 +36,14 @@ def update_node(node, index=None, bulk=False, async=True):
         # database in order for method that updates the Node's elastic search document
         # to run correctly.
         if settings.USE_CELERY:
-            enqueue_task(search_engine.update_node_async.s(node_id=node_id, index=index, bulk=bulk))
+            enqueue_task(search_engine.update_node_async.s(node_id=node_id, index=index, bulk=bulk,
+                                                           saved_fields=saved_fields))
         else:
-            search_engine.update_node_async(node_id=node_id, index=index, bulk=bulk)
+            search_engine.update_node_async(node_id=node_id, index=index, bulk=bulk,
+                                            saved_fields=saved_fields)
     else:
         index = index or settings.ELASTIC_INDEX
-        return search_engine.update_node(node, index=index, bulk=bulk)
+        return search_engine.update_node(node, index=index, bulk=bulk, saved_fields=saved_fields)
 
 @requires_search
 def bulk_update_nodes(serialize, nodes, index=None):
@@ -68,6 +72,10 @@ def update_file(file_, index=None, delete=False):
     index = index or settings.ELASTIC_INDEX
     search_engine.update_file(file_, index=index, delete=delete)
 
+@requires_search
+def flush():
+    search_engine.flush()
+
 @requires_search
 def delete_all():
     search_engine.delete_all()
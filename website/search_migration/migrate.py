@@ -3,18 +3,25 @@
 '''Migration script for Search-enabled Models.'''
 from __future__ import absolute_import
 
+import os
+import json
+import time
 import logging
+import multiprocessing
 
-from elasticsearch import helpers
+from elasticsearch import Elasticsearch, helpers
 from modularodm.query.querydialect import DefaultQueryDialect as Q
 
 from website import settings
 from framework.auth import User
+from framework.mongo import StoredObject
 from website.models import Node
 from website.app import init_app
 import website.search.search as search
+import website.search.elastic_search as elastic_search
 from scripts import utils as script_utils
 from website.search.elastic_search import es
+from website.files.models.osfstorage import OsfStorageFile
 
 
 logger = logging.getLogger(__name__)
@@ -44,7 +51,173 @@ def migrate_users(index):
     logger.info('Users iterated: {0}\nUsers migrated: {1}'.format(n_iter, n_migr))
 
 
-def migrate(delete, index=None, app=None):
+def node_actions(index, node_ids):
+    """Yield bulk index actions for public nodes and their files."""
+    nodes = Node.find(
+        Q('_id', 'in', node_ids) &
+        Q('is_public', 'eq', True) &
+        Q('is_deleted', 'eq', False)
+    )
+    indexed = []
+    for node in nodes:
+        if node.archiving:
+            continue
+        category = elastic_search.get_doctype_from_node(node)
+        try:
+            parent_id = None if category == 'project' else node.parent_id
+        except IndexError:
+            # Skip orphaned components
+            continue
+        indexed.append(node._id)
+        yield {
+            '_index': index,
+            '_type': category,
+            '_id': node._id,
+            '_source': elastic_search.serialize_node(node, category=category, parent_id=parent_id),
+        }
+    if not indexed:
+        return
+    for file_ in OsfStorageFile.find(Q('node', 'in', indexed)):
+        yield {
+            '_index': index,
+            '_type': 'file',
+            '_id': file_._id,
+            '_source': elastic_search.serialize_file(file_),
+        }
+
+
+def user_actions(index, user_ids):
+    """Yield bulk index actions for active users."""
+    for user in User.find(Q('_id', 'in', user_ids)):
+        if user.is_active:
+            yield {
+                '_index': index,
+                '_type': 'user',
+                '_id': user._id,
+                '_source': elastic_search.serialize_user(user),
+            }
+
+
+ACTION_BUILDERS = {
+    'node': node_actions,
+    'user': user_actions,
+}
+
+_worker_es = None
+
+
+def init_worker():
+    """Give each reindex process its own elasticsearch connection; the
+    parent's connection pool must not be shared across a fork.
+    """
+    global _worker_es
+    _worker_es = Elasticsearch(settings.ELASTIC_URI, request_timeout=settings.ELASTIC_TIMEOUT)
+
+
+def index_chunk(task):
+    """Serialize one chunk of ids and stream the documents to elasticsearch.
+
+    :param tuple task: (kind, index, ids), with kind a key of `ACTION_BUILDERS`
+    :return: (kind, first id, last id, documents indexed, errors)
+    """
+    kind, index, ids = task
+    indexed = errors = 0
+    try:
+        actions = ACTION_BUILDERS[kind](index, ids)
+        for ok, item in helpers.streaming_bulk(_worker_es or es, actions,
+                                               chunk_size=settings.ELASTIC_BULK_SIZE,
+                                               raise_on_error=False):
+            if ok:
+                indexed += 1
+            else:
+                errors += 1
+                logger.error('Failed to index {0}'.format(item))
+    finally:
+        # Keep each worker's identity map from growing with every chunk
+        StoredObject._clear_caches()
+    return kind, ids[0], ids[-1], indexed, errors
+
+
+def chunk_ids(ids, size):
+    ids = sorted(ids)
+    return [ids[i:i + size] for i in range(0, len(ids), size)]
+
+
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as fp:
+        return json.load(fp)
+
+
+def save_checkpoint(path, checkpoint):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as fp:
+        json.dump(checkpoint, fp)
+    os.rename(tmp_path, path)
+
+
+def get_index_settings(index):
+    current = es.indices.get_settings(index=index)[index]['settings']['index']
+    return {
+        'refresh_interval': current.get('refresh_interval', '1s'),
+        'number_of_replicas': current.get('number_of_replicas', 1),
+    }
+
+
+def reindex(index, processes, checkpoint_path):
+    """Index all nodes and users into `index` from a pool of processes.
+    Sorted ids are split into chunks of `settings.ELASTIC_REINDEX_CHUNK_SIZE`;
+    for each kind, the last id up to which every chunk has finished is written
+    to `checkpoint_path` so an interrupted run picks up where it stopped.
+    """
+    checkpoint = load_checkpoint(checkpoint_path)
+    done = checkpoint['done']
+
+    tasks = []
+    # Last ids of the unfinished chunks of each kind, in order
+    remaining = {}
+    node_ids = Node.find(Q('is_public', 'eq', True) & Q('is_deleted', 'eq', False)).get_keys()
+    for kind, ids in (('node', node_ids), ('user', User.find().get_keys())):
+        last_done = done.get(kind)
+        if last_done is not None:
+            ids = [id_ for id_ in ids if id_ > last_done]
+        chunks = chunk_ids(ids, settings.ELASTIC_REINDEX_CHUNK_SIZE)
+        remaining[kind] = [chunk[-1] for chunk in chunks]
+        tasks.extend((kind, index, chunk) for chunk in chunks)
+    logger.info('{0} chunks to index'.format(len(tasks)))
+
+    finished = set()
+    start = time.time()
+    total = errors = 0
+    pool = multiprocessing.Pool(processes, initializer=init_worker)
+    try:
+        for kind, first, last, n_indexed, n_errors in pool.imap_unordered(index_chunk, tasks):
+            total += n_indexed
+            errors += n_errors
+            # Chunks finish out of order; only move the checkpoint past chunks
+            # whose predecessors have all finished
+            finished.add((kind, last))
+            while remaining[kind] and (kind, remaining[kind][0]) in finished:
+                done[kind] = remaining[kind].pop(0)
+            save_checkpoint(checkpoint_path, checkpoint)
+            elapsed = time.time() - start
+            logger.info('Indexed {0} documents ({1:.1f} docs/sec)'.format(total, total / elapsed if elapsed else 0))
+    finally:
+        pool.close()
+        pool.join()
+    logger.info('Reindex finished: {0} documents, {1} errors, {2:.1f} seconds'.format(
+        total, errors, time.time() - start
+    ))
+
+
+def migrate(delete, index=None, app=None, processes=None):
+    """Build a new version of `index` and point the alias at it.
+
+    :param bool delete: Delete the previous version afterwards
+    :param int processes: If given, reindex from this many processes with
+        resumable checkpoints instead of one document at a time
+    """
     index = index or settings.ELASTIC_INDEX
     app = app or init_app("website.settings", set_backends=True, routes=True)
 
@@ -55,10 +228,34 @@ def migrate(delete, index=None, app=None):
     ctx = app.test_request_context()
     ctx.push()
 
-    new_index = set_up_index(index)
-
-    migrate_nodes(new_index)
-    migrate_users(new_index)
+    if processes:
+        checkpoint_path = settings.ELASTIC_REINDEX_CHECKPOINT.format(index=index)
+        checkpoint = load_checkpoint(checkpoint_path)
+        if checkpoint and es.indices.exists(index=checkpoint['index']):
+            new_index = checkpoint['index']
+            logger.info('Resuming reindex into {}'.format(new_index))
+        else:
+            new_index = set_up_index(index)
+            checkpoint = {
+                'index': new_index,
+                'done': {},
+                'settings': get_index_settings(new_index),
+            }
+            save_checkpoint(checkpoint_path, checkpoint)
+        # Refreshing and replicating while loading only slows the load down;
+        # both are restored once every document is in
+        es.indices.put_settings(index=new_index, body={
+            'index': {'refresh_interval': '-1', 'number_of_replicas': 0}
+        })
+        reindex(new_index, processes, checkpoint_path)
+        es.indices.put_settings(index=new_index, body={'index': checkpoint['settings']})
+        es.indices.refresh(index=new_index)
+        os.remove(checkpoint_path)
+    else:
+        new_index = set_up_index(index)
+        migrate_nodes(new_index)
+        migrate_users(new_index)
+        search.flush()
 
     set_up_alias(index, new_index)
 
@@ -30,6 +30,10 @@ BCRYPT_LOG_ROUNDS = 12
 # Hours before email confirmation tokens expire
 EMAIL_TOKEN_EXPIRATION = 24
 CITATION_STYLES_PATH = os.path.join(BASE_PATH, 'static', 'vendor', 'bower_components', 'styles')
+# Citation style searches are answered from an in-process index, which checks
+# for re-parsed styles at most every CITATION_STYLES_INDEX_CHECK_INTERVAL seconds
+CITATION_STYLES_INDEX_CHECK_INTERVAL = 60
+CITATION_STYLES_SEARCH_LIMIT = 50
 
 # Hours before pending embargo/retraction/registration automatically becomes active
 RETRACTION_PENDING_TIME = datetime.timedelta(days=2)
@@ -67,6 +71,24 @@ SEARCH_ENGINE = 'elastic'  # Can be 'elastic', or None
 ELASTIC_URI = 'localhost:9200'
 ELASTIC_TIMEOUT = 10
 ELASTIC_INDEX = 'website'
+# Pending search document updates are coalesced and sent with one bulk request
+# every ELASTIC_BULK_FLUSH_INTERVAL seconds, or once ELASTIC_BULK_SIZE are queued
+ELASTIC_BULK_FLUSH_INTERVAL = 1
+ELASTIC_BULK_SIZE = 500
+# While elasticsearch is unreachable, at most ELASTIC_MAX_PENDING updates are
+# kept (the oldest are dropped) and flushes are retried with exponential
+# backoff of up to ELASTIC_MAX_RETRY_DELAY seconds
+ELASTIC_MAX_PENDING = 5000
+ELASTIC_MAX_RETRY_DELAY = 300
+# Send every update immediately and refresh the index; used by tests
+ELASTIC_INDEX_SYNC = False
+# Number of search result pages cached per process, and their lifetime in seconds
+SEARCH_CACHE_SIZE = 500
+SEARCH_CACHE_TTL = 30
+# Full reindexes (`invoke migrate_search --processes N`) hand out this many ids
+# to a worker at a time and record finished chunks in the checkpoint file
+ELASTIC_REINDEX_CHUNK_SIZE = 1000
+ELASTIC_REINDEX_CHECKPOINT = '/tmp/osf-search-reindex-{index}.json'
 SHARE_ELASTIC_URI = ELASTIC_URI
 SHARE_ELASTIC_INDEX = 'share'
 # For old indices
@@ -76,6 +98,14 @@ SHARE_ELASTIC_INDEX_TEMPLATE = 'share_v{}'
 # TODO: Override OSF_COOKIE_DOMAIN in local.py in production
 OSF_COOKIE_DOMAIN = None
 COOKIE_NAME = 'osf'
+# Unchanged sessions are only re-saved once this much time has passed, to keep
+# `date_modified` current without writing on every request
+SESSION_TOUCH_INTERVAL = timedelta(hours=1)
+# Number of sessions cached per process in front of MongoDB, and their lifetime
+# in seconds. Cached sessions are not shared between processes, so this is
+# disabled (0) by default
+SESSION_CACHE_SIZE = 10000
+SESSION_CACHE_TTL = 0
 # TODO: Override SECRET_KEY in local.py in production
 SECRET_KEY = 'CHANGEME'
 
@@ -91,6 +121,14 @@ SUPPORT_EMAIL = 'support@osf.io'
 MAIL_SERVER = 'smtp.sendgrid.net'
 MAIL_USERNAME = 'osf-smtp'
 MAIL_PASSWORD = ''  # Set this in local.py
+# SMTP connections are reused between messages; re-open after this many
+# messages or this many idle seconds
+MAIL_MAX_MESSAGES_PER_CONNECTION = 100
+MAIL_CONNECTION_IDLE_TIMEOUT = 60
+# Number of digest emails sent per task
+DIGEST_BATCH_SIZE = 50
+# Number of pending digest notifications fetched per cursor round trip
+DIGEST_CURSOR_BATCH_SIZE = 1000
 
 # Mandrill
 MANDRILL_USERNAME = None
@@ -136,6 +174,16 @@ DB_PORT = os_env.get('OSF_DB_PORT', 27017)
 DB_NAME = 'osf20130903'
 DB_USER = None
 DB_PASS = None
+# Maximum number of pooled connections kept open by each worker process
+DB_MAX_POOL_SIZE = 100
+# Count and time the MongoDB operations of each request, storing the profiles in
+# a capped collection of QUERY_PROFILER_COLLECTION_SIZE bytes (see
+# `invoke query_report`). Responses carry an X-OSF-Query-Count header in DEBUG_MODE
+QUERY_PROFILER_ENABLED = False
+QUERY_PROFILER_COLLECTION = 'queryprofiles'
+QUERY_PROFILER_COLLECTION_SIZE = 50 * 1024 * 1024
+# Number of slowest operations stored per request
+QUERY_PROFILER_MAX_QUERIES = 50
 
 # Cache settings
 SESSION_HISTORY_LENGTH = 5
@@ -208,6 +256,11 @@ SYSTEM_ADDED_ADDONS = {
     'node': [],
 }
 
+# State held by add-on services (e.g. whether a GitHub repo is private) is
+# cached on the node settings and refreshed in the background once older than
+# this many seconds; page loads only read the cached state
+ADDON_REMOTE_STATE_TTL = 60 * 10
+
 # Piwik
 
 # TODO: Override in local.py in production
@@ -215,6 +268,21 @@ PIWIK_HOST = None
 PIWIK_ADMIN_TOKEN = None
 PIWIK_SITE_ID = None
 
+# Page counters remember which pages a session has already visited (per day and
+# over the session's lifetime) in a list of up to PAGE_COUNTER_EXACT_PAGES pages,
+# then in a Bloom filter of this many bits so that busy sessions stay bounded in
+# size. Each page sets PAGE_COUNTER_FILTER_HASHES bits
+PAGE_COUNTER_EXACT_PAGES = 50
+PAGE_COUNTER_DAILY_FILTER_BITS = 2048
+PAGE_COUNTER_FILTER_BITS = 4096
+PAGE_COUNTER_FILTER_HASHES = 4
+# Page counter increments are summed in-process and written every
+# PAGE_COUNTER_FLUSH_INTERVAL seconds, or once PAGE_COUNTER_BATCH_SIZE pages are pending
+PAGE_COUNTER_FLUSH_INTERVAL = 5
+PAGE_COUNTER_BATCH_SIZE = 500
+# Write every increment immediately; used by tests
+PAGE_COUNTER_SYNC = False
+
 SENTRY_DSN = None
 SENTRY_DSN_JS = None
 
@@ -274,6 +342,19 @@ ARCHIVE_TIMEOUT_TIMEDELTA = timedelta(1)  # 24 hours
 
 ENABLE_ARCHIVER = True
 
+# Addon file trees are listed with up to ARCHIVE_CRAWL_WORKERS concurrent
+# WaterButler metadata requests, at most ARCHIVE_CRAWL_RATE requests per second
+# per provider. Failed requests are retried ARCHIVE_CRAWL_MAX_RETRIES times with
+# exponential backoff starting at ARCHIVE_CRAWL_BACKOFF seconds. The rate is
+# per process; the sequential crawl it replaces made about 5 requests per second.
+ARCHIVE_CRAWL_WORKERS = 8
+ARCHIVE_CRAWL_RATE = 20
+ARCHIVE_CRAWL_MAX_RETRIES = 3
+ARCHIVE_CRAWL_BACKOFF = 0.5
+# If set, the stat phase writes each addon's file listing to a JSON lines
+# manifest in this directory; only totals are passed between archiver tasks
+ARCHIVE_STAT_MANIFEST_DIR = None
+
 JWT_SECRET = 'changeme'
 JWT_ALGORITHM = 'HS256'
 
@@ -294,6 +375,8 @@ CELERY_IMPORTS = (
     'website.mailchimp_utils',
     'website.notifications.tasks',
     'website.archiver.tasks',
+    'website.addons.base.tasks',
+    'website.discovery.tasks',
     'website.search.search',
 )
 
@@ -315,6 +398,10 @@ else:
             'schedule': crontab(minute=0, hour=0),
             'args': ('email_digest',),
         },
+        'discovery-activity': {
+            'task': 'discovery.update_activity',
+            'schedule': crontab(minute='*/10'),
+        },
     }
 
 WATERBUTLER_JWE_SALT = 'yusaltydough'
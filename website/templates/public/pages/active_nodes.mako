@@ -56,15 +56,15 @@
             <%
                 #import locale
                 #locale.setlocale(locale.LC_ALL, 'en_US')
-                if node.is_registration:
+                if node['is_registration']:
                     explicit_date = '{month} {dt.day} {dt.year}'.format(
-                        dt=node.registered_date.date(),
-                        month=node.registered_date.date().strftime('%B')
+                        dt=node['registered_date'].date(),
+                        month=node['registered_date'].date().strftime('%B')
                     )
                 else:
                     explicit_date = '{month} {dt.day} {dt.year}'.format(
-                    dt=node.date_created.date(),
-                    month=node.date_created.date().strftime('%B')
+                    dt=node['date_created'].date(),
+                    month=node['date_created'].date().strftime('%B')
                 )
 
             %>
@@ -72,21 +72,21 @@
                 <div class="row">
                     <div class="col-md-10">
                         <h4 class="f-w-md overflow" style="width:85%">
-                            <a href="${node.url}">${node.title}</a>
+                            <a href="${node['url']}">${node['title']}</a>
                         </h4>
                     </div>
                     <div class="col-md-2">
                         % if metric == 'hits':
-                            <span class="project-meta pull-right" rel='tooltip' data-original-title='${ hits[node._id].get('hits') } views (${ hits[node._id].get('visits') } visits)'>
-                                ${ hits[node._id].get('hits') }&nbsp;views (last&nbsp;week)
+                            <span class="project-meta pull-right" rel='tooltip' data-original-title='${ hits[node['_id']].get('hits') } views (${ hits[node['_id']].get('visits') } visits)'>
+                                ${ hits[node['_id']].get('hits') }&nbsp;views (last&nbsp;week)
                             </span>
                         % elif metric == 'date_created':
                             <span class="project-meta pull-right" rel='tooltip' data-original-title='Created: ${explicit_date}'>
-                                ${node.date_created.date()}
+                                ${node['date_created'].date()}
                             </span>
                         % elif metric == 'registered_date':
                             <span class="project-meta pull-right" rel='tooltip' data-original-title='Registered: ${explicit_date}'>
-                                ${node.registered_date.date()}
+                                ${node['registered_date'].date()}
                             </span>
                         % endif
                     </div>
@@ -94,9 +94,9 @@
                 <!-- Show abbreviated contributors list -->
                 <div mod-meta='{
                     "tpl": "util/render_users_abbrev.mako",
-                    "uri": "${node.api_url}contributors_abbrev/",
+                    "uri": "${node['api_url']}contributors_abbrev/",
                     "kwargs": {
-                        "node_url": "${node.url}"
+                        "node_url": "${node['url']}"
                     },
                     "replace": true
                 }'></div>
@@ -26,7 +26,6 @@ from website.models import Guid
 from website.models import Node
 from website.util import rubeus
 from website.util import sanitize
-from website.project import model
 from website.util import web_url_for
 from website.util import permissions
 from website.project import new_dashboard
@@ -46,7 +45,7 @@ def _rescale_ratio(auth, nodes):
     if not nodes:
         return 0
     counts = [
-        len(node.logs)
+        node.get_log_count()
         for node in nodes
         if node.can_view(auth)
     ]
@@ -268,9 +267,12 @@ def watched_logs_get(**kwargs):
             message_long='Invalid value for "size".'
         ))
 
-    total = sum(1 for x in user.get_recent_log_ids())
-    paginated_logs, pages = paginate(user.get_recent_log_ids(), total, page, size)
-    logs = (model.NodeLog.load(id) for id in paginated_logs)
+    # Count and page through the same query so that they agree
+    logs_query = user.get_recent_logs_query()
+    total = logs_query.count()
+    pages = math.ceil(total / float(size))
+    validate_page_num(page, pages)
+    logs = logs_query[page * size:(page + 1) * size]
 
     return {
         "logs": [serialize_log(log) for log in logs],